@@ -65,6 +65,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "core.middleware.RenovarSesionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -178,6 +179,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #esto permite utilizar mi propio modelo con campos especificos
 AUTH_USER_MODEL = 'core.Usuario'
 
+#backend que carga el usuario de la sesion con su rol y lo guarda en cache
+AUTHENTICATION_BACKENDS = ['core.backends.UsuarioCacheBackend']
+
+#cache compartida entre los procesos del servidor (archivos locales),
+#para que invalidar un usuario tenga efecto en todos los workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    }
+}
+
+#segundos que el usuario de la sesion permanece en cache
+USUARIO_CACHE_TTL = 300
+
+#segundos que se guardan los IDs de un filtro de solicitudes (core.filtros)
+FILTROS_CACHE_TTL = 300
+#filtros con mas resultados no se guardan y se aplican en la consulta
+FILTROS_MAX_IDS = 5000
+
 #configuracion para usar el envio de email
 
 #sendgrid
@@ -231,5 +252,76 @@ SESSION_COOKIE_AGE = 1800  # 30 minutos
 # La sesión expira cuando el navegador se cierra  
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  
   
-# Actualiza la cookie de sesión en cada request (resetea el timer de inactividad)  
-SESSION_SAVE_EVERY_REQUEST = True
\ No newline at end of file
+# La sesión no se guarda en cada request: RenovarSesionMiddleware la guarda
+# (y reinicia el timer de inactividad) cuando cambian sus datos o cuando
+# pasó esta fracción de SESSION_COOKIE_AGE desde la última escritura
+SESSION_SAVE_EVERY_REQUEST = False
+SESION_RENOVACION_FRACCION = 0.1
+
+# Las sesiones se leen primero de la caché y se guardan en la base de datos
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Límite de intentos de inicio de sesión (core.intentos_login): cada intento
+# gasta una ficha del correo y cada intento fallido una ficha de la IP; cada
+# cubeta guarda hasta "capacidad" fichas y recupera "por_minuto" fichas por
+# minuto
+LOGIN_LIMITE_IP = {"capacidad": 20, "por_minuto": 10}
+LOGIN_LIMITE_CORREO = {"capacidad": 5, "por_minuto": 2}
+
+# Cabecera de request.META con la IP del cliente si hay un proxy delante
+# (por ejemplo "HTTP_X_REAL_IP"); None para usar REMOTE_ADDR
+LOGIN_CABECERA_IP = None
+
+# Segundos que las tablas de referencia (roles, tipos, tallas, colores,
+# centros y programas) permanecen en la caché en memoria de cada proceso
+CATALOGO_CACHE_TTL = 300
+
+# Segundos que cada servidor guarda la versión leída de una tabla de
+# catálogo (core.versiones) y que se guarda el catálogo JSON de cada versión
+VERSIONES_CACHE_TTL = 60
+CATALOGO_JSON_TTL = 3600
+
+# Segundos que el navegador usa los programas por centro sin revalidarlos
+PROGRAMAS_CACHE_MAX_AGE = 300
+
+# Segundos que se guardan los fragmentos de plantilla (carrusel, tabla y
+# listas de opciones de productos) de cada versión del catálogo
+FRAGMENTOS_CACHE_TTL = 3600
+
+# Filas de solicitudes leídas por consulta al generar reportes (Excel/PDF)
+EXPORTACION_TAMANO_LOTE = 2000
+
+# Máximo de solicitudes por reporte PDF (se puede bajar con ?limite=)
+EXPORTACION_PDF_MAX_FILAS = 5000
+
+# Reportes en segundo plano (comando procesar_exportaciones): carpeta de los
+# archivos generados, segundos que se conservan para descargar y segundos
+# que un trabajo puede seguir en proceso antes de darse por fallido
+EXPORTACIONES_DIR = os.path.join(BASE_DIR, 'cache', 'exportaciones')
+EXPORTACIONES_TTL = 24 * 3600
+EXPORTACIONES_TIEMPO_MAXIMO = 1800
+
+# Bandeja de salida de correos (comando enviar_correos): correos por lote,
+# intentos antes de marcar un correo como fallido y espera base en segundos
+# entre reintentos (se duplica en cada intento)
+CORREOS_TAMANO_LOTE = 50
+CORREOS_MAX_INTENTOS = 5
+CORREOS_REINTENTO_BASE = 60
+
+# Segundos que un lote tomado por enviar_correos queda reservado para ese
+# proceso; si muere sin registrar el resultado, el lote se reintenta después
+CORREOS_RECLAMO_SEGUNDOS = 600
+
+# Segundos durante los que se acumulan los cambios de estado de las
+# solicitudes de un aprendiz antes de enviarle un solo correo de resumen
+NOTIFICACIONES_VENTANA = 900
+
+# Caché en disco de las facturas en PDF y número máximo de conversiones
+# en paralelo por proceso
+FACTURAS_DIR = os.path.join(BASE_DIR, 'cache', 'facturas')
+FACTURAS_MAX_CONCURRENTES = 2
+
+# Motor de las facturas: "wkhtmltopdf", "weasyprint" o "reportlab"
+# (ver core.motores_factura y el comando benchmark_facturas)
+FACTURAS_MOTOR = os.getenv('FACTURAS_MOTOR', 'wkhtmltopdf')
+WKHTMLTOPDF_PATH = os.getenv('WKHTMLTOPDF_PATH', '/usr/bin/wkhtmltopdf')
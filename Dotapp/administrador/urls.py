@@ -12,6 +12,9 @@ urlpatterns = [
     path('seguimiento-pedidos/', views.seguimiento_pedidos, name='seguimiento-pedidos'),
     path("export/pdf/", views.exportar_pdf, name="exportar_pdf"),
     path("export/excel/", views.exportar_excel, name="exportar_excel"),
+    path("export/trabajos/<int:id_trabajo>/", views.estado_exportacion, name="estado-exportacion"),
+    path("export/trabajos/<int:id_trabajo>/descargar/", views.descargar_exportacion, name="descargar-exportacion"),
+    path("export/trabajos/<str:formato>/", views.crear_exportacion, name="crear-exportacion"),
 
 
 ]
@@ -14,6 +14,9 @@ from django.views.decorators.csrf import csrf_exempt
 import json
 from django.http import JsonResponse, HttpResponse
 from core.models import Usuario, Rol, Solicitud, Borrador, CentroFormacion, Programa
+from core import catalogo, contadores
+from core.filtros import FiltroSolicitudes
+from core.paginacion import paginar_keyset
 from django.contrib import messages
 
 
@@ -22,7 +25,8 @@ def panel_admin(request):
     """
     Vista del panel principal del administrador.
     
-    Verifica que el usuario tenga rol de administrador antes de mostrar el panel.
+    Verifica que el usuario tenga rol de administrador antes de mostrar el
+    panel, con el número de solicitudes por estado en total y por centro.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -32,7 +36,20 @@ def panel_admin(request):
     """
     if request.user.rol is None or request.user.rol.nombre_rol != "administrador":
         return redirect(reverse("acceso_denegado"))
-    return render(request, "administrador/panel_admin.html")
+    por_centro = contadores.conteos_por_centro()
+    centros = [
+        {
+            "nombre": centro.nombre,
+            "totales": [por_centro[centro.id_centro][estado] for estado, _ in Solicitud.ESTADOS],
+        }
+        for centro in catalogo.todos(CentroFormacion)
+        if centro.id_centro in por_centro
+    ]
+    return render(request, "administrador/panel_admin.html", {
+        "conteos": contadores.resumen(),
+        "estados": [etiqueta for _, etiqueta in Solicitud.ESTADOS],
+        "centros": centros,
+    })
 
 
 @login_required
@@ -50,7 +67,7 @@ def administracion_usuarios(request):
         HttpResponse: Renderiza la página de administración de usuarios
     """
     usuarios = Usuario.objects.filter(is_superuser=False)
-    roles = Rol.objects.all()
+    roles = catalogo.todos(Rol)
     return render(request, "administrador/administracion_usuarios.html", {"usuarios": usuarios, "roles": roles})
 
 
@@ -59,8 +76,9 @@ def historial_usuarios(request, id_usuario):
     """
     Vista para mostrar el historial de solicitudes de un usuario específico.
     
-    Muestra todas las solicitudes realizadas por el usuario seleccionado,
-    ordenadas por fecha de solicitud (más recientes primero).
+    Muestra las solicitudes realizadas por el usuario seleccionado,
+    ordenadas por fecha de solicitud (más recientes primero) y paginadas
+    por cursor.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -70,16 +88,16 @@ def historial_usuarios(request, id_usuario):
         HttpResponse: Renderiza el historial de solicitudes del usuario
     """
     usuario = get_object_or_404(Usuario, id_usuario=id_usuario)
-    solicitudes = usuario.solicitudes.all()
-    
-    # Ordenar por fecha de solicitud (más recientes primero)
-    solicitudes = solicitudes.order_by("-fecha_solicitud")
+
+    # Paginar por fecha de solicitud (más recientes primero)
+    pagina = paginar_keyset(usuario.solicitudes.all(), request)
     return render(
         request,
         "administrador/historial-de-usuario.html",
         {
             "usuario": usuario,
-            "solicitudes": solicitudes
+            "solicitudes": pagina,
+            "pagina": pagina,
         }
     )
 
@@ -201,16 +219,14 @@ def cambiar_estado_usuario(request, id_usuario):
     return redirect("administracion-usuarios")
 
 
-from django.db.models import Q
-
-
 @login_required
 def seguimiento_pedidos(request):
     """
     Vista para el seguimiento de pedidos y solicitudes.
     
-    Muestra todas las solicitudes del sistema con opciones de filtrado
-    por búsqueda de texto y estado. También muestra los borradores guardados.
+    Muestra las solicitudes del sistema con opciones de filtrado
+    por búsqueda de texto y estado (ver core.filtros), paginadas por cursor.
+    Los IDs filtrados quedan en caché para exportar la misma selección.
     
     Args:
         request: Objeto HttpRequest con parámetros de búsqueda opcionales
@@ -221,24 +237,17 @@ def seguimiento_pedidos(request):
     buscar = request.GET.get("buscar", "").strip()
     estado = request.GET.get("estado", "").strip()
 
-    solicitudes = Solicitud.objects.select_related("id_aprendiz", "id_producto").order_by("-fecha_solicitud")
-    borradores = Borrador.objects.all().order_by("-creado")
+    filtro = FiltroSolicitudes.desde_request(request)
+    solicitudes = filtro.aplicar(Solicitud.objects.select_related("id_aprendiz", "id_producto"))
 
-    if buscar:
-        solicitudes = solicitudes.filter(
-            Q(id_aprendiz__nombre__icontains=buscar) |
-            Q(id_producto__tipo__nombre__icontains=buscar)
-        )
-
-    if estado:
-        solicitudes = solicitudes.filter(estado_solicitud__iexact=estado)
+    pagina = paginar_keyset(solicitudes, request)
 
     return render(request, "administrador/seguimiento-de-pedidos.html", {
-        "solicitudes": solicitudes,
-        "borradores": borradores,
+        "solicitudes": pagina,
+        "pagina": pagina,
         "buscar": buscar,
         "estado": estado,
-        "centros": CentroFormacion.objects.all()
+        "centros": catalogo.todos(CentroFormacion)
     })
 
 
@@ -247,270 +256,221 @@ def seguimiento_pedidos(request):
 
 
 
-from django.http import HttpResponse
-from django.db.models import Q
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, LongTable
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph
-from reportlab.lib.styles import ParagraphStyle
+from django.http import HttpResponse, FileResponse
+from django.conf import settings
+import tempfile
+from core.exportacion import escribir_pdf
+
+# Tamaño a partir del cual el PDF temporal pasa de memoria a disco (bytes)
+PDF_MAX_EN_MEMORIA = 5 * 1024 * 1024
+
 
 def exportar_pdf(request):
     """
     Vista para exportar solicitudes a formato PDF.
     
     Genera un reporte en PDF con las solicitudes filtradas según los parámetros
-    de búsqueda, estado y usuario. El PDF se genera en formato landscape.
+    de búsqueda, estado, usuario y fechas desde/hasta (AAAA-MM-DD), con el
+    mismo filtro del seguimiento de pedidos (ver core.filtros). El PDF se
+    genera en formato landscape. Las filas se dibujan por bloques de tamaño
+    fijo, así que el tiempo y la memoria dependen del número de filas
+    exportadas, que se puede acotar con el parámetro limite (máximo
+    settings.EXPORTACION_PDF_MAX_FILAS).
     
     Args:
         request: Objeto HttpRequest con parámetros de filtrado opcionales
         
     Returns:
-        HttpResponse: Archivo PDF con el reporte de solicitudes
+        FileResponse: Archivo PDF con el reporte de solicitudes
     """
-    buscar = request.GET.get("buscar", "").strip().lower()
-    estado = request.GET.get("estado", "").strip().lower()
-    usuario = request.GET.get("usuario", "").strip()
-
-    solicitudes = Solicitud.objects.select_related("id_aprendiz", "id_producto").all()
-
-    if buscar:
-        solicitudes = solicitudes.filter(
-            Q(id_solicitud__icontains=buscar)
-            | Q(fecha_solicitud__icontains=buscar)
-            | Q(id_aprendiz__nombre__icontains=buscar)
-            | Q(tipo_nombre__icontains=buscar)
-            | Q(talla__icontains=buscar)
-            | Q(color__icontains=buscar)
-            | Q(cantidad__icontains=buscar)
-            | Q(centro_formacion__icontains=buscar)
-            | Q(programa__icontains=buscar)
-            | Q(ficha__icontains=buscar)
-            | Q(detalles_adicionales__icontains=buscar)
-            | Q(fecha_finalizacion__icontains=buscar)
-            | Q(estado_solicitud__icontains=buscar)
-        )
-
-    if estado:
-        solicitudes = solicitudes.filter(estado_solicitud__iexact=estado)
-
-    if usuario:
-        solicitudes = solicitudes.filter(id_aprendiz__nombre__icontains=usuario)
-
-    # 📌 Generar título dinámico
-    if estado and usuario:
-        titulo = f"Reporte de solicitudes {estado.title()} de {usuario.title()}"
-    elif estado and buscar:
-        titulo = f"Reporte de solicitudes {estado.title()} ({buscar})"
-    elif usuario and buscar:
-        titulo = f"Reporte de solicitudes de {usuario.title()} ({buscar})"
-    elif estado:
-        titulo = f"Reporte de solicitudes {estado.title()}"
-    elif usuario:
-        titulo = f"Reporte de solicitudes de {usuario.title()}"
-    elif buscar:
-        titulo = f"Reporte de solicitudes ({buscar})"
-    else:
-        titulo = "Reporte de todas las solicitudes"
+    maximo = getattr(settings, "EXPORTACION_PDF_MAX_FILAS", 5000)
+    try:
+        limite = max(1, min(int(request.GET.get("limite", maximo)), maximo))
+    except (TypeError, ValueError):
+        limite = maximo
 
-    # 📄 Respuesta PDF
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = "attachment; filename=solicitudes.pdf"
-
-    doc = SimpleDocTemplate(response, pagesize=landscape(letter))
-    styles = getSampleStyleSheet()
-    elementos = []
-
-    # 🏷️ Título
-    elementos.append(Paragraph(titulo, styles["Title"]))
-    elementos.append(Spacer(1, 12))
-
-    # 📊 Datos de la tabla
-    data = [[
-        "ID", "Fecha", "Usuario", "Producto", "Talla", "Color", "Cantidad",
-        "Centro", "Programa", "Ficha", "Detalles Adicionales" ,"Fecha Fin", "Estado"
-    ]]
-
-    estilo_celda = ParagraphStyle("Normal", fontSize=7, alignment=1)
-
-    for s in solicitudes:
-        data.append([
-            str(s.id_solicitud),
-             s.fecha_solicitud.strftime("%Y-%m-%d") if s.fecha_solicitud else "",
-            str(s.id_aprendiz.get_full_name() if hasattr(s.id_aprendiz, "get_full_name") else s.id_aprendiz),
-            str(s.tipo_nombre),
-            str(s.talla_nombre),
-            str(s.color_nombre),
-            str(s.cantidad),
-            str(s.centro_nombre),
-            str(s.programa_nombre),
-            str(s.ficha),
-            Paragraph(str(s.detalles_adicionales), estilo_celda),
-             s.fecha_finalizacion.strftime("%Y-%m-%d") if s.fecha_finalizacion else "",
-            str(s.estado_solicitud),
-        ])
-
-    # 📐 Ajustar anchos de columnas
-    colWidths = [
-        35,   
-        55,   
-        105,  
-        50,   
-        30,   
-        45,   
-        40,   
-        50,   
-        50,   
-        50,  
-        100,  
-        60,   
-        60,   
-    ]
+    filtro = FiltroSolicitudes.desde_request(request)
+    solicitudes = filtro.aplicar()
 
-    table = LongTable(data, repeatRows=1, colWidths=colWidths)
+    # Escribir el PDF en un archivo temporal (en disco si supera el umbral)
+    archivo = tempfile.SpooledTemporaryFile(max_size=PDF_MAX_EN_MEMORIA)
+    escribir_pdf(solicitudes, archivo, filtro.titulo(), limite=limite)
+    archivo.seek(0)
 
-    # 🎨 Estilos de la tabla
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#c3f0ca")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 7),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-    ]))
-
-    elementos.append(table)
-    doc.build(elementos)
+    # 📄 Respuesta PDF
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename="solicitudes.pdf",
+        content_type="application/pdf",
+    )
 
-    return response
 
 
+import tempfile
+from django.http import HttpResponse, FileResponse
+from core.exportacion import escribir_excel
 
-import openpyxl
-from openpyxl.worksheet.table import Table, TableStyleInfo
-from django.http import HttpResponse
-from django.db.models import Q
-from django.utils.timezone import is_aware
+# Tamaño a partir del cual el Excel temporal pasa de memoria a disco (bytes)
+EXCEL_MAX_EN_MEMORIA = 5 * 1024 * 1024
 
 def exportar_excel(request):
     """
     Vista para exportar solicitudes a formato Excel.
     
     Genera un archivo Excel (.xlsx) con las solicitudes filtradas según
-    los parámetros de búsqueda, estado y usuario. Incluye formato de tabla.
+    los parámetros de búsqueda, estado, usuario y fechas, con el mismo
+    filtro del seguimiento de pedidos (ver core.filtros). Incluye formato
+    de tabla. Las filas se leen por lotes y se escriben en una hoja de solo
+    escritura, por lo que la memoria usada no depende del número de
+    solicitudes.
     
     Args:
         request: Objeto HttpRequest con parámetros de filtrado opcionales
         
     Returns:
-        HttpResponse: Archivo Excel con el reporte de solicitudes
+        FileResponse: Archivo Excel con el reporte de solicitudes
     """
-    buscar = request.GET.get("buscar", "").strip().lower()
-    estado = request.GET.get("estado", "").strip().lower()
-    usuario = request.GET.get("usuario", "").strip()
-
-    solicitudes = Solicitud.objects.select_related("id_aprendiz", "id_producto").all()
-
-    # 📌 Filtros
-    if buscar:
-        solicitudes = solicitudes.filter(
-            Q(id_solicitud__icontains=buscar)
-            | Q(fecha_solicitud__icontains=buscar)
-            | Q(id_aprendiz__nombre__icontains=buscar)
-            | Q(tipo_nombre__icontains=buscar)
-            | Q(talla_nombre__icontains=buscar)
-            | Q(color_nombre__icontains=buscar)
-            | Q(cantidad__icontains=buscar)
-            | Q(centro_nombre__icontains=buscar)
-            | Q(programa_nombre__icontains=buscar)
-            | Q(ficha__icontains=buscar)
-            | Q(detalles_adicionales__icontains=buscar)
-            | Q(fecha_finalizacion__icontains=buscar)
-            | Q(estado_solicitud__icontains=buscar)
-        )
-
-    if estado:
-        solicitudes = solicitudes.filter(estado_solicitud__iexact=estado)
-
-    if usuario:
-        solicitudes = solicitudes.filter(id_aprendiz__nombre__icontains=usuario)
-
-    # 📌 Generar título dinámico
-    if estado:
-        titulo = f"Reporte de solicitudes {estado.title()}"
-    elif usuario:
-        titulo = f"Reporte de solicitudes de {usuario.title()}"
-    elif buscar:
-        titulo = f"Reporte de solicitudes (filtro {buscar})"
-    else:
-        titulo = "Reporte de todas las solicitudes"
-
-    # Crear workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Solicitudes"
-
-    # Encabezados
-    headers = [
-        "ID Solicitud", "Fecha Solicitud", "Usuario", "Producto", "Talla", "Color", 
-        "Cantidad", "Centro de Formación", "Programa", "Ficha",  "Detalles Adicionales",
-        "Fecha Finalización", "Estado"
-    ]
-    ws.append(headers)
-
-    # 📌 Agregar filas
-    for solicitud in solicitudes:
-        fecha_solicitud = solicitud.fecha_solicitud
-        if is_aware(fecha_solicitud):
-            fecha_solicitud = fecha_solicitud.replace(tzinfo=None)
-
-        fecha_finalizacion = solicitud.fecha_finalizacion
-        if fecha_finalizacion and is_aware(fecha_finalizacion):
-            fecha_finalizacion = fecha_finalizacion.replace(tzinfo=None)
-
-        ws.append([
-            solicitud.id_solicitud,
-            fecha_solicitud,
-            solicitud.id_aprendiz.get_full_name() if solicitud.id_aprendiz else "",
-            solicitud.tipo_nombre,
-            solicitud.talla_nombre,
-            solicitud.color_nombre,
-            solicitud.cantidad,
-            solicitud.centro_nombre,
-            solicitud.programa_nombre,
-            solicitud.ficha,
-            solicitud.detalles_adicionales or "",
-            fecha_finalizacion,
-            solicitud.estado_solicitud.title(),
-        ])
-
-    # Tabla con estilo
-    table = Table(displayName="TablaSolicitudes", ref=f"A1:M{ws.max_row}")
-    style = TableStyleInfo(
-        name="TableStyleMedium9", showFirstColumn=False,
-        showLastColumn=False, showRowStripes=True, showColumnStripes=True
-    )
-    table.tableStyleInfo = style
-    ws.add_table(table)
+    filtro = FiltroSolicitudes.desde_request(request)
+    solicitudes = filtro.aplicar(Solicitud.objects.select_related("id_aprendiz", "id_producto"))
 
     # 📌 Nombre dinámico del archivo
-    filename = f"{titulo.replace(' ', '_').lower()}.xlsx"
-
-    # Respuesta HTTP
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    filename = f"{filtro.titulo().replace(' ', '_').lower()}.xlsx"
+
+    # Escribir el libro en un archivo temporal (en disco si supera el umbral)
+    archivo = tempfile.SpooledTemporaryFile(max_size=EXCEL_MAX_EN_MEMORIA)
+    escribir_excel(solicitudes, archivo)
+    archivo.seek(0)
+
+    # Respuesta HTTP: el archivo se envía por bloques y se cierra al terminar
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=filename,
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
 
 
 
+import os
+from django.views.decorators.http import require_POST
+from core import trabajos_exportacion
+from core.models import TrabajoExportacion
+
+
+def _es_administrador(usuario):
+    """
+    Indica si el usuario tiene rol de administrador.
+
+    Args:
+        usuario: Usuario autenticado
+
+    Returns:
+        bool: True si el rol del usuario es administrador
+    """
+    return usuario.rol is not None and usuario.rol.nombre_rol == "administrador"
+
+
+def _estado_trabajo(trabajo):
+    """
+    Retorna el estado de un trabajo de exportación para la respuesta JSON.
+
+    Args:
+        trabajo: Instancia de TrabajoExportacion
+
+    Returns:
+        dict: Estado, avance, si el reporte se recortó al límite y URL de
+        descarga (si ya terminó)
+    """
+    datos = {
+        "status": "ok",
+        "id": trabajo.id_trabajo,
+        "estado": trabajo.estado,
+        "procesadas": trabajo.procesadas,
+        "total": trabajo.total,
+        "encontradas": trabajo.encontradas,
+        "recortado": (trabajo.encontradas or 0) > (trabajo.total or 0),
+        "porcentaje": round(100 * trabajo.procesadas / trabajo.total) if trabajo.total else None,
+        "estado_url": reverse("estado-exportacion", args=[trabajo.id_trabajo]),
+    }
+    if trabajo.estado == "terminado":
+        datos["descarga_url"] = reverse("descargar-exportacion", args=[trabajo.id_trabajo])
+        datos["expira"] = trabajo.expira.isoformat()
+    elif trabajo.estado == "fallido":
+        datos["error"] = trabajo.error
+    return datos
+
+
+@login_required
+@require_POST
+def crear_exportacion(request, formato):
+    """
+    Vista para pedir un reporte que se genera en segundo plano.
+
+    Registra un trabajo con los filtros recibidos (los mismos parámetros de
+    exportar_pdf y exportar_excel) y responde de inmediato; el comando
+    procesar_exportaciones genera el archivo.
+
+    Args:
+        request: Objeto HttpRequest con los filtros (POST)
+        formato: "pdf" o "excel"
+
+    Returns:
+        JsonResponse: Estado inicial del trabajo (202), o error si el usuario
+        no es administrador (403) o el formato no es válido (400)
+    """
+    if not _es_administrador(request.user):
+        return JsonResponse({"status": "error", "message": "Acceso denegado"}, status=403)
+
+    try:
+        trabajo = trabajos_exportacion.crear(request.user, formato, request.POST)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
+    return JsonResponse(_estado_trabajo(trabajo), status=202)
 
 
+@login_required
+def estado_exportacion(request, id_trabajo):
+    """
+    Vista que reporta el avance de un reporte en segundo plano.
+
+    Args:
+        request: Objeto HttpRequest del usuario que pidió el reporte
+        id_trabajo: ID del trabajo de exportación
+
+    Returns:
+        JsonResponse: Estado, filas procesadas y URL de descarga al terminar,
+        o error 404 si el trabajo no existe o ya venció
+    """
+    trabajo = TrabajoExportacion.objects.filter(id_trabajo=id_trabajo, usuario=request.user).first()
+    if trabajo is None:
+        return JsonResponse({"status": "error", "message": "El reporte no existe o ya venció"}, status=404)
+    return JsonResponse(_estado_trabajo(trabajo))
+
 
+@login_required
+def descargar_exportacion(request, id_trabajo):
+    """
+    Vista para descargar un reporte generado en segundo plano.
+
+    Args:
+        request: Objeto HttpRequest del usuario que pidió el reporte
+        id_trabajo: ID del trabajo de exportación
 
+    Returns:
+        FileResponse: Archivo del reporte
+        HttpResponseRedirect: Redirige al seguimiento si no está disponible
+    """
+    trabajo = get_object_or_404(TrabajoExportacion, id_trabajo=id_trabajo, usuario=request.user)
 
+    ruta = trabajos_exportacion.ruta_archivo(trabajo)
+    if trabajo.estado != "terminado" or not os.path.exists(ruta):
+        messages.error(request, "El reporte todavía no está listo o ya no está disponible.")
+        return redirect("seguimiento-pedidos")
+
+    return FileResponse(
+        open(ruta, "rb"),
+        as_attachment=True,
+        filename=trabajo.nombre_descarga,
+    )
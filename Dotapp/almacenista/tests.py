@@ -1,3 +1,117 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.models import CentroFormacion, Color, Producto, Programa, Rol, Solicitud, Talla, TipoProducto, Usuario
+
+
+class AccionMasivaSolicitudesTests(TestCase):
+    """
+    Pruebas de los permisos de la acción masiva sobre la cola del almacenista.
+    """
+
+    def setUp(self):
+        tipo = TipoProducto.objects.create(nombre='Camisa')
+        talla = Talla.objects.create(nombre='M')
+        color = Color.objects.create(nombre='Azul')
+        centro = CentroFormacion.objects.create(nombre='Centro 1')
+        programa = Programa.objects.create(nombre='Programa 1', centro=centro)
+        self.producto = Producto.objects.create(tipo=tipo, talla=talla, color=color, precio=10, stock=5)
+        self.aprendiz = Usuario.objects.create_user('Ana', 'Pérez', 'ana@ejemplo.co', 'clave12345')
+        self.solicitud = Solicitud.objects.create(
+            id_aprendiz=self.aprendiz, tipo=tipo, talla=talla, color=color, cantidad=2,
+            centro_formacion=centro, programa=programa, id_producto=self.producto,
+        )
+        self.url = reverse('accion-masiva-solicitudes')
+
+    def test_aprendiz_no_puede_aplicar_acciones_masivas(self):
+        self.client.force_login(self.aprendiz)
+
+        respuesta = self.client.post(self.url, {'accion': 'rechazar', 'ids': [self.solicitud.pk]})
+
+        self.assertRedirects(respuesta, reverse('acceso_denegado'), fetch_redirect_response=False)
+        self.solicitud.refresh_from_db()
+        self.producto.refresh_from_db()
+        self.assertEqual(self.solicitud.estado_solicitud, 'pendiente')
+        self.assertEqual(self.producto.stock, 5)
+
+    def test_almacenista_aplica_acciones_masivas(self):
+        almacenista = Usuario.objects.create_user('Luis', 'Gómez', 'luis@ejemplo.co', 'clave12345')
+        almacenista.rol = Rol.objects.get(nombre_rol='almacenista')
+        almacenista.save()
+        self.client.force_login(almacenista)
+
+        respuesta = self.client.post(self.url, {'accion': 'aprobar', 'ids': [self.solicitud.pk]})
+
+        self.assertRedirects(respuesta, reverse('solicitudes-inventario'), fetch_redirect_response=False)
+        self.solicitud.refresh_from_db()
+        self.assertEqual(self.solicitud.estado_solicitud, 'aprobada')
+
+
+class ImagenProductoRepetidoTests(TestCase):
+    """
+    Pruebas de que un producto repetido no deja imágenes sin producto.
+    """
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=carpeta.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.carpeta = carpeta.name
+
+        self.almacenista = Usuario.objects.create_user('Luis', 'Gómez', 'luis@ejemplo.co', 'clave12345')
+        self.almacenista.rol = Rol.objects.get(nombre_rol='almacenista')
+        self.almacenista.save()
+        self.client.force_login(self.almacenista)
+
+        tipo = TipoProducto.objects.create(nombre='Camisa')
+        color = Color.objects.create(nombre='Azul')
+        Producto.objects.create(tipo=tipo, talla=Talla.objects.create(nombre='M'), color=color, precio=10, stock=5)
+        self.otro = Producto.objects.create(
+            tipo=tipo, talla=Talla.objects.create(nombre='L'), color=color, precio=10, stock=5,
+        )
+
+    def _imagen(self):
+        contenido = io.BytesIO()
+        Image.new('RGB', (20, 20), 'red').save(contenido, format='PNG')
+        return SimpleUploadedFile('camisa.png', contenido.getvalue(), content_type='image/png')
+
+    def _archivos(self):
+        return [nombre for _, _, nombres in os.walk(self.carpeta) for nombre in nombres]
+
+    def test_agregar_repetido_no_guarda_la_imagen(self):
+        respuesta = self.client.post(reverse('agregar_producto'), {
+            'tipo': 'Camisa', 'talla': 'M', 'color': 'Azul', 'precio': 10, 'cantidad': 1,
+            'imagen': self._imagen(),
+        })
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self._archivos(), [])
+
+    def test_editar_a_repetido_no_guarda_la_imagen(self):
+        respuesta = self.client.post(reverse('editar_producto', args=[self.otro.pk]), {
+            'talla': 'M', 'imagen': self._imagen(),
+        })
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self._archivos(), [])
+        self.otro.refresh_from_db()
+        self.assertEqual(self.otro.talla.nombre, 'L')
+
+    def test_agregar_con_imagen(self):
+        respuesta = self.client.post(reverse('agregar_producto'), {
+            'tipo': 'Camisa', 'talla': 'S', 'color': 'Azul', 'precio': 10, 'cantidad': 1,
+            'imagen': self._imagen(),
+        })
+
+        producto = Producto.objects.get(pk=respuesta.json()['producto_id'])
+        self.assertTrue(producto.imagen.name.startswith('productos/'))
+        self.assertTrue(producto.imagen_variantes)
+        self.assertIn(os.path.basename(producto.imagen.name), self._archivos())
@@ -8,71 +8,35 @@ disponibles para los usuarios con rol de almacenista, incluyendo:
 - Gestión de tipos, tallas, colores, centros y programas
 """
 
-import os
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from core.models import Producto, Solicitud, TipoProducto, Talla, Color, CentroFormacion, Programa
+from core.estados import transicionar, transicionar_lote
+from core import catalogo, contadores, imagenes, versiones
+from core.paginacion import paginar_keyset
+from core.notificaciones import notificar, notificar_lote
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import condition, require_POST
+from django.utils.cache import patch_cache_control
 from django.conf import settings
 from django.urls import reverse
-import pdfkit
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.template.loader import render_to_string
+from django.db import IntegrityError, transaction
 
 import json
 
 
-# Configuración de wkhtmltopdf en PythonAnywhere
-PDFKIT_CONFIG = pdfkit.configuration(wkhtmltopdf='/usr/bin/wkhtmltopdf')
-
-
-def generar_factura_pdf_bytes(solicitud):
-    # Usar la ruta absoluta del archivo de la imagen
-    producto_abs_path = solicitud.id_producto.imagen.path
-
-    # Renderizar HTML con la ruta absoluta
-    html_factura = render_to_string('core/factura.html', {
-        's': solicitud,
-        'total': solicitud.cantidad * solicitud.id_producto.precio,
-        'producto_abs_path': producto_abs_path,
-    })
-
-    try:
-        options = {
-            'enable-local-file-access': '',
-            'orientation': 'Landscape',
-            'margin-top': '0mm',
-            'margin-bottom': '0mm',
-            'margin-left': '0mm',
-            'margin-right': '0mm',
-            'page-size': 'Letter',          # o 'A4', da igual
-            'disable-smart-shrinking': '',  # evita que achique el contenido
-            'zoom': '1.0',                  # asegura escala real
-            'print-media-type': '',         # aplica los estilos @page y @media print
-        }
-
-        # Generar PDF en memoria
-        pdf_bytes = pdfkit.from_string(html_factura, False, configuration=PDFKIT_CONFIG, options=options)
-        return pdf_bytes
-
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise e
-
-
-
-        
 @login_required
 def dashboard_almacenista(request):
     """
     Vista del panel principal del almacenista.
     
-    Verifica que el usuario tenga rol de administrador o almacenista.
+    Verifica que el usuario tenga rol de administrador o almacenista y
+    muestra cuántas solicitudes esperan aprobación o despacho.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -82,19 +46,27 @@ def dashboard_almacenista(request):
     """
     if request.user.rol is None or request.user.rol.nombre_rol not in ["administrador", "almacenista"]:
         return redirect(reverse("acceso_denegado"))
-    return render(request, "almacenista/dashboard_almacenista.html")
+    return render(request, "almacenista/dashboard_almacenista.html", {
+        "conteos": contadores.resumen(["pendiente", "aprobada"]),
+    })
 
 
 import json
 from django.core.serializers.json import DjangoJSONEncoder
 
+# Tablas que se muestran en la administración de productos
+TABLAS_PRODUCTOS = ('productos', versiones.STOCK, 'tipos', 'tallas', 'colores')
+
+
 @login_required
 def administrar_productos(request):
     """
     Vista para administrar productos del inventario.
     
     Muestra todos los productos con sus tipos, tallas, colores y stock disponible.
-    Proporciona datos en formato JSON para uso con JavaScript.
+    La tabla y las listas de opciones del formulario se renderizan una vez
+    por versión de esas tablas (ver core.versiones) y se reutilizan desde la
+    caché. Proporciona datos en formato JSON para uso con JavaScript.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -102,16 +74,27 @@ def administrar_productos(request):
     Returns:
         HttpResponse: Renderiza la página de administración de productos
     """
-    productos = Producto.objects.order_by('stock')
-    tipos = list(TipoProducto.objects.all().values('id_tipo', 'nombre'))
-    tallas = list(Talla.objects.all().values('id_talla', 'nombre'))
-    colores = list(Color.objects.all().values('id_color', 'nombre'))
+    # La tabla y las listas de opciones se guardan como fragmentos por
+    # versión de las tablas que muestran; las consultas son perezosas y solo
+    # se ejecutan si el fragmento no está guardado
+    leidas = versiones.obtener(*TABLAS_PRODUCTOS)
+    opciones = {nombre: leidas[nombre] for nombre in ('tipos', 'tallas', 'colores')}
+    productos = Producto.objects.select_related('tipo', 'talla', 'color').order_by('stock')
+    tipos_obj = catalogo.todos(TipoProducto)
+    tallas_obj = catalogo.todos(Talla)
+    colores_obj = catalogo.todos(Color)
+    tipos = [{'id_tipo': t.id_tipo, 'nombre': t.nombre} for t in tipos_obj]
+    tallas = [{'id_talla': t.id_talla, 'nombre': t.nombre} for t in tallas_obj]
+    colores = [{'id_color': c.id_color, 'nombre': c.nombre} for c in colores_obj]
 
     return render(request, 'almacenista/administracion_productos.html', {
         'productos': productos,
-        'tipos': TipoProducto.objects.all(),
-        'tallas': Talla.objects.all(),
-        'colores': Color.objects.all(),
+        'tipos': TipoProducto.objects.order_by('pk'),
+        'tallas': Talla.objects.order_by('pk'),
+        'colores': Color.objects.order_by('pk'),
+        'version_productos': versiones.etiqueta(leidas),
+        'version_opciones': versiones.etiqueta(opciones),
+        'fragmentos_ttl': getattr(settings, 'FRAGMENTOS_CACHE_TTL', 3600),
         'MEDIA_URL': settings.MEDIA_URL,
         'tipos_json': json.dumps(tipos, cls=DjangoJSONEncoder),
         'tallas_json': json.dumps(tallas, cls=DjangoJSONEncoder),
@@ -197,30 +180,31 @@ def agregar_producto(request):
             return JsonResponse({'status': 'error', 'message': 'Faltan datos'}, status=400)
 
         # Crear o recuperar los objetos relacionados
-        tipo_obj, _ = TipoProducto.objects.get_or_create(nombre=tipo_nombre)
-        talla_obj, _ = Talla.objects.get_or_create(nombre=talla_nombre)
-        color_obj, _ = Color.objects.get_or_create(nombre=color_nombre)
-
-        # Guardar la imagen
-        imagen_ruta = ''
-        if imagen_file:
-            carpeta = os.path.join(settings.MEDIA_ROOT, 'productos')
-            os.makedirs(carpeta, exist_ok=True)
-            ruta_completa = os.path.join(carpeta, imagen_file.name)
-            with open(ruta_completa, 'wb+') as f:
-                for chunk in imagen_file.chunks():
-                    f.write(chunk)
-            imagen_ruta = f'productos/{imagen_file.name}'
-
-        producto = Producto.objects.create(
-            tipo=tipo_obj,
-            precio=precio,
-            talla=talla_obj,
-            color=color_obj,
-            stock=stock,
-            imagen=imagen_ruta,
-            almacenista=request.user
-        )
+        tipo_obj = catalogo.obtener_o_crear(TipoProducto, tipo_nombre)
+        talla_obj = catalogo.obtener_o_crear(Talla, talla_nombre)
+        color_obj = catalogo.obtener_o_crear(Color, color_nombre)
+
+        # La imagen se escribe después de insertar la fila, para que un
+        # producto repetido no deje archivos sin producto
+        try:
+            with transaction.atomic():
+                producto = Producto.objects.create(
+                    tipo=tipo_obj,
+                    precio=precio,
+                    talla=talla_obj,
+                    color=color_obj,
+                    stock=stock,
+                    almacenista=request.user
+                )
+                if imagen_file:
+                    # Guardar la imagen con sus miniaturas
+                    producto.imagen = imagenes.guardar_original(imagen_file)
+                    producto.imagen_variantes = imagenes.generar_variantes(producto.imagen.name)
+                    producto.save(update_fields=['imagen', 'imagen_variantes'])
+        except IntegrityError:
+            return JsonResponse({'status': 'error', 'message': 'Ya existe un producto con ese tipo, talla y color'}, status=400)
+        except OSError:
+            return JsonResponse({'status': 'error', 'message': 'El archivo no es una imagen válida'}, status=400)
 
         return JsonResponse({'status': 'ok', 'producto_id': producto.id_producto})
 
@@ -256,20 +240,137 @@ TABLAS = {
     "colores":   Color,
 }
 
+# Registros por página del listado de tablas
+TAMANO_PAGINA_TABLAS = 100
+TAMANO_MAXIMO_TABLAS = 500
+
+
+def _entero(valor, defecto):
+    """
+    Convierte un parámetro de la URL en entero.
+
+    Args:
+        valor: Texto recibido (None si falta)
+        defecto: Valor si falta o no es un entero
+
+    Returns:
+        int: Valor convertido
+    """
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return defecto
+
+
+def _version_tabla(request):
+    """
+    Retorna la versión de la tabla pedida, leída una vez por request.
+
+    Args:
+        request: Objeto HttpRequest con el parámetro tabla
+
+    Returns:
+        dict: Versiones retornadas por core.versiones.obtener, o None si la
+        tabla no es válida
+    """
+    if not hasattr(request, "_version_tabla"):
+        tabla = request.GET.get("tabla")
+        request._version_tabla = versiones.obtener(tabla) if tabla in TABLAS else None
+    return request._version_tabla
+
+
+def _etag_tabla(request):
+    """
+    Retorna el ETag del listado de la tabla pedida.
+
+    Args:
+        request: Objeto HttpRequest con el parámetro tabla
+
+    Returns:
+        str: Huella de la versión de la tabla, o None si la tabla no es válida
+    """
+    version = _version_tabla(request)
+    return versiones.etiqueta(version) if version else None
+
+
+def _modificacion_tabla(request):
+    """
+    Retorna la fecha del último cambio de la tabla pedida.
+
+    Args:
+        request: Objeto HttpRequest con el parámetro tabla
+
+    Returns:
+        datetime: Fecha del último cambio, o None si la tabla no es válida
+    """
+    version = _version_tabla(request)
+    return versiones.ultima_modificacion(version) if version else None
+
+
+@condition(etag_func=_etag_tabla, last_modified_func=_modificacion_tabla)
 def listado_tablas(request):
+    """
+    Vista que lista los registros de una tabla de catálogo.
+
+    Los registros se ordenan por clave primaria y se paginan con los
+    parámetros page (desde 1) y size (hasta TAMANO_MAXIMO_TABLAS). La
+    respuesta lleva la versión de la tabla como ETag y se responde 304 si
+    no cambió. Con since=<versión> el JSON solo trae los registros creados
+    o modificados después de esa versión y los IDs de los eliminados; si
+    esa versión ya no se puede comparar se envía la tabla completa con
+    "completo": true.
+
+    Args:
+        request: Objeto HttpRequest con los parámetros tabla, fmt (json o
+            html), page, size y since
+
+    Returns:
+        JsonResponse | HttpResponse: Página de registros en JSON o como
+        filas de tabla HTML, 400 si la tabla no es válida o 304 si no cambió
+    """
     tabla = request.GET.get("tabla")
     modelo = TABLAS.get(tabla)
     if not modelo:
         return JsonResponse({"error": "Tabla no válida"}, status=400)
 
-    registros = modelo.objects.all()
-
-    if request.GET.get("fmt") == "html":
-        html = render_to_string("almacenista/_tbody_fragment.html", {"objetos": registros})
-        return HttpResponse(html)
-
-    data = [{"id": obj.pk, "nombre": obj.nombre} for obj in registros]
-    return JsonResponse({"items": data})
+    # La versión se lee antes que los registros (ver core.versiones)
+    version = _version_tabla(request)[tabla][0]
+    registros = modelo.objects.order_by("pk")
+    html = request.GET.get("fmt") == "html"
+
+    eliminados = []
+    completo = True
+    desde = _entero(request.GET.get("since"), 0)
+    if not html and 0 < desde <= version:
+        cambiados = versiones.cambios(tabla, desde)
+        if cambiados is not None:
+            completo = False
+            registros = registros.filter(pk__in=cambiados)
+            existentes = set(registros.values_list("pk", flat=True))
+            eliminados = sorted(cambiados - existentes)
+
+    tamano = min(max(_entero(request.GET.get("size"), TAMANO_PAGINA_TABLAS), 1), TAMANO_MAXIMO_TABLAS)
+    total = registros.count()
+    paginas = max((total + tamano - 1) // tamano, 1)
+    pagina = min(max(_entero(request.GET.get("page"), 1), 1), paginas)
+    objetos = list(registros[(pagina - 1) * tamano:pagina * tamano])
+
+    if html:
+        respuesta = HttpResponse(render_to_string("almacenista/_tbody_fragment.html", {"objetos": objetos}))
+    else:
+        respuesta = JsonResponse({
+            "tabla": tabla,
+            "version": version,
+            "completo": completo,
+            "pagina": pagina,
+            "paginas": paginas,
+            "total": total,
+            "items": [{"id": obj.pk, "nombre": obj.nombre} for obj in objetos],
+            "eliminados": eliminados,
+        })
+    # El navegador guarda la respuesta pero la revalida en cada consulta
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
 
 
 @require_POST
@@ -372,14 +473,11 @@ def editar_producto(request, producto_id):
 
         # Actualizar FK usando get_or_create con nombre
         if tipo_nombre:
-            tipo_obj, _ = TipoProducto.objects.get_or_create(nombre=tipo_nombre)
-            producto.tipo = tipo_obj
+            producto.tipo = catalogo.obtener_o_crear(TipoProducto, tipo_nombre)
         if talla_nombre:
-            talla_obj, _ = Talla.objects.get_or_create(nombre=talla_nombre)
-            producto.talla = talla_obj
+            producto.talla = catalogo.obtener_o_crear(Talla, talla_nombre)
         if color_nombre:
-            color_obj, _ = Color.objects.get_or_create(nombre=color_nombre)
-            producto.color = color_obj
+            producto.color = catalogo.obtener_o_crear(Color, color_nombre)
 
         # Actualizar stock y precio
         if stock:
@@ -393,17 +491,25 @@ def editar_producto(request, producto_id):
             except ValueError:
                 pass
 
-        # Actualizar imagen si se envía
-        if imagen_file:
-            carpeta = os.path.join(settings.MEDIA_ROOT, 'productos')
-            os.makedirs(carpeta, exist_ok=True)
-            ruta_completa = os.path.join(carpeta, imagen_file.name)
-            with open(ruta_completa, 'wb+') as f:
-                for chunk in imagen_file.chunks():
-                    f.write(chunk)
-            producto.imagen = f'productos/{imagen_file.name}'
-
-        producto.save()
+        # Actualizar imagen si se envía; se escribe después de guardar los
+        # demás campos, para que un producto repetido no deje archivos sin
+        # producto
+        imagen_anterior = producto.imagen.name if producto.imagen else ''
+        try:
+            with transaction.atomic():
+                producto.save()
+                if imagen_file:
+                    producto.imagen = imagenes.guardar_original(imagen_file)
+                    producto.imagen_variantes = imagenes.generar_variantes(producto.imagen.name)
+                    producto.save(update_fields=['imagen', 'imagen_variantes'])
+        except IntegrityError:
+            return JsonResponse({'status': 'error', 'message': 'Ya existe un producto con ese tipo, talla y color'}, status=400)
+        except OSError:
+            return JsonResponse({'status': 'error', 'message': 'El archivo no es una imagen válida'}, status=400)
+
+        # Eliminar la imagen reemplazada si ningún otro producto la usa
+        if imagen_anterior and imagen_anterior != producto.imagen.name:
+            transaction.on_commit(lambda: imagenes.liberar(imagen_anterior))
         return JsonResponse({'status': 'ok', 'producto_id': producto.id_producto})
 
     return JsonResponse({'status': 'error', 'message': 'Método no permitido'}, status=405)
@@ -417,7 +523,11 @@ from django.db.models import ProtectedError
 def eliminar_producto(request, producto_id):
     try:
         producto = get_object_or_404(Producto, id_producto=producto_id)
+        imagen = producto.imagen.name if producto.imagen else ''
         producto.delete()
+        # Eliminar la imagen si era el último producto que la usaba
+        if imagen:
+            transaction.on_commit(lambda: imagenes.liberar(imagen))
         return JsonResponse({
             'status': 'ok',
             'message': 'Producto eliminado correctamente'
@@ -434,8 +544,9 @@ def solicitudes_inventario(request):
     """
     Vista para mostrar las solicitudes pendientes de revisión.
     
-    Muestra todas las solicitudes que no están canceladas, despachadas,
-    rechazadas o entregadas, ordenadas por fecha de solicitud.
+    Muestra las solicitudes pendientes y aprobadas (las que aún requieren
+    acción del almacenista), ordenadas por fecha de solicitud y paginadas
+    por cursor.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -446,12 +557,12 @@ def solicitudes_inventario(request):
     solicitudes = ( 
     Solicitud.objects
     .select_related("id_aprendiz", "id_producto")
-    .exclude(estado_solicitud__in=["cancelada", "despachada", "rechazada", "borrador", "entregada"])
+    .filter(estado_solicitud__in=["pendiente", "aprobada"])
     )
     
-    # ordenar por fecha de solicitud
-    solicitudes = solicitudes.order_by("-fecha_solicitud")
-    return render(request, 'almacenista/Solicitudes_inventario.html', {"solicitudes": solicitudes})
+    # paginar por fecha de solicitud (más recientes primero)
+    pagina = paginar_keyset(solicitudes, request)
+    return render(request, 'almacenista/Solicitudes_inventario.html', {"solicitudes": pagina, "pagina": pagina})
 
 
 @login_required
@@ -460,7 +571,7 @@ def rechazar_solicitud(request, solicitud_id):
     Vista para rechazar una solicitud pendiente.
     
     Cambia el estado de la solicitud a "rechazada", devuelve el stock
-    al inventario y envía un correo de notificación al aprendiz.
+    al inventario y notifica al aprendiz.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -471,45 +582,12 @@ def rechazar_solicitud(request, solicitud_id):
     """
     solicitud = get_object_or_404(Solicitud, id_solicitud=solicitud_id)
 
-    if solicitud.estado_solicitud == "pendiente":
-        solicitud.estado_solicitud = "rechazada"
-        solicitud.save()
-
-    # Contenido texto del correo
-    text_content = (
-        f"Hola {solicitud.id_aprendiz.get_full_name() or solicitud.id_aprendiz.username},\n\n"
-        f"Lo sentimos, tu solicitud con el ID: #{solicitud.id_solicitud} ha sido rechazada.\n\n"
-        f"Si deseas hacer un nuevo pedido, créalo desde nuestro sitio web.\n\n"
-        f"https://joan2004s.pythonanywhere.com/ \n\n"
-        f"Saludos,\nEl equipo de Dotapp"
-    )
-
-    # Contenido HTML del correo
-    html_content = f"""
-    <html>
-    <body style="font-family:Arial,Helvetica,sans-serif; background:#f7f7f7; padding:20px;">
-        <div style="max-width:600px; margin:auto; background:white; border-radius:10px; overflow:hidden; box-shadow:0 4px 12px rgba(0,0,0,.1);">
-            <div style="padding:20px;">
-                Hola {solicitud.id_aprendiz.get_full_name() or solicitud.id_aprendiz.username},<br><br>
-                Lo sentimos, tu solicitud con el ID: #{solicitud.id_solicitud} ha sido rechazada.<br>
-                Si deseas hacer un nuevo pedido, créalo desde nuestro sitio web.<br><br>
-                <a href="https://joan2004s.pythonanywhere.com/">Dotapp</a><br><br>
-                Saludos,<br>El equipo de Dotapp
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    msg = EmailMultiAlternatives(
-        'Solicitud rechazada - Dotapp',
-        text_content,
-        'dotappsena@gmail.com',
-        [solicitud.id_aprendiz.correo],
-    )
-    msg.attach_alternative(html_content, "text/html")
+    with transaction.atomic():
+        if not transicionar(solicitud, "rechazar"):
+            messages.warning(request, "La solicitud ya no está pendiente.")
+            return redirect("solicitudes-inventario")
 
-    msg.send(fail_silently=False)
+        notificar(solicitud)
 
     messages.success(request, "Solicitud rechazada exitosamente.")
 
@@ -521,7 +599,8 @@ def aprobar_solicitud(request, solicitud_id):
     """
     Vista para aprobar una solicitud pendiente.
     
-    Cambia el estado de la solicitud de "pendiente" a "aprobada".
+    Cambia el estado de la solicitud de "pendiente" a "aprobada" y notifica
+    al aprendiz; la factura se genera y se adjunta al enviar el correo.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -532,61 +611,10 @@ def aprobar_solicitud(request, solicitud_id):
     """
     solicitud = get_object_or_404(Solicitud, id_solicitud=solicitud_id)
 
-    if solicitud.estado_solicitud == "pendiente":
-        solicitud.estado_solicitud = "aprobada"
-        solicitud.save()
-
-        try:
-            # 🧾 Generar el PDF de la factura
-            pdf_bytes = generar_factura_pdf_bytes(solicitud)
-        except Exception as e:
-            messages.error(request, f"Error al generar la factura: {e}")
-            return redirect("solicitudes-inventario")
-
-        # ✉️ Contenido HTML del correo
-        html_content = f"""
-        <html>
-        <body style="font-family:Arial,Helvetica,sans-serif; background:#f7f7f7; padding:20px;">
-            <div style="max-width:600px; margin:auto; background:white; border-radius:10px; overflow:hidden; box-shadow:0 4px 12px rgba(0,0,0,.1);">
-                <div style="padding:20px;">
-                    <p>Hola <strong>{solicitud.id_aprendiz.get_full_name()}</strong>,</p>
-                    <p>Felicidades, tu solicitud con el ID: <strong>#{solicitud.id_solicitud}</strong> ha sido aprobada.</p>
-                    <p>Adjunto encontrarás tu factura electrónica.</p>
-                    <p>Puedes revisar los detalles en nuestra página web:</p>
-                    <a href="https://joan2004s.pythonanywhere.com/">Dotapp</a>
-                    <p>Saludos,<br>El equipo de Dotapp</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Versión texto plano
-        text_content = (
-            f"Hola {solicitud.id_aprendiz.get_full_name()},\n\n"
-            f"Felicidades, tu solicitud con el ID: #{solicitud.id_solicitud} ha sido aprobada.\n"
-            f"Adjunto encontrarás tu factura electrónica.\n\n"
-            f"Consulta más detalles en nuestra página web:\n"
-            f"https://joan2004s.pythonanywhere.com/\n\n"
-            f"Saludos,\nEl equipo de Dotapp"
-        )
-
-        # Crear correo
-        msg = EmailMultiAlternatives(
-            'Solicitud aprobada - Dotapp',
-            text_content,
-            'dotappsena@gmail.com',
-            [solicitud.id_aprendiz.correo],
-        )
-        msg.attach_alternative(html_content, "text/html")
-        msg.attach(f'factura_{solicitud.id_solicitud}.pdf', pdf_bytes, 'application/pdf')
-
-        try:
-            # Enviar correo
-            msg.send(fail_silently=False)
+    with transaction.atomic():
+        if transicionar(solicitud, "aprobar"):
+            notificar(solicitud)
             messages.success(request, "Solicitud aprobada exitosamente y factura enviada al aprendiz.")
-        except Exception as e:
-            messages.error(request, f"La solicitud fue aprobada, pero no se pudo enviar el correo: {e}")
 
     return redirect("solicitudes-inventario")
 
@@ -597,7 +625,7 @@ def despachar_solicitud(request, solicitud_id):
     Vista para despachar una solicitud aprobada.
     
     Cambia el estado de la solicitud de "aprobada" a "despachada"
-    y envía un correo de notificación al aprendiz.
+    y notifica al aprendiz.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -608,48 +636,69 @@ def despachar_solicitud(request, solicitud_id):
     """
     solicitud = get_object_or_404(Solicitud, id_solicitud=solicitud_id)
 
-    if solicitud.estado_solicitud == "aprobada":
-        solicitud.estado_solicitud = "despachada"
-        solicitud.save()
-
-    # Contenido texto opcional del correo
-    text_content = (
-        f'Hola {solicitud.id_aprendiz.get_full_name() or solicitud.id_aprendiz.username},\n\n'
-        f'Tu solicitud con el ID: #{solicitud.id_solicitud} ya fué despachada.\n'
-        f'Puedes pasar a recogerla en tu centro de formación.\n\n'
-        f'Si tienes dudas, puedes revisar todos los detalles en nuestra pagina web.\n\n'
-        f'https://joan2004s.pythonanywhere.com/ \n\n'
-        f'Muchas gracias por tu paciencia.\n\n'
-        f'Saludos,\nEl equipo de Dotapp'
-    )
+    with transaction.atomic():
+        if not transicionar(solicitud, "despachar"):
+            messages.warning(request, "La solicitud ya no está aprobada.")
+            return redirect("solicitudes-inventario")
 
-    # Contenido HTML del correo
-    html_content = f"""
-    <html>
-    <body style="font-family:Arial,Helvetica,sans-serif; background:#f7f7f7; padding:20px;">
-        <div style="max-width:600px; margin:auto; background:white; border-radius:10px; overflow:hidden; box-shadow:0 4px 12px rgba(0,0,0,.1);">
-            <div style="padding:20px;">
-                Hola {solicitud.id_aprendiz.get_full_name() or solicitud.id_aprendiz.username},<br><br>
-                Tu solicitud con el ID: #{solicitud.id_solicitud} ha sido despachada.<br>
-                Si tienes dudas, puedes revisar todos los detalles en nuestra pagina web.<br><br>
-                <a href="https://joan2004s.pythonanywhere.com/">Dotapp</a><br><br>
-                Saludos,<br>El equipo de Dotapp
-            </div>
-        </div>
-    </body>
-    </html>
+        notificar(solicitud)
+
+    messages.success(request, "Solicitud despachada exitosamente.")
+
+    return redirect("solicitudes-inventario")
+
+
+# Acciones disponibles en la cola del almacenista
+ACCIONES_MASIVAS = {
+    "aprobar": "aprobadas",
+    "rechazar": "rechazadas",
+    "despachar": "despachadas",
+}
+
+
+@require_POST
+@login_required
+def accion_masiva_solicitudes(request):
     """
+    Vista para aprobar, rechazar o despachar varias solicitudes a la vez.
+    
+    Solo para administradores y almacenistas. Recibe la acción y la lista de
+    id_solicitud seleccionadas en la cola del almacenista. Todas las
+    transiciones se aplican en una sola transacción con UPDATEs por lote, y
+    las notificaciones se registran en esa misma transacción con un único
+    INSERT.
+    
+    Args:
+        request: Objeto HttpRequest con 'accion' e 'ids' (POST)
+        
+    Returns:
+        HttpResponseRedirect: Redirige a la página de solicitudes de
+        inventario, o a acceso denegado si no tiene permisos
+    """
+    if request.user.rol is None or request.user.rol.nombre_rol not in ["administrador", "almacenista"]:
+        return redirect(reverse("acceso_denegado"))
 
-    msg = EmailMultiAlternatives(
-        'Solicitud despachada - Dotapp',
-        text_content,
-        'dotappsena@gmail.com',
-        [solicitud.id_aprendiz.correo],
-    )
-    msg.attach_alternative(html_content, "text/html")
+    accion = request.POST.get("accion")
+    if accion not in ACCIONES_MASIVAS:
+        messages.error(request, "Acción no válida.")
+        return redirect("solicitudes-inventario")
 
-    msg.send(fail_silently=False)
+    ids = [int(i) for i in request.POST.getlist("ids") if i.isdigit()]
+    if not ids:
+        messages.warning(request, "Selecciona al menos una solicitud.")
+        return redirect("solicitudes-inventario")
 
-    messages.success(request, "Solicitud despachada exitosamente.")
+    with transaction.atomic():
+        movidas = transicionar_lote(ids, accion)
+
+        notificar_lote(movidas)
 
-    return redirect("solicitudes-inventario")
\ No newline at end of file
+    if not movidas:
+        messages.warning(request, "Ninguna de las solicitudes seleccionadas podía cambiar de estado.")
+        return redirect("solicitudes-inventario")
+
+    messages.success(request, f"{len(movidas)} solicitud(es) {ACCIONES_MASIVAS[accion]} exitosamente.")
+    if len(movidas) < len(ids):
+        messages.info(request, f"{len(ids) - len(movidas)} solicitud(es) ya no estaban en un estado válido y se omitieron.")
+
+    return redirect("solicitudes-inventario")
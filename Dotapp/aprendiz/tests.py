@@ -1,3 +1,99 @@
+from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core import versiones
+from core.inventario import reservar_stock
+from core.models import CentroFormacion, Color, Producto, Programa, Solicitud, Talla, TipoProducto, Usuario
+
+
+class CrearSolicitudTests(TestCase):
+    """
+    Pruebas de la reserva de stock al crear una solicitud.
+    """
+
+    def setUp(self):
+        tipo = TipoProducto.objects.create(nombre='Camisa')
+        talla = Talla.objects.create(nombre='M')
+        color = Color.objects.create(nombre='Azul')
+        self.centro = CentroFormacion.objects.create(nombre='Centro 1')
+        self.programa = Programa.objects.create(nombre='Programa 1', centro=self.centro)
+        self.producto = Producto.objects.create(tipo=tipo, talla=talla, color=color, precio=10, stock=5)
+        self.aprendiz = Usuario.objects.create_user('Ana', 'Pérez', 'ana@ejemplo.co', 'clave12345')
+        self.client.force_login(self.aprendiz)
+
+    def _crear(self, cantidad):
+        return self.client.post(reverse('crear_solicitud'), {
+            'tipo': 'Camisa', 'talla': 'M', 'color': 'Azul', 'cantidad': cantidad,
+            'centro': self.centro.pk, 'programa': self.programa.pk,
+        })
+
+    def test_reserva_el_stock_al_crear(self):
+        respuesta = self._crear(3)
+
+        self.assertRedirects(respuesta, reverse('historial-solicitudes'), fetch_redirect_response=False)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 2)
+        self.assertEqual(Solicitud.objects.get().cantidad, 3)
+
+    def test_stock_insuficiente_informa_el_stock_actual(self):
+        self._crear(3)
+
+        respuesta = self._crear(3)
+
+        self.assertRedirects(respuesta, reverse('solicitud-uniforme'), fetch_redirect_response=False)
+        self.assertIn('Solo quedan 2 unidad(es)', [str(m) for m in get_messages(respuesta.wsgi_request)][-1])
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 2)
+        self.assertEqual(Solicitud.objects.count(), 1)
+
+
+class VersionesCatalogoTests(TestCase):
+    """
+    Pruebas de las respuestas 304 del catálogo, el stock y los programas.
+    """
+
+    def setUp(self):
+        tipo = TipoProducto.objects.create(nombre='Camisa')
+        talla = Talla.objects.create(nombre='M')
+        color = Color.objects.create(nombre='Azul')
+        self.centro = CentroFormacion.objects.create(nombre='Centro 1')
+        Programa.objects.create(nombre='Programa 1', centro=self.centro)
+        self.producto = Producto.objects.create(tipo=tipo, talla=talla, color=color, precio=10, stock=5)
+        self.client.force_login(Usuario.objects.create_user('Ana', 'Pérez', 'ana@ejemplo.co', 'clave12345'))
+        # Las versiones leídas en otras pruebas pueden seguir en la caché
+        cache.delete_many([versiones._clave(nombre) for nombre in [*versiones.TABLAS.values(), versiones.STOCK]])
+
+    def _etag(self, url, **parametros):
+        respuesta = self.client.get(url, parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta['ETag']
+
+    def test_misma_version_responde_304(self):
+        for url in (reverse('catalogo-solicitud'), reverse('stock-solicitud')):
+            etag = self._etag(url)
+
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(respuesta.status_code, 304, url)
+
+    def test_programas_responde_304(self):
+        url = reverse('ajax_programas_por_centro')
+        etag = self._etag(url, centro_id='todos')
+
+        respuesta = self.client.get(url, {'centro_id': 'todos'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_reserva_cambia_el_stock_y_no_el_catalogo(self):
+        catalogo = self._etag(reverse('catalogo-solicitud'))
+        stock = self._etag(reverse('stock-solicitud'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservar_stock(self.producto.pk, 1)
+
+        self.assertEqual(self._etag(reverse('catalogo-solicitud')), catalogo)
+        respuesta = self.client.get(reverse('stock-solicitud'), HTTP_IF_NONE_MATCH=stock)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['stock'], {str(self.producto.pk): 4})
@@ -8,10 +8,13 @@ urlpatterns = [
     path("perfil/", views.perfil, name="perfil-aprendiz"),
     path('perfil/actualizar/', views.actualizar_perfil, name='actualizar_perfil'),
     path("solicitud_uniforme/", views.solicitud_uniforme, name="solicitud-uniforme"),
+    path("catalogo/", views.catalogo_solicitud, name="catalogo-solicitud"),
+    path("catalogo/stock/", views.stock_solicitud, name="stock-solicitud"),
     path("historial_solicitudes/", views.historial_solicitudes, name="historial-solicitudes"),
     path("crear-solicitud/", views.crear_solicitud, name="crear_solicitud"),
     path("guardar-borrador/", views.guardar_borrador, name="guardar_borrador"),
     path("cancelar/<int:solicitud_id>/", views.cancelar_solicitud, name="cancelar-solicitud"),
+    path("factura/<int:solicitud_id>/", views.descargar_factura, name="descargar-factura"),
     path('ajax/programas_por_centro/', views.ajax_programas_por_centro, name='ajax_programas_por_centro'),
 ]
 
@@ -34,6 +34,17 @@ from io import BytesIO
 import imgkit
 from PIL import Image, ImageDraw, ImageFont   # solo si la usas para otra cosa
 from core.models import Solicitud, Producto, Borrador, TipoProducto, Talla, Color, CentroFormacion, Programa
+from core.inventario import reservar_stock, StockInsuficiente
+from core.estados import transicionar
+from core.notificaciones import notificar
+from core.facturas import obtener_factura
+from django.http import FileResponse
+from core import catalogo, contadores, programas, versiones
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from core.paginacion import paginar_keyset
+from django.db import transaction
 
 
 
@@ -150,14 +161,23 @@ def actualizar_perfil(request):
     return render(request, 'perfil.html', {'usuario': usuario})
 
 
+# Tablas que se muestran en el carrusel de productos
+TABLAS_CARRUSEL = ("productos", "tipos", "tallas", "colores")
+
+
 @login_required
 def solicitud_uniforme(request):
     """
     Vista para crear una nueva solicitud de uniforme.
     
-    Muestra el formulario de creación de solicitud con todos los productos
-    disponibles, tipos, tallas, colores, centros y programas. Si el usuario
-    tiene un borrador guardado, lo carga automáticamente.
+    Muestra el carrusel de productos y el formulario de solicitud. El
+    carrusel se renderiza una vez por versión de productos, tipos, tallas y
+    colores y se reutiliza desde la caché; no incluye el stock, que el
+    navegador carga de stock_solicitud para ocultar los productos agotados,
+    así que los pedidos no lo invalidan. Las opciones de tipo, talla,
+    color, centro y programa tampoco se renderizan aquí: el formulario las
+    carga de catalogo_solicitud, que el navegador revalida con su ETag. Si
+    el usuario tiene un borrador guardado, lo carga automáticamente.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -166,41 +186,275 @@ def solicitud_uniforme(request):
         HttpResponse: Renderiza el formulario de creación de solicitud
     """
     borrador = Borrador.objects.filter(aprendiz=request.user).first()
-    productos = Producto.objects.filter(stock__gte=1).order_by('-stock')
-    TipoProductos = TipoProducto.objects.all()
-    Tallas = Talla.objects.all()
-    Colores = Color.objects.all()
-    Centros = CentroFormacion.objects.all()
-    programas = Programa.objects.all()
+    # El carrusel se guarda como fragmento por versión de las tablas que
+    # muestra; la consulta es perezosa y solo se ejecuta si no está guardado
+    productos = Producto.objects.select_related('tipo', 'talla', 'color').order_by('pk')
     return render(request, 'aprendiz/creacion_solicitud.html', {
         "productos": productos,
-        "tipos": TipoProductos,
-        "tallas": Tallas,
-        "colores": Colores,
         "borrador": borrador,
-        "centros": Centros,
-        "programas": programas
+        "version_carrusel": versiones.etiqueta(versiones.obtener(*TABLAS_CARRUSEL)),
+        "fragmentos_ttl": getattr(settings, "FRAGMENTOS_CACHE_TTL", 3600),
     })
 
 
+# Tablas con las que se construye el catálogo del formulario de solicitud
+TABLAS_CATALOGO = ("tipos", "tallas", "colores", "centros", "programas", "productos")
+
+
+def _versiones_catalogo(request):
+    """
+    Retorna las versiones de las tablas del catálogo, leídas una vez por request.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        dict: Versiones retornadas por core.versiones.obtener
+    """
+    if not hasattr(request, "_versiones_catalogo"):
+        request._versiones_catalogo = versiones.obtener(*TABLAS_CATALOGO)
+    return request._versiones_catalogo
+
+
+def _etag_catalogo(request):
+    """
+    Retorna el ETag del catálogo del formulario de solicitud.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        str: Huella de las versiones de las tablas del catálogo
+    """
+    return versiones.etiqueta(_versiones_catalogo(request))
+
+
+def _modificacion_catalogo(request):
+    """
+    Retorna la fecha del último cambio del catálogo del formulario de solicitud.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        datetime: Fecha del último cambio entre las tablas del catálogo
+    """
+    return versiones.ultima_modificacion(_versiones_catalogo(request))
+
+
+def _datos_catalogo():
+    """
+    Consulta las tablas del catálogo del formulario de solicitud.
+
+    Se consulta la base de datos y no core.catalogo, cuya copia en memoria
+    puede ser más antigua que la versión leída en otro worker.
+
+    Returns:
+        dict: Tipos, tallas, colores, centros, programas y productos (sin
+        stock, ver stock_solicitud)
+    """
+    productos = (
+        Producto.objects.order_by('pk')
+        .values_list('id_producto', 'tipo__nombre', 'talla__nombre', 'color__nombre', 'precio')
+    )
+    return {
+        "tipos": list(TipoProducto.objects.order_by('pk').values('id_tipo', 'nombre')),
+        "tallas": list(Talla.objects.order_by('pk').values('id_talla', 'nombre')),
+        "colores": list(Color.objects.order_by('pk').values('id_color', 'nombre')),
+        "centros": list(CentroFormacion.objects.order_by('pk').values('id_centro', 'nombre')),
+        "programas": list(Programa.objects.order_by('pk').values('id_programa', 'nombre', 'centro_id')),
+        "productos": [
+            {
+                "id_producto": id_producto,
+                "tipo": tipo,
+                "talla": talla,
+                "color": color,
+                "precio": str(precio),
+            }
+            for id_producto, tipo, talla, color, precio in productos
+        ],
+    }
+
+
+@login_required
+@condition(etag_func=_etag_catalogo, last_modified_func=_modificacion_catalogo)
+def catalogo_solicitud(request):
+    """
+    Vista JSON con el catálogo del formulario de solicitud.
+    
+    Retorna los tipos, tallas, colores, centros, programas y productos. El
+    stock no se incluye: cambia con cada pedido y se consulta aparte en
+    stock_solicitud, así que el catálogo solo cambia con escrituras en
+    estas tablas. La respuesta lleva ETag y Last-Modified derivados de las
+    versiones de las tablas (core.versiones): si el navegador ya tiene la
+    versión actual recibe 304 sin que se consulte ninguna tabla. El
+    contenido de cada versión se guarda en la caché de Django, así que
+    solo el primer request después de un cambio consulta las tablas.
+    
+    Args:
+        request: Objeto HttpRequest del usuario autenticado
+        
+    Returns:
+        JsonResponse: Catálogo con su versión, o 304 si no cambió
+    """
+    etiqueta = _etag_catalogo(request)
+    clave = f"catalogo_solicitud:{etiqueta}"
+    datos = cache.get(clave)
+    if datos is None:
+        datos = _datos_catalogo()
+        cache.set(clave, datos, getattr(settings, "CATALOGO_JSON_TTL", 3600))
+
+    respuesta = JsonResponse({"version": etiqueta, **datos})
+    # El navegador guarda la respuesta pero la revalida en cada visita
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+# Tablas de las que depende el stock de los productos
+TABLAS_STOCK = ("productos", versiones.STOCK)
+
+
+def _versiones_stock(request):
+    """
+    Retorna las versiones de productos y stock, leídas una vez por request.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        dict: Versiones retornadas por core.versiones.obtener
+    """
+    if not hasattr(request, "_versiones_stock"):
+        request._versiones_stock = versiones.obtener(*TABLAS_STOCK)
+    return request._versiones_stock
+
+
+def _etag_stock(request):
+    """
+    Retorna el ETag del stock de los productos.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        str: Huella de las versiones de productos y stock
+    """
+    return versiones.etiqueta(_versiones_stock(request))
+
+
+def _modificacion_stock(request):
+    """
+    Retorna la fecha del último cambio del stock de los productos.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        datetime: Fecha del último cambio de productos o stock
+    """
+    return versiones.ultima_modificacion(_versiones_stock(request))
+
+
+@login_required
+@condition(etag_func=_etag_stock, last_modified_func=_modificacion_stock)
+def stock_solicitud(request):
+    """
+    Vista JSON con el stock de los productos disponibles.
+
+    Es la parte del catálogo que cambia con cada pedido, separada de
+    catalogo_solicitud para que los pedidos no invaliden el catálogo. Lleva
+    ETag y Last-Modified de las versiones de productos y stock y se responde
+    304 si no cambió.
+
+    Args:
+        request: Objeto HttpRequest del usuario autenticado
+
+    Returns:
+        JsonResponse: ID del producto (texto) -> unidades, solo de los
+        productos con stock, o 304 si no cambió
+    """
+    etiqueta = _etag_stock(request)
+    clave = f"stock_solicitud:{etiqueta}"
+    stock = cache.get(clave)
+    if stock is None:
+        stock = {
+            str(pk): unidades
+            for pk, unidades in Producto.objects.filter(stock__gte=1).values_list('id_producto', 'stock')
+        }
+        cache.set(clave, stock, getattr(settings, "CATALOGO_JSON_TTL", 3600))
+
+    respuesta = JsonResponse({"version": etiqueta, "stock": stock})
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+def _versiones_programas(request):
+    """
+    Retorna las versiones de centros y programas, leídas una vez por request.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        dict: Versiones retornadas por core.programas.obtener_versiones
+    """
+    if not hasattr(request, "_versiones_programas"):
+        request._versiones_programas = programas.obtener_versiones()
+    return request._versiones_programas
+
+
+def _etag_programas(request):
+    """
+    Retorna el ETag de los programas por centro.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        str: Huella de las versiones de centros y programas
+    """
+    return versiones.etiqueta(_versiones_programas(request))
+
+
+def _modificacion_programas(request):
+    """
+    Retorna la fecha del último cambio de centros o programas.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        datetime: Fecha del último cambio
+    """
+    return versiones.ultima_modificacion(_versiones_programas(request))
+
+
+@condition(etag_func=_etag_programas, last_modified_func=_modificacion_programas)
 def ajax_programas_por_centro(request):
     """
     Vista AJAX para obtener programas filtrados por centro de formación.
     
     Retorna una lista JSON de programas que pertenecen al centro especificado.
-    Utilizada para cargar dinámicamente los programas en el formulario.
+    Con centro_id=todos retorna los programas de todos los centros en un
+    solo mapa, para que el navegador filtre sin volver a consultar. Los
+    datos salen del mapa guardado en core.programas; la respuesta lleva
+    ETag y Cache-Control, y se responde 304 si centros y programas no han
+    cambiado.
     
     Args:
         request: Objeto HttpRequest con el parámetro centro_id
         
     Returns:
-        JsonResponse: Lista de programas en formato JSON
+        JsonResponse: Lista de programas, o mapa de todos los centros
     """
+    programas_centro = programas.mapa(_versiones_programas(request))
     centro_id = request.GET.get("centro_id")
-    programas = []
-    if centro_id:
-        programas = Programa.objects.filter(centro_id=centro_id).values("id_programa", "nombre")
-    return JsonResponse({"programas": list(programas)})
+    if centro_id == "todos":
+        respuesta = JsonResponse({"centros": programas_centro})
+    else:
+        respuesta = JsonResponse({"programas": programas_centro.get(str(centro_id), [])})
+    patch_cache_control(respuesta, public=True, max_age=getattr(settings, "PROGRAMAS_CACHE_MAX_AGE", 300))
+    return respuesta
 
 
 '''
@@ -289,12 +543,12 @@ def crear_solicitud(request):
         ficha = int(request.POST.get("ficha") or 0)
         detalles = request.POST.get("detalles") or ""
 
-        # Obtener objetos relacionados
-        tipo_obj = TipoProducto.objects.filter(nombre=tipo_str).first()
-        talla_obj = Talla.objects.filter(nombre=talla_str).first()
-        color_obj = Color.objects.filter(nombre=color_str).first()
-        centro_obj = CentroFormacion.objects.filter(id_centro=centro_id).first() if centro_id else None
-        programa_obj = Programa.objects.filter(id_programa=programa_id).first() if programa_id else None
+        # Obtener objetos relacionados desde la caché de catálogo
+        tipo_obj = catalogo.por_nombre(TipoProducto, tipo_str)
+        talla_obj = catalogo.por_nombre(Talla, talla_str)
+        color_obj = catalogo.por_nombre(Color, color_str)
+        centro_obj = catalogo.por_id(CentroFormacion, centro_id)
+        programa_obj = catalogo.por_id(Programa, programa_id)
 
         # Validaciones
         if not all([tipo_obj, talla_obj, color_obj, centro_obj, programa_obj]):
@@ -307,24 +561,31 @@ def crear_solicitud(request):
             messages.warning(request, "El producto seleccionado no está disponible.")
             return redirect("solicitud-uniforme")
 
-        if cantidad > producto.stock:
-            messages.warning(request, f"No hay suficiente stock. Solo quedan {producto.stock} unidad(es).")
+        if cantidad < 1:
+            messages.warning(request, "La cantidad debe ser mayor que cero.")
             return redirect("solicitud-uniforme")
 
-        # Crear solicitud
-        solicitud = Solicitud.objects.create(
-            id_aprendiz=request.user,
-            tipo=tipo_obj,
-            talla=talla_obj,
-            color=color_obj,
-            cantidad=cantidad,
-            detalles_adicionales=detalles,
-            centro_formacion=centro_obj,
-            programa=programa_obj,
-            ficha=ficha,
-            estado_solicitud="pendiente",
-            id_producto=producto
-        )
+        # Reservar stock y crear la solicitud en la misma transacción
+        try:
+            with transaction.atomic():
+                reservar_stock(producto.id_producto, cantidad)
+                solicitud = Solicitud.objects.create(
+                    id_aprendiz=request.user,
+                    tipo=tipo_obj,
+                    talla=talla_obj,
+                    color=color_obj,
+                    cantidad=cantidad,
+                    detalles_adicionales=detalles,
+                    centro_formacion=centro_obj,
+                    programa=programa_obj,
+                    ficha=ficha,
+                    estado_solicitud="pendiente",
+                    id_producto=producto
+                )
+                contadores.registrar_creacion(solicitud)
+        except StockInsuficiente as e:
+            messages.warning(request, f"No hay suficiente stock. Solo quedan {e.disponible} unidad(es).")
+            return redirect("solicitud-uniforme")
 
         # Eliminar borrador si existe
         Borrador.objects.filter(aprendiz=request.user).delete()
@@ -356,8 +617,8 @@ def guardar_borrador(request):
     if request.method != "POST":
         return redirect("solicitud-uniforme")
 
-    centro = CentroFormacion.objects.filter(id_centro=request.POST.get("centro")).first() if request.POST.get("centro") else None
-    programa = Programa.objects.filter(id_programa=request.POST.get("programa")).first() if request.POST.get("programa") else None
+    centro = catalogo.por_id(CentroFormacion, request.POST.get("centro"))
+    programa = catalogo.por_id(Programa, request.POST.get("programa"))
 
     Borrador.objects.update_or_create(
         aprendiz=request.user,
@@ -381,7 +642,8 @@ def historial_solicitudes(request):
     """
     Vista para mostrar el historial de solicitudes del aprendiz.
     
-    Muestra todas las solicitudes realizadas por el usuario autenticado.
+    Muestra las solicitudes realizadas por el usuario autenticado,
+    más recientes primero y paginadas por cursor.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -389,19 +651,61 @@ def historial_solicitudes(request):
     Returns:
         HttpResponse: Renderiza el historial de solicitudes
     """
-    solicitudes = Solicitud.objects.filter(id_aprendiz=request.user)
+    pagina = paginar_keyset(Solicitud.objects.filter(id_aprendiz=request.user), request)
     return render(request, "aprendiz/historial_solicitudes.html", {
-        "solicitudes": solicitudes,
+        "solicitudes": pagina,
+        "pagina": pagina,
     })
 
 
+# Estados en los que la solicitud ya tiene factura
+ESTADOS_CON_FACTURA = ("aprobada", "despachada", "entregada")
+
+
+@login_required
+def descargar_factura(request, solicitud_id):
+    """
+    Vista para descargar la factura de una solicitud aprobada.
+    
+    El PDF se toma de la caché de facturas (core.facturas), por lo que
+    volver a descargar una factura no la genera de nuevo.
+    
+    Args:
+        request: Objeto HttpRequest del usuario autenticado
+        solicitud_id: ID de la solicitud
+        
+    Returns:
+        FileResponse: Archivo PDF de la factura
+        HttpResponseRedirect: Redirige al historial si no se pudo generar
+    """
+    solicitud = get_object_or_404(
+        Solicitud.objects.select_related("id_aprendiz", "id_producto"),
+        id_solicitud=solicitud_id,
+        id_aprendiz=request.user,
+        estado_solicitud__in=ESTADOS_CON_FACTURA,
+    )
+
+    try:
+        ruta = obtener_factura(solicitud)
+    except Exception as e:
+        messages.error(request, f"No se pudo generar la factura: {e}")
+        return redirect("historial-solicitudes")
+
+    return FileResponse(
+        open(ruta, "rb"),
+        as_attachment=True,
+        filename=f"factura_{solicitud.id_solicitud}.pdf",
+        content_type="application/pdf",
+    )
+
+
 @login_required
 def cancelar_solicitud(request, solicitud_id):
     """
     Vista para cancelar una solicitud pendiente.
     
     Permite al aprendiz cancelar una solicitud que está en estado "pendiente".
-    Al cancelar, se envía un correo de notificación al aprendiz y se devuelve
+    Al cancelar, se notifica al aprendiz y se devuelve
     el stock al inventario.
     
     Args:
@@ -413,44 +717,12 @@ def cancelar_solicitud(request, solicitud_id):
     """
     solicitud = get_object_or_404(Solicitud, id_solicitud=solicitud_id, id_aprendiz=request.user)
 
-    if solicitud.estado_solicitud == "pendiente":
-        solicitud.estado_solicitud = "cancelada"
-        solicitud.save()
-
-    text_content = (
-        f"Hola {solicitud.id_aprendiz.get_full_name() or solicitud.id_aprendiz.username},\n\n"
-        f"Tu solicitud con el ID: #{solicitud.id_solicitud} ha sido cancelada.\n"
-        f"Si deseas hacer un nuevo pedido, créalo desde nuestro sitio web.\n\n"
-        f"https://joan2004s.pythonanywhere.com/\n\n"
-        f"Saludos,\nEl equipo de Dotapp"
-    )
-
-    html_content = f"""
-    <html>
-    <body style="font-family:Arial,Helvetica,sans-serif; background:#f7f7f7; padding:20px;">
-        <div style="max-width:600px; margin:auto; background:white; border-radius:10px; overflow:hidden; box-shadow:0 4px 12px rgba(0,0,0,.1);">
-            <div style="padding:20px;">
-                Hola {solicitud.id_aprendiz.get_full_name() or solicitud.id_aprendiz.username},<br><br>
-                Tu solicitud con el ID: #{solicitud.id_solicitud} ha sido cancelada.<br>
-                Si deseas hacer un nuevo pedido, créalo desde nuestro sitio web.<br><br>
-                <a href="https://joan2004s.pythonanywhere.com/">Dotapp</a><br><br>
-                Saludos,<br>El equipo de Dotapp
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    msg = EmailMultiAlternatives(
-        'Solicitud cancelada - Dotapp',
-        text_content,
-        'dotappsena@gmail.com',
-        [solicitud.id_aprendiz.correo],
-    )
-    msg.attach_alternative(html_content, "text/html")
+    with transaction.atomic():
+        if not transicionar(solicitud, "cancelar"):
+            messages.warning(request, "La solicitud ya no está pendiente.")
+            return redirect("historial-solicitudes")
 
-    # ⚡ Esto hará que Django muestre el error completo en pantalla
-    msg.send(fail_silently=False)
+        notificar(solicitud)
 
     return redirect("historial-solicitudes")
 
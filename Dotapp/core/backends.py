@@ -0,0 +1,139 @@
+"""
+Backend de autenticación del sistema DotApp SENA.
+
+Extiende ModelBackend para que el usuario de la sesión se cargue junto con
+su rol en una sola consulta y quede en caché entre requests. Las vistas
+protegidas por rol leen request.user.rol.nombre_rol en cada request; con
+este backend eso no requiere ninguna consulta adicional.
+
+La caché no guarda el hash de la contraseña: solo los demás campos del
+usuario y de su rol, y el hash de sesión con el que Django comprueba que
+la contraseña no cambió desde el inicio de sesión. El usuario se
+reconstruye con la contraseña diferida (ver Usuario.get_session_auth_hash).
+
+La entrada en caché se invalida al guardar o eliminar el usuario
+(ver core.signals), de modo que editar, desactivar o cambiar la contraseña
+de una cuenta tiene efecto en el siguiente request.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from core.models import Rol, Usuario
+
+
+def clave_usuario(user_id):
+    """
+    Retorna la clave de caché del usuario de sesión.
+
+    Args:
+        user_id: ID del usuario
+
+    Returns:
+        str: Clave de caché
+    """
+    # Prefijo distinto al de las entradas anteriores, que guardaban la
+    # instancia completa del usuario
+    return f"usuario_sesion_campos:{user_id}"
+
+
+def invalidar_usuario(user_id):
+    """
+    Elimina de la caché al usuario de sesión indicado.
+
+    Args:
+        user_id: ID del usuario
+    """
+    cache.delete(clave_usuario(user_id))
+
+
+def _campos(instancia, excluir=()):
+    """
+    Retorna los valores de los campos concretos de una instancia.
+
+    Args:
+        instancia: Instancia de un modelo
+        excluir: Nombres de campo que no se incluyen
+
+    Returns:
+        dict: attname -> valor, en el orden de los campos del modelo
+    """
+    return {
+        campo.attname: getattr(instancia, campo.attname)
+        for campo in instancia._meta.concrete_fields
+        if campo.attname not in excluir
+    }
+
+
+def _como_entrada(usuario):
+    """
+    Convierte un usuario con su rol en la entrada que se guarda en caché.
+
+    Args:
+        usuario: Usuario con su rol precargado
+
+    Returns:
+        dict: Campos del usuario sin la contraseña, campos del rol y hash
+        de sesión
+    """
+    return {
+        "usuario": _campos(usuario, excluir=("password",)),
+        "rol": _campos(usuario.rol) if usuario.rol_id else None,
+        "hash_sesion": usuario.get_session_auth_hash(),
+    }
+
+
+def _desde_entrada(entrada):
+    """
+    Reconstruye el usuario de sesión a partir de su entrada en caché.
+
+    La contraseña queda diferida: si algo la lee se consulta a la base de
+    datos, y save() no la sobrescribe.
+
+    Args:
+        entrada: Diccionario retornado por _como_entrada
+
+    Returns:
+        Usuario: Usuario con su rol precargado
+    """
+    campos = entrada["usuario"]
+    usuario = Usuario.from_db(Usuario.objects.db, list(campos), list(campos.values()))
+    if entrada["rol"]:
+        usuario.rol = Rol.from_db(Rol.objects.db, list(entrada["rol"]), list(entrada["rol"].values()))
+    usuario._hash_sesion = entrada["hash_sesion"]
+    return usuario
+
+
+class UsuarioCacheBackend(ModelBackend):
+    """
+    Backend que carga el usuario de sesión con su rol y lo guarda en caché.
+
+    La autenticación con correo y contraseña es la de ModelBackend; solo
+    cambia la forma de recuperar el usuario en cada request autenticado.
+    """
+
+    def get_user(self, user_id):
+        """
+        Retorna el usuario de la sesión, desde la caché si está disponible.
+
+        Args:
+            user_id: ID del usuario guardado en la sesión
+
+        Returns:
+            Usuario: Usuario con su rol precargado, o None si no existe
+            o no puede autenticarse
+        """
+        clave = clave_usuario(user_id)
+        entrada = cache.get(clave)
+
+        if entrada is None:
+            try:
+                usuario = Usuario.objects.select_related("rol").get(pk=user_id)
+            except Usuario.DoesNotExist:
+                return None
+            cache.set(clave, _como_entrada(usuario), getattr(settings, "USUARIO_CACHE_TTL", 300))
+        else:
+            usuario = _desde_entrada(entrada)
+
+        return usuario if self.user_can_authenticate(usuario) else None
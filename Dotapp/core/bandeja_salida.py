@@ -0,0 +1,277 @@
+"""
+Bandeja de salida de correos del sistema DotApp SENA.
+
+Enviar un correo dentro del request hace que una llamada lenta o fallida
+al proveedor de email (SendGrid) bloquee o rompa la acción del usuario.
+En su lugar, los correos se guardan en la tabla CorreoSalida con encolar(),
+dentro de la misma transacción que el cambio que notifican: si la
+transacción se revierte, el correo tampoco queda encolado. Los cambios de
+estado de las solicitudes llegan aquí agrupados por core.notificaciones.
+
+El comando enviar_correos llama a enviar_pendientes(), que toma un lote de
+correos pendientes, los envía por una sola conexión al backend de email y
+reprograma los que fallan con espera exponencial:
+
+    proximo_intento = ahora + CORREOS_REINTENTO_BASE * 2 ** (intentos - 1)
+
+Tras CORREOS_MAX_INTENTOS intentos fallidos el correo queda como fallido.
+El envío es "al menos una vez": si el proceso muere después de entregar un
+correo y antes de guardar su estado, ese correo se vuelve a enviar cuando
+vence su reclamo (CORREOS_RECLAMO_SEGUNDOS).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from core.models import CorreoSalida
+
+
+logger = logging.getLogger(__name__)
+
+
+def _configuracion(nombre, defecto):
+    """
+    Lee un parámetro de la bandeja de salida desde settings.
+
+    Args:
+        nombre: Nombre del setting
+        defecto: Valor si el setting no está definido
+
+    Returns:
+        Valor del setting o el valor por defecto
+    """
+    return getattr(settings, nombre, defecto)
+
+
+def _como_fila(mensaje, factura=None):
+    """
+    Convierte un EmailMultiAlternatives en una fila de CorreoSalida sin guardar.
+
+    Args:
+        mensaje: Mensaje construido por core.correos
+        factura: Solicitud cuya factura se adjunta al enviar (opcional)
+
+    Returns:
+        CorreoSalida: Fila lista para guardar
+    """
+    html = ""
+    for contenido, tipo in getattr(mensaje, "alternatives", []):
+        if tipo == "text/html":
+            html = contenido
+            break
+
+    return CorreoSalida(
+        asunto=mensaje.subject,
+        texto=mensaje.body,
+        html=html,
+        remitente=mensaje.from_email,
+        destinatarios=list(mensaje.to),
+        factura=factura,
+    )
+
+
+def encolar(mensaje, factura=None):
+    """
+    Guarda un correo en la bandeja de salida.
+
+    Llamar dentro de la transacción del cambio que se notifica.
+
+    Args:
+        mensaje: EmailMultiAlternatives construido por core.correos
+        factura: Solicitud cuya factura se adjunta al enviar (opcional)
+
+    Returns:
+        CorreoSalida: Correo encolado
+    """
+    correo = _como_fila(mensaje, factura)
+    correo.save()
+    return correo
+
+
+def encolar_lote(mensajes):
+    """
+    Guarda varios correos en la bandeja de salida con un solo INSERT.
+
+    Args:
+        mensajes: Lista de pares (mensaje, factura); factura puede ser None
+
+    Returns:
+        list: Correos encolados
+    """
+    return CorreoSalida.objects.bulk_create([_como_fila(m, f) for m, f in mensajes])
+
+
+def _facturas(correo):
+    """
+    Retorna las solicitudes cuya factura se adjunta a un correo.
+
+    Son la factura indicada al encolar y las de las solicitudes aprobadas
+    incluidas en el correo de resumen de notificaciones.
+
+    Args:
+        correo: Instancia de CorreoSalida con sus notificaciones precargadas
+
+    Returns:
+        list: Solicitudes sin repetir, en orden
+    """
+    solicitudes = {}
+    if correo.factura_id:
+        solicitudes[correo.factura_id] = correo.factura
+    for notificacion in correo.notificaciones.all():
+        if notificacion.estado == "aprobada":
+            solicitudes.setdefault(notificacion.solicitud_id, notificacion.solicitud)
+    return list(solicitudes.values())
+
+
+def _construir_mensaje(correo, conexion):
+    """
+    Reconstruye el EmailMultiAlternatives de un correo de la bandeja.
+
+    Si el correo tiene factura, el PDF se toma de la caché de facturas (o se
+    genera en este momento), fuera del request que aprobó la solicitud.
+
+    Args:
+        correo: Instancia de CorreoSalida
+        conexion: Conexión al backend de email
+
+    Returns:
+        EmailMultiAlternatives: Mensaje listo para enviar
+    """
+    msg = EmailMultiAlternatives(
+        correo.asunto, correo.texto, correo.remitente, correo.destinatarios, connection=conexion
+    )
+    if correo.html:
+        msg.attach_alternative(correo.html, "text/html")
+
+    facturas = _facturas(correo)
+    if facturas:
+        from core.facturas import generar_factura_pdf_bytes
+        for solicitud in facturas:
+            msg.attach(f'factura_{solicitud.id_solicitud}.pdf', generar_factura_pdf_bytes(solicitud), 'application/pdf')
+
+    return msg
+
+
+def _registrar_fallo(correo, error, momento):
+    """
+    Reprograma un correo fallido o lo marca como fallido definitivamente.
+
+    Args:
+        correo: Instancia de CorreoSalida
+        error: Excepción del intento
+        momento: Fecha y hora del intento
+    """
+    correo.intentos += 1
+    correo.ultimo_error = f"{type(error).__name__}: {error}"
+
+    if correo.intentos >= _configuracion("CORREOS_MAX_INTENTOS", 5):
+        correo.estado = "fallido"
+    else:
+        espera = _configuracion("CORREOS_REINTENTO_BASE", 60) * 2 ** (correo.intentos - 1)
+        correo.proximo_intento = momento + timedelta(seconds=espera)
+
+
+def _reclamar(tamano_lote, momento):
+    """
+    Toma un lote de correos pendientes y aplaza su próximo intento.
+
+    Las filas se bloquean (con SKIP LOCKED donde el motor lo permite) solo
+    mientras se leen y se aplazan, en una transacción corta. Al confirmarla
+    los demás procesos ya no las ven como pendientes hasta que pasen
+    CORREOS_RECLAMO_SEGUNDOS, así que el envío se hace fuera de la
+    transacción y sin bloqueos. Si el proceso muere antes de registrar el
+    resultado, el lote se vuelve a tomar cuando vence ese plazo.
+
+    Args:
+        tamano_lote: Número máximo de correos a tomar
+        momento: Fecha y hora del intento
+
+    Returns:
+        list: Correos tomados, con sus facturas y notificaciones precargadas
+    """
+    with transaction.atomic():
+        bloqueo = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+        correos = list(
+            CorreoSalida.objects
+            .select_for_update(of=("self",), **bloqueo)
+            .select_related("factura__id_producto", "factura__id_aprendiz")
+            .prefetch_related("notificaciones__solicitud__id_producto", "notificaciones__solicitud__id_aprendiz")
+            .filter(estado="pendiente", proximo_intento__lte=momento)
+            .order_by("proximo_intento", "id_correo")[:tamano_lote]
+        )
+        if correos:
+            reclamo = momento + timedelta(seconds=_configuracion("CORREOS_RECLAMO_SEGUNDOS", 600))
+            CorreoSalida.objects.filter(pk__in=[c.pk for c in correos]).update(proximo_intento=reclamo)
+    return correos
+
+
+def enviar_pendientes(tamano_lote=None):
+    """
+    Envía un lote de correos pendientes cuyo próximo intento ya llegó.
+
+    El lote se toma con _reclamar(), de modo que varios procesos pueden
+    drenar la bandeja a la vez sin enviar dos veces el mismo correo. Las
+    facturas se generan y los correos se envían fuera de cualquier
+    transacción, todos por una sola conexión al backend de email.
+
+    Args:
+        tamano_lote: Número máximo de correos a enviar
+            (settings.CORREOS_TAMANO_LOTE, 50 por defecto)
+
+    Returns:
+        tuple: (enviados, fallidos) del lote
+    """
+    tamano_lote = tamano_lote or _configuracion("CORREOS_TAMANO_LOTE", 50)
+    momento = now()
+    enviados = fallidos = 0
+
+    correos = _reclamar(tamano_lote, momento)
+    if not correos:
+        return 0, 0
+
+    # Generar en paralelo las facturas del lote que no estén en caché;
+    # si alguna falla, su correo vuelve a intentarla y registra el error
+    # al construirse
+    facturas = [solicitud for correo in correos for solicitud in _facturas(correo)]
+    if facturas:
+        from core.facturas import obtener_facturas
+        try:
+            obtener_facturas(facturas)
+        except (OSError, ImportError, ValueError):
+            # wkhtmltopdf falla con OSError, un motor opcional sin instalar
+            # con ImportError y un FACTURAS_MOTOR inválido con ValueError
+            logger.exception("No se pudieron generar por adelantado las facturas del lote")
+
+    conexion = get_connection(fail_silently=False)
+    try:
+        conexion.open()
+    except Exception as e:
+        # Sin conexión al proveedor ningún correo del lote puede salir
+        for correo in correos:
+            _registrar_fallo(correo, e, momento)
+        CorreoSalida.objects.bulk_update(correos, ["intentos", "ultimo_error", "estado", "proximo_intento"])
+        return 0, len(correos)
+
+    try:
+        for correo in correos:
+            try:
+                conexion.send_messages([_construir_mensaje(correo, conexion)])
+            except Exception as e:
+                _registrar_fallo(correo, e, momento)
+                fallidos += 1
+            else:
+                correo.estado = "enviado"
+                correo.enviado = now()
+                enviados += 1
+    finally:
+        conexion.close()
+
+    CorreoSalida.objects.bulk_update(
+        correos, ["estado", "enviado", "intentos", "ultimo_error", "proximo_intento"]
+    )
+    return enviados, fallidos
@@ -0,0 +1,196 @@
+"""
+Búsqueda de texto en las solicitudes del sistema DotApp SENA.
+
+En lugar de combinar LIKE '%texto%' sobre varias columnas (lo que obliga a
+recorrer toda la tabla de solicitudes), cada solicitud guarda sus palabras
+normalizadas en la tabla TerminoSolicitud. Una búsqueda se resuelve como un
+LIKE 'palabra%' sobre el índice (termino, solicitud) por cada palabra:
+
+    "camisa azul"  ->  id IN (términos que empiezan por "camisa")
+                       AND id IN (términos que empiezan por "azul")
+
+Las palabras se comparan sin mayúsculas ni tildes y por prefijo, así que
+"unif" encuentra "Uniforme". Un número buscado solo también encuentra la
+solicitud con ese ID. Las fechas no se indexan: los reportes las filtran
+con los parámetros desde/hasta.
+
+El índice se actualiza al guardar una solicitud y al cambiar el nombre de
+un aprendiz (ver core.signals). Si se modifican solicitudes por fuera de la
+aplicación, el comando reindexar_busqueda lo reconstruye.
+"""
+
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import Solicitud, TerminoSolicitud
+
+
+# Campos de texto de la solicitud incluidos en el índice (además de la ficha)
+CAMPOS_INDEXADOS = (
+    "tipo_nombre", "talla_nombre", "color_nombre", "centro_nombre",
+    "programa_nombre", "detalles_adicionales",
+)
+
+# Campos del aprendiz incluidos en el índice
+CAMPOS_APRENDIZ = ("nombre", "apellido")
+
+# Solicitudes por lote al reconstruir el índice
+TAMANO_LOTE = 500
+
+_PALABRA = re.compile(r"\w+")
+
+
+def terminos(texto):
+    """
+    Separa un texto en palabras normalizadas.
+
+    Las palabras quedan en minúsculas, sin tildes y recortadas a
+    TerminoSolicitud.LARGO_MAXIMO caracteres, sin repetir.
+
+    Args:
+        texto: Texto a separar (None se trata como vacío)
+
+    Returns:
+        list: Palabras en el orden en que aparecen
+    """
+    if not texto:
+        return []
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFKD", str(texto).lower())
+        if not unicodedata.combining(c)
+    )
+    vistos = {}
+    for palabra in _PALABRA.findall(sin_tildes):
+        vistos.setdefault(palabra[:TerminoSolicitud.LARGO_MAXIMO], None)
+    return list(vistos)
+
+
+def terminos_de(solicitud):
+    """
+    Retorna las palabras indexadas de una solicitud.
+
+    Args:
+        solicitud: Instancia de Solicitud (con su aprendiz)
+
+    Returns:
+        set: Palabras normalizadas de la solicitud
+    """
+    valores = [getattr(solicitud, campo) for campo in CAMPOS_INDEXADOS]
+    valores += [getattr(solicitud.id_aprendiz, campo) for campo in CAMPOS_APRENDIZ]
+    if solicitud.ficha:
+        valores.append(solicitud.ficha)
+    resultado = set()
+    for valor in valores:
+        resultado.update(terminos(valor))
+    return resultado
+
+
+def indexar(solicitudes):
+    """
+    Reemplaza los términos de varias solicitudes en el índice.
+
+    Args:
+        solicitudes: Solicitudes a indexar, con su aprendiz precargado
+    """
+    solicitudes = list(solicitudes)
+    if not solicitudes:
+        return
+    with transaction.atomic():
+        TerminoSolicitud.objects.filter(solicitud__in=[s.id_solicitud for s in solicitudes]).delete()
+        TerminoSolicitud.objects.bulk_create(
+            [
+                TerminoSolicitud(solicitud_id=s.id_solicitud, termino=termino)
+                for s in solicitudes
+                for termino in sorted(terminos_de(s))
+            ],
+            batch_size=TAMANO_LOTE,
+        )
+
+
+def indexar_aprendiz(id_aprendiz):
+    """
+    Reindexa las solicitudes de un aprendiz tras cambiar su nombre.
+
+    Args:
+        id_aprendiz: ID del usuario aprendiz
+    """
+    indexar(Solicitud.objects.select_related("id_aprendiz").filter(id_aprendiz_id=id_aprendiz))
+
+
+def reindexar():
+    """
+    Reconstruye el índice completo por lotes de TAMANO_LOTE solicitudes.
+
+    Returns:
+        int: Número de solicitudes indexadas
+    """
+    total = 0
+    ultimo = 0
+    while True:
+        lote = list(
+            Solicitud.objects.select_related("id_aprendiz")
+            .filter(id_solicitud__gt=ultimo)
+            .order_by("id_solicitud")[:TAMANO_LOTE]
+        )
+        if not lote:
+            break
+        indexar(lote)
+        total += len(lote)
+        ultimo = lote[-1].id_solicitud
+    return total
+
+
+def _con_prefijo(palabra):
+    """
+    Retorna los IDs de solicitud con algún término que empieza por una palabra.
+
+    Se usa LIKE 'palabra%', que MySQL resuelve con el índice (termino,
+    solicitud) sin depender del orden de la intercalación. Los términos ya
+    están en minúsculas, así que istartswith equivale a startswith; en MySQL
+    startswith se traduce a LIKE BINARY, que no aprovecha el índice.
+
+    Args:
+        palabra: Palabra normalizada
+
+    Returns:
+        QuerySet: Subconsulta de solicitud_id
+    """
+    return (
+        TerminoSolicitud.objects
+        .filter(termino__istartswith=palabra)
+        .values("solicitud_id")
+    )
+
+
+def filtrar(queryset, texto):
+    """
+    Filtra un queryset de solicitudes por un texto de búsqueda.
+
+    Cada palabra del texto debe aparecer (como prefijo de alguna palabra)
+    en la solicitud. Si el texto es un solo número también se incluye la
+    solicitud con ese ID.
+
+    Args:
+        queryset: QuerySet de Solicitud
+        texto: Texto buscado
+
+    Returns:
+        QuerySet: Solicitudes que coinciden (el mismo queryset si el texto
+        no tiene palabras)
+    """
+    palabras = terminos(texto)
+    if not palabras:
+        return queryset
+
+    condicion = Q()
+    for palabra in palabras:
+        condicion &= Q(id_solicitud__in=_con_prefijo(palabra))
+
+    # Un número de hasta 9 cifras también puede ser el ID de la solicitud
+    if len(palabras) == 1 and palabras[0].isdecimal() and len(palabras[0]) < 10:
+        condicion |= Q(id_solicitud=int(palabras[0]))
+
+    return queryset.filter(condicion)
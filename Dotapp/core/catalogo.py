@@ -0,0 +1,171 @@
+"""
+Caché en memoria de las tablas de referencia del sistema DotApp SENA.
+
+Roles, tipos de producto, tallas, colores, centros de formación y programas
+casi nunca cambian, pero se consultaban en cada request. Este módulo los
+carga una vez por proceso y los expone por nombre y por id.
+
+La caché se invalida con las señales post_save/post_delete de cada modelo
+(ver core.signals). Como las señales solo llegan al proceso que hizo la
+escritura, cada tabla además se recarga pasado CATALOGO_CACHE_TTL segundos
+para que los demás workers también vean los cambios.
+
+Las instancias retornadas son compartidas entre requests: se pueden asignar
+a claves foráneas o mostrar en plantillas, pero no deben modificarse.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from core.models import Rol, TipoProducto, Talla, Color, CentroFormacion, Programa
+
+
+# Modelo -> campo que contiene el nombre
+CAMPOS_NOMBRE = {
+    Rol: "nombre_rol",
+    TipoProducto: "nombre",
+    Talla: "nombre",
+    Color: "nombre",
+    CentroFormacion: "nombre",
+    Programa: "nombre",
+}
+
+_tablas = {}
+_lock = threading.Lock()
+
+
+def _ttl():
+    """
+    Retorna el tiempo de vida de la caché en segundos.
+
+    Returns:
+        int: Valor de settings.CATALOGO_CACHE_TTL (300 por defecto)
+    """
+    return getattr(settings, "CATALOGO_CACHE_TTL", 300)
+
+
+def _cargar(modelo):
+    """
+    Consulta la tabla completa y construye los mapas por id y por nombre.
+
+    Args:
+        modelo: Clase del modelo de referencia
+
+    Returns:
+        dict: Registros ordenados, mapas por id y por nombre y hora de carga
+    """
+    queryset = modelo.objects.all()
+    if modelo is Programa:
+        queryset = queryset.select_related("centro")
+
+    registros = list(queryset.order_by("pk"))
+    campo = CAMPOS_NOMBRE[modelo]
+    return {
+        "registros": registros,
+        "por_id": {obj.pk: obj for obj in registros},
+        "por_nombre": {getattr(obj, campo): obj for obj in registros},
+        "cargado": time.monotonic(),
+    }
+
+
+def _tabla(modelo):
+    """
+    Retorna la tabla en caché, cargándola si no existe o si expiró.
+
+    Args:
+        modelo: Clase del modelo de referencia
+
+    Returns:
+        dict: Entrada de la caché para el modelo
+    """
+    tabla = _tablas.get(modelo)
+    if tabla is None or time.monotonic() - tabla["cargado"] > _ttl():
+        with _lock:
+            tabla = _tablas.get(modelo)
+            if tabla is None or time.monotonic() - tabla["cargado"] > _ttl():
+                tabla = _cargar(modelo)
+                _tablas[modelo] = tabla
+    return tabla
+
+
+def todos(modelo):
+    """
+    Retorna todos los registros de una tabla de referencia.
+
+    Args:
+        modelo: Clase del modelo de referencia
+
+    Returns:
+        list: Registros ordenados por clave primaria
+    """
+    return _tabla(modelo)["registros"]
+
+
+def por_id(modelo, pk):
+    """
+    Busca un registro por su clave primaria.
+
+    Args:
+        modelo: Clase del modelo de referencia
+        pk: Clave primaria (entero o texto numérico)
+
+    Returns:
+        Instancia del modelo o None si no existe o el id no es válido
+    """
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return _tabla(modelo)["por_id"].get(pk)
+
+
+def por_nombre(modelo, nombre):
+    """
+    Busca un registro por su nombre.
+
+    Args:
+        modelo: Clase del modelo de referencia
+        nombre: Nombre exacto del registro
+
+    Returns:
+        Instancia del modelo o None si no existe
+    """
+    if not nombre:
+        return None
+    return _tabla(modelo)["por_nombre"].get(nombre)
+
+
+def obtener_o_crear(modelo, nombre):
+    """
+    Busca un registro por nombre en la caché y lo crea si no existe.
+
+    Equivalente a get_or_create sobre el campo de nombre, pero sin consultar
+    la base de datos cuando el registro ya está en caché.
+
+    Args:
+        modelo: Clase del modelo de referencia (sin claves foráneas obligatorias)
+        nombre: Nombre del registro
+
+    Returns:
+        Instancia del modelo
+    """
+    obj = por_nombre(modelo, nombre)
+    if obj is None:
+        obj, _ = modelo.objects.get_or_create(**{CAMPOS_NOMBRE[modelo]: nombre})
+    return obj
+
+
+def invalidar(modelo=None):
+    """
+    Descarta la caché de un modelo o de todas las tablas.
+
+    Args:
+        modelo: Clase del modelo a invalidar (None para invalidar todo)
+    """
+    with _lock:
+        if modelo is None:
+            _tablas.clear()
+        else:
+            _tablas.pop(modelo, None)
@@ -0,0 +1,203 @@
+"""
+Contadores de solicitudes por estado del sistema DotApp SENA.
+
+Los paneles del personal muestran cuántas solicitudes hay en cada estado.
+En lugar de contar la tabla de solicitudes en cada carga, la tabla
+ContadorEstado guarda esos totales y se ajusta con UPDATEs relativos en la
+misma transacción que cada cambio:
+
+    UPDATE contador SET total = total + :delta
+    WHERE estado = :estado AND id_centro IN (0, :centro)
+
+Si algún camino de escritura se salta estos ajustes (por ejemplo cambios
+hechos desde el admin o el shell), el comando reconciliar_contadores
+recalcula los totales desde la tabla de solicitudes.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from core.models import ContadorEstado, Solicitud
+
+
+TODOS = ContadorEstado.TODOS_LOS_CENTROS
+
+
+def _claves(estado, id_centro):
+    """
+    Retorna los contadores afectados por una solicitud.
+
+    Args:
+        estado: Estado de la solicitud
+        id_centro: ID del centro de formación o None
+
+    Returns:
+        list: Pares (estado, id_centro) del total y del centro
+    """
+    claves = [(estado, TODOS)]
+    if id_centro:
+        claves.append((estado, id_centro))
+    return claves
+
+
+def ajustar(cambios):
+    """
+    Suma o resta a varios contadores, creándolos si no existen.
+
+    Los contadores se actualizan en orden fijo para que dos transacciones
+    concurrentes no se bloqueen mutuamente.
+
+    Args:
+        cambios: Diccionario (estado, id_centro) -> diferencia
+    """
+    for (estado, id_centro), delta in sorted(cambios.items()):
+        if not delta:
+            continue
+        filtro = ContadorEstado.objects.filter(estado=estado, id_centro=id_centro)
+        if filtro.update(total=F("total") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                ContadorEstado.objects.create(estado=estado, id_centro=id_centro, total=delta)
+        except IntegrityError:
+            # Otro proceso creó el contador entre el UPDATE y el INSERT
+            filtro.update(total=F("total") + delta)
+
+
+def registrar_creacion(solicitud):
+    """
+    Cuenta una solicitud recién creada.
+
+    Args:
+        solicitud: Instancia de Solicitud creada
+    """
+    ajustar({clave: 1 for clave in _claves(solicitud.estado_solicitud, solicitud.centro_formacion_id)})
+
+
+def registrar_eliminacion(solicitud):
+    """
+    Descuenta una solicitud eliminada.
+
+    Args:
+        solicitud: Instancia de Solicitud eliminada
+    """
+    ajustar({clave: -1 for clave in _claves(solicitud.estado_solicitud, solicitud.centro_formacion_id)})
+
+
+def registrar_transicion(solicitudes, origen, destino):
+    """
+    Mueve solicitudes de un estado a otro en los contadores.
+
+    Args:
+        solicitudes: Solicitudes que cambiaron de estado
+        origen: Estado anterior
+        destino: Estado nuevo
+    """
+    cambios = {}
+    for solicitud in solicitudes:
+        for estado, delta in ((origen, -1), (destino, 1)):
+            for clave in _claves(estado, solicitud.centro_formacion_id):
+                cambios[clave] = cambios.get(clave, 0) + delta
+    ajustar(cambios)
+
+
+def conteos(id_centro=TODOS):
+    """
+    Retorna el número de solicitudes por estado.
+
+    Args:
+        id_centro: ID del centro de formación (TODOS para el total)
+
+    Returns:
+        dict: Estado -> número de solicitudes (todos los estados, con 0 si no hay)
+    """
+    resultado = {estado: 0 for estado, _ in Solicitud.ESTADOS}
+    for estado, total in ContadorEstado.objects.filter(id_centro=id_centro).values_list("estado", "total"):
+        resultado[estado] = total
+    return resultado
+
+
+def resumen(estados=None, id_centro=TODOS):
+    """
+    Retorna los conteos listos para la plantilla _conteos_estado.html.
+
+    Args:
+        estados: Estados a incluir, en orden (None para todos)
+        id_centro: ID del centro de formación (TODOS para el total)
+
+    Returns:
+        list: Diccionarios con estado, etiqueta y total
+    """
+    totales = conteos(id_centro)
+    etiquetas = dict(Solicitud.ESTADOS)
+    return [
+        {"estado": estado, "etiqueta": etiquetas[estado], "total": totales[estado]}
+        for estado in (estados or etiquetas)
+    ]
+
+
+def conteos_por_centro():
+    """
+    Retorna el número de solicitudes por estado de cada centro.
+
+    Returns:
+        dict: id_centro -> {estado: número de solicitudes}
+    """
+    resultado = {}
+    filas = ContadorEstado.objects.exclude(id_centro=TODOS).values_list("id_centro", "estado", "total")
+    for id_centro, estado, total in filas:
+        resultado.setdefault(id_centro, {e: 0 for e, _ in Solicitud.ESTADOS})[estado] = total
+    return resultado
+
+
+def calcular():
+    """
+    Cuenta las solicitudes por estado y centro directamente en la tabla.
+
+    Returns:
+        dict: (estado, id_centro) -> número de solicitudes
+    """
+    esperados = {}
+    filas = Solicitud.objects.values_list("estado_solicitud", "centro_formacion_id").annotate(n=Count("pk")).order_by()
+    for estado, id_centro, n in filas:
+        for clave in _claves(estado, id_centro):
+            esperados[clave] = esperados.get(clave, 0) + n
+    return esperados
+
+
+def reconciliar(aplicar=True):
+    """
+    Compara los contadores con la tabla de solicitudes y los corrige.
+
+    Los contadores se bloquean antes de contar, de modo que las
+    transiciones concurrentes esperan y aplican su ajuste sobre el valor
+    ya corregido.
+
+    Args:
+        aplicar: False para solo reportar las diferencias
+
+    Returns:
+        list: Tuplas (estado, id_centro, valor guardado, valor real) de los
+        contadores que no coincidían
+    """
+    with transaction.atomic():
+        actuales = {
+            (c.estado, c.id_centro): c
+            for c in ContadorEstado.objects.select_for_update().order_by("estado", "id_centro")
+        }
+        esperados = calcular()
+
+        diferencias = []
+        for clave in sorted(set(actuales) | set(esperados)):
+            guardado = actuales[clave].total if clave in actuales else 0
+            real = esperados.get(clave, 0)
+            if guardado != real:
+                diferencias.append((clave[0], clave[1], guardado, real))
+
+        if aplicar:
+            for estado, id_centro, _, real in diferencias:
+                ContadorEstado.objects.update_or_create(
+                    estado=estado, id_centro=id_centro, defaults={"total": real}
+                )
+
+    return diferencias
@@ -0,0 +1,129 @@
+"""
+Construcción de los correos del sistema DotApp SENA.
+
+Este módulo reúne los correos que se envían a los usuarios: el resumen de
+cambios de estado de las solicitudes de un aprendiz (agrupado por
+core.notificaciones) y el enlace de restablecimiento de contraseña. Los
+correos no se envían desde aquí: se encolan con core.bandeja_salida.encolar().
+"""
+
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import render_to_string
+
+
+REMITENTE = 'dotappsena@gmail.com'
+SITIO_URL = 'https://joan2004s.pythonanywhere.com/'
+
+# Estado de la solicitud -> texto del cambio en el correo de resumen
+MENSAJES_ESTADO = {
+    "aprobada": "Felicidades, tu solicitud con el ID: #{id} ha sido aprobada. Adjunto encontrarás tu factura electrónica.",
+    "rechazada": "Lo sentimos, tu solicitud con el ID: #{id} ha sido rechazada. Si deseas hacer un nuevo pedido, créalo desde nuestro sitio web.",
+    "despachada": "Tu solicitud con el ID: #{id} ya fue despachada. Puedes pasar a recogerla en tu centro de formación.",
+    "entregada": "Tu solicitud con el ID: #{id} ha sido ENTREGADA. Gracias por usar Dotapp. ¡Esperamos verte pronto!",
+    "cancelada": "Tu solicitud con el ID: #{id} ha sido cancelada. Si deseas hacer un nuevo pedido, créalo desde nuestro sitio web.",
+}
+
+PLANTILLA_HTML = """
+    <html>
+    <body style="font-family:Arial,Helvetica,sans-serif; background:#f7f7f7; padding:20px;">
+        <div style="max-width:600px; margin:auto; background:white; border-radius:10px; overflow:hidden; box-shadow:0 4px 12px rgba(0,0,0,.1);">
+            <div style="padding:20px;">
+                {cuerpo}
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def _crear_mensaje(asunto, texto, cuerpo_html, destinatario):
+    """
+    Crea un EmailMultiAlternatives con versión texto y HTML.
+
+    Args:
+        asunto: Asunto del correo
+        texto: Contenido en texto plano
+        cuerpo_html: Fragmento HTML que va dentro de la plantilla común
+        destinatario: Correo del destinatario
+
+    Returns:
+        EmailMultiAlternatives: Mensaje listo para enviar
+    """
+    msg = EmailMultiAlternatives(asunto, texto, REMITENTE, [destinatario])
+    msg.attach_alternative(PLANTILLA_HTML.format(cuerpo=cuerpo_html), "text/html")
+    return msg
+
+
+def correo_notificaciones(aprendiz, notificaciones):
+    """
+    Construye el correo de resumen de cambios de estado de un aprendiz.
+
+    Con una sola notificación el asunto es el del estado (por ejemplo
+    "Solicitud aprobada - Dotapp"); con varias, un asunto de resumen. Las
+    facturas de las solicitudes aprobadas se adjuntan al enviar el correo
+    (ver core.bandeja_salida).
+
+    Args:
+        aprendiz: Instancia de Usuario destinatario
+        notificaciones: Notificaciones del aprendiz en orden cronológico
+
+    Returns:
+        EmailMultiAlternatives: Mensaje de resumen
+    """
+    cambios = [
+        {
+            "id_solicitud": n.solicitud_id,
+            "estado": n.estado,
+            "mensaje": MENSAJES_ESTADO[n.estado].format(id=n.solicitud_id),
+        }
+        for n in notificaciones
+    ]
+    contexto = {
+        "nombre": aprendiz.get_full_name().strip() or aprendiz.correo,
+        "cambios": cambios,
+        "sitio_url": SITIO_URL,
+    }
+
+    if len(cambios) == 1:
+        asunto = f"Solicitud {cambios[0]['estado']} - Dotapp"
+    else:
+        asunto = "Novedades de tus solicitudes - Dotapp"
+
+    msg = EmailMultiAlternatives(
+        asunto,
+        render_to_string("core/correos/notificaciones.txt", contexto),
+        REMITENTE,
+        [aprendiz.correo],
+    )
+    msg.attach_alternative(render_to_string("core/correos/notificaciones.html", contexto), "text/html")
+    return msg
+
+
+def correo_restablecer_contrasena(correo, reset_url):
+    """
+    Construye el correo con el enlace para restablecer la contraseña.
+
+    Args:
+        correo: Correo del usuario
+        reset_url: URL absoluta de restablecimiento (válida 15 minutos)
+
+    Returns:
+        EmailMultiAlternatives: Mensaje con el enlace
+    """
+    texto = (
+        f'Hola,\n\nRecibimos una solicitud para restablecer tu contraseña en DotAppSena. '
+        f'Para crear una nueva contraseña visita el siguiente enlace (válido 15 minutos):\n\n'
+        f'{reset_url}\n\n'
+        f'Si no solicitaste este cambio, simplemente ignora este correo.\n\n'
+        f'Saludos,\nEl equipo de Dotapp'
+    )
+    html = (
+        f"Hola,<br><br>"
+        f"Recibimos una solicitud para restablecer tu contraseña en DotAppSena.<br>"
+        f"Para crear una nueva contraseña visita el siguiente enlace (válido 15 minutos):<br><br>"
+        f'<a href="{reset_url}">Restablecer contraseña</a><br><br>'
+        f"Si no solicitaste este cambio, simplemente ignora este correo.<br><br>"
+        f"<br>"
+        f"Saludos,<br>El equipo de Dotapp"
+    )
+    return _crear_mensaje('Recupera tu contraseña', texto, html, correo)
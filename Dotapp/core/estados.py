@@ -0,0 +1,148 @@
+"""
+Máquina de estados de las solicitudes del sistema DotApp SENA.
+
+Este módulo define en un solo lugar qué cambios de estado son válidos
+para una solicitud y los ejecuta como un UPDATE condicional:
+
+    UPDATE solicitud SET estado_solicitud = <destino>, fecha_finalizacion = ...
+    WHERE id_solicitud = <id> AND estado_solicitud = <origen>
+
+Si otro usuario ya movió la solicitud, el UPDATE no afecta ninguna fila y
+la transición se reporta como no realizada, sin sobrescribir el estado.
+"""
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from core.contadores import registrar_transicion
+from core.filtros import invalidar as invalidar_filtros
+from core.inventario import liberar_stock, liberar_stock_lote
+from core.models import Solicitud
+
+
+# Acción -> (estado de origen, estado de destino)
+TRANSICIONES = {
+    "aprobar": ("pendiente", "aprobada"),
+    "rechazar": ("pendiente", "rechazada"),
+    "cancelar": ("pendiente", "cancelada"),
+    "despachar": ("aprobada", "despachada"),
+    "entregar": ("despachada", "entregada"),
+}
+
+# Acciones que devuelven al inventario las unidades reservadas
+ACCIONES_QUE_LIBERAN_STOCK = {"rechazar", "cancelar"}
+
+
+def obtener_transicion(accion):
+    """
+    Retorna el par (origen, destino) de una acción.
+
+    Args:
+        accion: Nombre de la acción (aprobar, rechazar, cancelar, despachar, entregar)
+
+    Returns:
+        tuple: Estado de origen y estado de destino
+
+    Raises:
+        ValueError: Si la acción no está definida en TRANSICIONES
+    """
+    try:
+        return TRANSICIONES[accion]
+    except KeyError:
+        raise ValueError(f"Acción de solicitud no válida: {accion}")
+
+
+def transicionar(solicitud, accion):
+    """
+    Aplica una transición de estado a una solicitud.
+
+    El cambio se ejecuta como un único UPDATE condicionado al estado de
+    origen, junto con el movimiento de stock y de los contadores por estado
+    que corresponda, dentro de una transacción. Si la fila se movió, la
+    instancia recibida se actualiza en memoria con el nuevo estado.
+
+    Args:
+        solicitud: Instancia de Solicitud a modificar
+        accion: Nombre de la acción a aplicar
+
+    Returns:
+        bool: True si la solicitud cambió de estado, False si ya no estaba
+        en el estado de origen
+
+    Raises:
+        ValueError: Si la acción no está definida en TRANSICIONES
+    """
+    origen, destino = obtener_transicion(accion)
+    fecha_finalizacion = now()
+
+    with transaction.atomic():
+        movida = Solicitud.objects.filter(
+            id_solicitud=solicitud.id_solicitud,
+            estado_solicitud=origen,
+        ).update(estado_solicitud=destino, fecha_finalizacion=fecha_finalizacion)
+
+        if not movida:
+            return False
+
+        registrar_transicion([solicitud], origen, destino)
+        invalidar_filtros()
+
+        if accion in ACCIONES_QUE_LIBERAN_STOCK:
+            liberar_stock(solicitud.id_producto_id, solicitud.cantidad)
+
+    solicitud.estado_solicitud = destino
+    solicitud.fecha_finalizacion = fecha_finalizacion
+    return True
+
+
+def transicionar_lote(ids, accion):
+    """
+    Aplica la misma transición a varias solicitudes en una sola transacción.
+
+    Las solicitudes que siguen en el estado de origen se bloquean con
+    select_for_update y se mueven con un único UPDATE; el stock de las que
+    se rechazan o cancelan se devuelve con un único UPDATE por lote. Las
+    solicitudes que ya cambiaron de estado se omiten.
+
+    Args:
+        ids: Lista de id_solicitud a modificar
+        accion: Nombre de la acción a aplicar
+
+    Returns:
+        list: Solicitudes que cambiaron de estado, con aprendiz y producto
+        precargados y el nuevo estado aplicado en memoria
+
+    Raises:
+        ValueError: Si la acción no está definida en TRANSICIONES
+    """
+    origen, destino = obtener_transicion(accion)
+    fecha_finalizacion = now()
+
+    with transaction.atomic():
+        solicitudes = list(
+            Solicitud.objects
+            .select_for_update(of=("self",))
+            .select_related("id_aprendiz", "id_producto")
+            .filter(id_solicitud__in=ids, estado_solicitud=origen)
+            .order_by("id_solicitud")
+        )
+        if not solicitudes:
+            return []
+
+        Solicitud.objects.filter(
+            id_solicitud__in=[s.id_solicitud for s in solicitudes],
+            estado_solicitud=origen,
+        ).update(estado_solicitud=destino, fecha_finalizacion=fecha_finalizacion)
+        registrar_transicion(solicitudes, origen, destino)
+        invalidar_filtros()
+
+        if accion in ACCIONES_QUE_LIBERAN_STOCK:
+            cantidades = {}
+            for s in solicitudes:
+                cantidades[s.id_producto_id] = cantidades.get(s.id_producto_id, 0) + s.cantidad
+            liberar_stock_lote(cantidades)
+
+    for s in solicitudes:
+        s.estado_solicitud = destino
+        s.fecha_finalizacion = fecha_finalizacion
+    return solicitudes
@@ -0,0 +1,407 @@
+"""
+Generación de reportes de solicitudes del sistema DotApp SENA.
+
+Este módulo escribe los reportes de solicitudes sin cargar todas las filas
+en memoria: las filas se leen de la base de datos por lotes ordenados por
+id (paginación por clave, válida también en MySQL, donde iterator() no usa
+cursores del lado del servidor) y se escriben directamente al archivo.
+Cuando se pide un límite de filas, el reporte conserva las solicitudes más
+recientes.
+"""
+
+from django.conf import settings
+from django.utils.timezone import is_aware
+import openpyxl
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph
+from reportlab.platypus import Table as TablaPdf, TableStyle
+
+
+# Columnas leídas de la base de datos para cada fila del reporte
+CAMPOS_REPORTE = (
+    "id_solicitud",
+    "fecha_solicitud",
+    "id_aprendiz__nombre",
+    "id_aprendiz__apellido",
+    "tipo_nombre",
+    "talla_nombre",
+    "color_nombre",
+    "cantidad",
+    "centro_nombre",
+    "programa_nombre",
+    "ficha",
+    "detalles_adicionales",
+    "fecha_finalizacion",
+    "estado_solicitud",
+)
+
+ENCABEZADOS_EXCEL = [
+    "ID Solicitud", "Fecha Solicitud", "Usuario", "Producto", "Talla", "Color",
+    "Cantidad", "Centro de Formación", "Programa", "Ficha", "Detalles Adicionales",
+    "Fecha Finalización", "Estado"
+]
+
+ENCABEZADOS_PDF = [
+    "ID", "Fecha", "Usuario", "Producto", "Talla", "Color", "Cantidad",
+    "Centro", "Programa", "Ficha", "Detalles Adicionales", "Fecha Fin", "Estado"
+]
+
+# Anchos de columna del PDF (puntos)
+ANCHOS_PDF = [35, 55, 105, 50, 30, 45, 40, 50, 50, 50, 100, 60, 60]
+
+# Filas por tabla del PDF: cada tabla ocupa como máximo una página. Las
+# tablas no llevan encabezado; _PaginadorPdf lo dibuja una vez por página
+FILAS_POR_TABLA_PDF = 40
+
+# Los detalles más largos que esto se envuelven en un Paragraph
+LARGO_MAXIMO_SIN_AJUSTE = 25
+
+ESTILO_TABLA_PDF = TableStyle([
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTSIZE", (0, 0), (-1, -1), 7),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+ESTILO_ENCABEZADO_PDF = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#c3f0ca")),
+    ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 7),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+
+def _tamano_lote():
+    """
+    Retorna el número de filas leídas por consulta.
+
+    Returns:
+        int: Valor de settings.EXPORTACION_TAMANO_LOTE (2000 por defecto)
+    """
+    return getattr(settings, "EXPORTACION_TAMANO_LOTE", 2000)
+
+
+def _sin_zona_horaria(fecha):
+    """
+    Quita la zona horaria de una fecha (Excel no admite fechas con zona).
+
+    Args:
+        fecha: datetime o None
+
+    Returns:
+        datetime o None: Fecha sin información de zona horaria
+    """
+    if fecha and is_aware(fecha):
+        return fecha.replace(tzinfo=None)
+    return fecha
+
+
+def filas_solicitudes(queryset, limite=None, progreso=None):
+    """
+    Recorre las solicitudes de un queryset por lotes, en orden de id.
+
+    Cada lote es una consulta independiente con WHERE id_solicitud > ultimo,
+    de modo que en memoria solo hay un lote de tuplas a la vez. Con límite,
+    el recorrido empieza después de la solicitud que queda fuera, así que se
+    retornan las más recientes.
+
+    Args:
+        queryset: QuerySet de Solicitud ya filtrado
+        limite: Número máximo de filas a retornar (None para todas)
+        progreso: Función opcional que recibe el número de filas ya
+            procesadas cada vez que se termina de consumir un lote
+
+    Yields:
+        dict: Valores de CAMPOS_REPORTE de cada solicitud
+    """
+    tamano = _tamano_lote()
+    ultimo = 0
+    entregadas = 0
+    consulta = queryset.order_by("id_solicitud").values_list(*CAMPOS_REPORTE)
+
+    if limite is not None:
+        # Id de la solicitud más reciente que no entra en el límite
+        fuera = queryset.order_by("-id_solicitud").values_list("id_solicitud", flat=True)[limite:limite + 1]
+        ultimo = next(iter(fuera), 0)
+
+    while True:
+        if limite is not None:
+            tamano = min(tamano, limite - entregadas)
+            if tamano <= 0:
+                return
+
+        lote = list(consulta.filter(id_solicitud__gt=ultimo)[:tamano])
+        if not lote:
+            return
+
+        for valores in lote:
+            yield dict(zip(CAMPOS_REPORTE, valores))
+
+        entregadas += len(lote)
+        ultimo = lote[-1][0]
+        if progreso is not None:
+            progreso(entregadas)
+
+
+def escribir_excel(queryset, destino, limite=None, progreso=None):
+    """
+    Escribe el reporte de solicitudes en formato Excel (.xlsx).
+
+    Usa una hoja de solo escritura de openpyxl, que vuelca cada fila al
+    archivo en cuanto se agrega, por lo que la memoria usada no crece con
+    el número de filas.
+
+    Args:
+        queryset: QuerySet de Solicitud ya filtrado
+        destino: Ruta o archivo binario con seek donde escribir el libro
+        limite: Número máximo de filas a exportar (None para todas)
+        progreso: Función opcional que recibe las filas escritas (ver
+            filas_solicitudes)
+
+    Returns:
+        int: Número de solicitudes exportadas
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Solicitudes")
+    ws.append(ENCABEZADOS_EXCEL)
+
+    total = 0
+    for fila in filas_solicitudes(queryset, limite, progreso):
+        ws.append([
+            fila["id_solicitud"],
+            _sin_zona_horaria(fila["fecha_solicitud"]),
+            f"{fila['id_aprendiz__nombre']} {fila['id_aprendiz__apellido']}",
+            fila["tipo_nombre"],
+            fila["talla_nombre"],
+            fila["color_nombre"],
+            fila["cantidad"],
+            fila["centro_nombre"],
+            fila["programa_nombre"],
+            fila["ficha"],
+            fila["detalles_adicionales"] or "",
+            _sin_zona_horaria(fila["fecha_finalizacion"]),
+            fila["estado_solicitud"].title(),
+        ])
+        total += 1
+
+    # Tabla con estilo sobre el rango escrito
+    table = Table(displayName="TablaSolicitudes", ref=f"A1:M{total + 1}")
+    table.tableStyleInfo = TableStyleInfo(
+        name="TableStyleMedium9", showFirstColumn=False,
+        showLastColumn=False, showRowStripes=True, showColumnStripes=True
+    )
+    # En modo solo escritura openpyxl no puede leer los encabezados de las
+    # celdas, así que las columnas de la tabla se declaran explícitamente
+    table.tableColumns = [
+        TableColumn(id=i, name=encabezado) for i, encabezado in enumerate(ENCABEZADOS_EXCEL, 1)
+    ]
+    ws.add_table(table)
+
+    wb.save(destino)
+    return total
+
+
+def _fila_pdf(fila, estilo_celda):
+    """
+    Convierte una fila del reporte en las celdas de la tabla del PDF.
+
+    Solo los detalles largos se envuelven en un Paragraph; el resto de las
+    celdas son texto plano, que reportlab dibuja sin calcular ajuste de línea.
+
+    Args:
+        fila: Diccionario con los valores de CAMPOS_REPORTE
+        estilo_celda: ParagraphStyle de las celdas con ajuste de línea
+
+    Returns:
+        list: Celdas de la fila
+    """
+    detalles = fila["detalles_adicionales"] or ""
+    if len(detalles) > LARGO_MAXIMO_SIN_AJUSTE:
+        detalles = Paragraph(detalles, estilo_celda)
+
+    return [
+        str(fila["id_solicitud"]),
+        fila["fecha_solicitud"].strftime("%Y-%m-%d") if fila["fecha_solicitud"] else "",
+        f"{fila['id_aprendiz__nombre']} {fila['id_aprendiz__apellido']}",
+        str(fila["tipo_nombre"]),
+        str(fila["talla_nombre"]),
+        str(fila["color_nombre"]),
+        str(fila["cantidad"]),
+        str(fila["centro_nombre"]),
+        str(fila["programa_nombre"]),
+        str(fila["ficha"]),
+        detalles,
+        fila["fecha_finalizacion"].strftime("%Y-%m-%d") if fila["fecha_finalizacion"] else "",
+        str(fila["estado_solicitud"]),
+    ]
+
+
+class _PaginadorPdf:
+    """
+    Dibuja tablas en un canvas de reportlab página por página.
+
+    Cada tabla se dibuja y se descarta en cuanto cabe en la página, así que
+    en memoria solo está el bloque de filas actual y no todo el documento.
+    El encabezado de las columnas se dibuja una sola vez en cada página,
+    antes de la primera fila.
+    """
+
+    MARGEN = 36
+
+    def __init__(self, destino, titulo, encabezado):
+        """
+        Abre el canvas y dibuja el título en la primera página.
+
+        Args:
+            destino: Ruta o archivo binario donde escribir el PDF
+            titulo: Título del reporte
+            encabezado: Tabla de una fila con los nombres de las columnas
+        """
+        self.canvas = canvas.Canvas(destino, pagesize=landscape(letter))
+        self.ancho, self.alto = landscape(letter)
+        self.ancho_util = self.ancho - 2 * self.MARGEN
+        self.y = self.alto - self.MARGEN
+        self.encabezado = encabezado
+        self.con_encabezado = False
+        self.con_filas = False
+
+        titulo_pdf = Paragraph(titulo, getSampleStyleSheet()["Title"])
+        _, alto_titulo = titulo_pdf.wrap(self.ancho_util, self.alto)
+        titulo_pdf.drawOn(self.canvas, self.MARGEN, self.y - alto_titulo)
+        self.y -= alto_titulo + 12
+
+    def _nueva_pagina(self):
+        """
+        Cierra la página actual y vuelve al margen superior de la siguiente.
+
+        La página nueva no tiene encabezado ni filas hasta que se dibuja
+        la siguiente tabla.
+        """
+        self.canvas.showPage()
+        self.y = self.alto - self.MARGEN
+        self.con_encabezado = False
+        self.con_filas = False
+
+    def encabezar(self):
+        """
+        Dibuja el encabezado de las columnas si la página aún no lo tiene.
+        """
+        if self.con_encabezado:
+            return
+        _, alto = self.encabezado.wrap(self.ancho_util, self.alto)
+        if self.y - alto < self.MARGEN:
+            self._nueva_pagina()
+        self.encabezado.drawOn(self.canvas, self.MARGEN, self.y - alto)
+        self.y -= alto
+        self.con_encabezado = True
+
+    def dibujar(self, flowable):
+        """
+        Dibuja una tabla de filas, partiéndola entre páginas si no cabe.
+
+        Args:
+            flowable: Tabla de reportlab sin fila de encabezado
+        """
+        pendiente = [flowable]
+        while pendiente:
+            actual = pendiente.pop(0)
+            self.encabezar()
+            disponible = self.y - self.MARGEN
+            _, alto = actual.wrap(self.ancho_util, disponible)
+
+            if alto <= disponible:
+                actual.drawOn(self.canvas, self.MARGEN, self.y - alto)
+                self.y -= alto
+                self.con_filas = True
+                continue
+
+            partes = actual.split(self.ancho_util, disponible)
+            if len(partes) < 2:
+                # No cabe ni una fila en lo que queda de página
+                if self.con_filas:
+                    self._nueva_pagina()
+                    pendiente.insert(0, actual)
+                    continue
+                actual.drawOn(self.canvas, self.MARGEN, self.y - alto)
+                self._nueva_pagina()
+                continue
+
+            pendiente[0:0] = partes
+
+    def texto(self, texto):
+        """
+        Escribe una línea de texto bajo el último contenido dibujado.
+
+        Args:
+            texto: Texto a escribir
+        """
+        if self.y - 20 < self.MARGEN:
+            self._nueva_pagina()
+        self.canvas.setFont("Helvetica-Oblique", 8)
+        self.canvas.drawString(self.MARGEN, self.y - 14, texto)
+        self.y -= 20
+
+    def guardar(self):
+        """
+        Cierra la última página y escribe el PDF en el destino.
+        """
+        self.canvas.save()
+
+
+def escribir_pdf(queryset, destino, titulo, limite=None, progreso=None):
+    """
+    Escribe el reporte de solicitudes en formato PDF (landscape).
+
+    Las filas se leen por lotes y se dibujan en tablas de
+    FILAS_POR_TABLA_PDF filas; cada tabla se descarta después de dibujarla,
+    por lo que el tiempo y la memoria crecen de forma lineal y acotada.
+
+    Args:
+        queryset: QuerySet de Solicitud ya filtrado
+        destino: Ruta o archivo binario donde escribir el PDF
+        titulo: Título del reporte
+        limite: Número máximo de filas a exportar (None para todas)
+        progreso: Función opcional que recibe las filas dibujadas (ver
+            filas_solicitudes)
+
+    Returns:
+        int: Número de solicitudes exportadas
+    """
+    encabezado = TablaPdf([ENCABEZADOS_PDF], colWidths=ANCHOS_PDF)
+    encabezado.setStyle(ESTILO_ENCABEZADO_PDF)
+    paginador = _PaginadorPdf(destino, titulo, encabezado)
+    estilo_celda = ParagraphStyle("Normal", fontSize=7, alignment=1)
+
+    def dibujar_bloque(filas):
+        tabla = TablaPdf(filas, colWidths=ANCHOS_PDF)
+        tabla.setStyle(ESTILO_TABLA_PDF)
+        paginador.dibujar(tabla)
+
+    total = 0
+    primero = None
+    bloque = []
+    for fila in filas_solicitudes(queryset, limite, progreso):
+        bloque.append(_fila_pdf(fila, estilo_celda))
+        total += 1
+        if primero is None:
+            primero = fila["id_solicitud"]
+        if len(bloque) == FILAS_POR_TABLA_PDF:
+            dibujar_bloque(bloque)
+            bloque = []
+
+    if bloque:
+        dibujar_bloque(bloque)
+    elif not total:
+        paginador.encabezar()
+
+    if total and total == limite and queryset.filter(id_solicitud__lt=primero).exists():
+        paginador.texto(f"Reporte limitado a las {limite} solicitudes más recientes.")
+
+    paginador.guardar()
+    return total
@@ -0,0 +1,194 @@
+"""
+Generación de facturas en PDF de las solicitudes aprobadas.
+
+El PDF lo produce el motor configurado en settings.FACTURAS_MOTOR (ver
+core.motores_factura). La usan el envío de correos de la bandeja de salida,
+que adjunta la factura al momento de enviar el correo, y la descarga de
+facturas del aprendiz.
+
+Cada PDF generado se guarda en disco (FACTURAS_DIR) con un nombre que
+combina el id de la solicitud y un hash de los datos de la factura, del
+motor y de la imagen del producto; mientras ese contenido no cambie,
+reenviar o volver a descargar la factura no la genera otra vez.
+
+Las conversiones se ejecutan en un pool de FACTURAS_MAX_CONCURRENTES hilos
+por proceso, de modo que una ráfaga de aprobaciones no lanza decenas de
+procesos de wkhtmltopdf al mismo tiempo.
+"""
+
+import glob
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from core.motores_factura import obtener_motor, ruta_imagen
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _directorio():
+    """
+    Retorna el directorio de la caché de facturas, creándolo si no existe.
+
+    Returns:
+        str: Valor de settings.FACTURAS_DIR (BASE_DIR/cache/facturas por defecto)
+    """
+    directorio = getattr(settings, "FACTURAS_DIR", os.path.join(settings.BASE_DIR, "cache", "facturas"))
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def _obtener_pool():
+    """
+    Retorna el pool de hilos que ejecuta las conversiones a PDF.
+
+    Returns:
+        ThreadPoolExecutor: Pool con settings.FACTURAS_MAX_CONCURRENTES hilos (2 por defecto)
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "FACTURAS_MAX_CONCURRENTES", 2),
+                    thread_name_prefix="factura",
+                )
+    return _pool
+
+
+def _huella(motor, solicitud, documento):
+    """
+    Calcula el hash del contenido de la factura.
+
+    Incluye el motor que la genera y el tamaño y la fecha de modificación
+    de la imagen del producto, que el documento solo referencia por ruta.
+
+    Args:
+        motor: MotorFactura que genera la factura
+        solicitud: Instancia de Solicitud con su producto
+        documento: Datos de la factura retornados por motor.documento()
+
+    Returns:
+        str: Primeros 16 caracteres del SHA-256 del contenido
+    """
+    huella = hashlib.sha256(f"{motor.nombre}\n{documento!r}".encode("utf-8"))
+    ruta = ruta_imagen(solicitud)
+    if ruta:
+        try:
+            info = os.stat(ruta)
+            huella.update(f"{info.st_size}:{info.st_mtime_ns}".encode())
+        except OSError:
+            pass
+    return huella.hexdigest()[:16]
+
+
+def _guardar(solicitud, ruta, pdf_bytes):
+    """
+    Escribe el PDF en la caché y elimina las versiones anteriores de la factura.
+
+    El archivo se escribe primero con un nombre temporal y luego se renombra,
+    para que ningún lector vea un PDF a medio escribir.
+
+    Args:
+        solicitud: Instancia de Solicitud
+        ruta: Ruta final del PDF
+        pdf_bytes: Contenido del PDF
+    """
+    directorio = os.path.dirname(ruta)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as archivo:
+        archivo.write(pdf_bytes)
+    os.replace(temporal, ruta)
+
+    for anterior in glob.glob(os.path.join(directorio, f"factura_{solicitud.id_solicitud}_*.pdf")):
+        if anterior != ruta:
+            try:
+                os.remove(anterior)
+            except OSError:
+                pass
+
+
+def _preparar(motor, solicitud):
+    """
+    Reúne los datos de una factura y calcula la ruta de su PDF en caché.
+
+    Args:
+        motor: MotorFactura que genera la factura
+        solicitud: Instancia de Solicitud con su producto
+
+    Returns:
+        tuple: (ruta del PDF, datos de la factura para motor.convertir())
+    """
+    documento = motor.documento(solicitud)
+    nombre = f"factura_{solicitud.id_solicitud}_{_huella(motor, solicitud, documento)}.pdf"
+    return os.path.join(_directorio(), nombre), documento
+
+
+def obtener_facturas(solicitudes):
+    """
+    Retorna las rutas de los PDF de varias facturas, generando las que faltan.
+
+    Las facturas que no están en caché se convierten en paralelo en el pool
+    (como máximo FACTURAS_MAX_CONCURRENTES a la vez).
+
+    Args:
+        solicitudes: Lista de instancias de Solicitud con su producto
+
+    Returns:
+        dict: id_solicitud -> ruta del PDF
+
+    Raises:
+        Exception: Si el motor no puede generar alguno de los documentos
+    """
+    motor = obtener_motor()
+    rutas = {}
+    pendientes = []
+    for solicitud in solicitudes:
+        ruta, documento = _preparar(motor, solicitud)
+        rutas[solicitud.id_solicitud] = ruta
+        if not os.path.exists(ruta):
+            pendientes.append((solicitud, ruta, _obtener_pool().submit(motor.convertir, documento)))
+
+    for solicitud, ruta, tarea in pendientes:
+        _guardar(solicitud, ruta, tarea.result())
+
+    return rutas
+
+
+def obtener_factura(solicitud):
+    """
+    Retorna la ruta del PDF de la factura, generándolo si no está en caché.
+
+    Args:
+        solicitud: Instancia de Solicitud con su producto
+
+    Returns:
+        str: Ruta del PDF en la caché de facturas
+
+    Raises:
+        Exception: Si el motor no puede generar el documento
+    """
+    return obtener_facturas([solicitud])[solicitud.id_solicitud]
+
+
+def generar_factura_pdf_bytes(solicitud):
+    """
+    Retorna el contenido del PDF de la factura de una solicitud.
+
+    Args:
+        solicitud: Instancia de Solicitud con su producto
+
+    Returns:
+        bytes: Contenido del PDF
+
+    Raises:
+        Exception: Si el motor no puede generar el documento
+    """
+    with open(obtener_factura(solicitud), "rb") as archivo:
+        return archivo.read()
@@ -0,0 +1,272 @@
+"""
+Filtros de solicitudes compartidos por el seguimiento de pedidos y los reportes.
+
+FiltroSolicitudes reúne los parámetros buscar, estado, usuario, desde y
+hasta, los normaliza y los convierte en un único queryset, de modo que el
+listado y las exportaciones a PDF y Excel filtran exactamente igual.
+
+Los IDs que resultan de un filtro se guardan en la caché de Django con una
+clave derivada de los parámetros normalizados. Ver la página de seguimiento
+y luego exportarla con los mismos filtros ejecuta la búsqueda una sola vez:
+
+    seguimiento ?buscar=Camisa&estado=Pendiente  -> búsqueda, guarda IDs
+    exportar_pdf ?buscar=camisa&estado=pendiente -> misma clave, usa IDs
+
+Cualquier escritura sobre solicitudes (creación, cambio de estado,
+eliminación o cambio del índice de búsqueda) llama a invalidar(), que
+cambia la versión de las claves y deja sin efecto todos los resultados
+guardados.
+"""
+
+import hashlib
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import busqueda
+from core.models import Solicitud
+
+
+CLAVE_VERSION = "filtros_solicitudes:version"
+
+# Parámetros de la URL que forman un filtro
+PARAMETROS = ("buscar", "estado", "usuario", "desde", "hasta")
+
+
+def _ttl():
+    """
+    Retorna el tiempo de vida de los resultados guardados en segundos.
+
+    Returns:
+        int: Valor de settings.FILTROS_CACHE_TTL (300 por defecto)
+    """
+    return getattr(settings, "FILTROS_CACHE_TTL", 300)
+
+
+def _maximo_ids():
+    """
+    Retorna el número máximo de IDs que se guardan por filtro.
+
+    Returns:
+        int: Valor de settings.FILTROS_MAX_IDS (5000 por defecto)
+    """
+    return getattr(settings, "FILTROS_MAX_IDS", 5000)
+
+
+def _version():
+    """
+    Retorna la versión actual de los resultados guardados, creándola si no existe.
+
+    Returns:
+        str: Versión que forma parte de cada clave
+    """
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, uuid.uuid4().hex, None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def invalidar():
+    """
+    Descarta todos los resultados de filtros guardados.
+
+    Se invalida de inmediato y de nuevo al confirmar la transacción, para
+    que un filtro ejecutado mientras la transacción seguía abierta no quede
+    guardado con los datos anteriores.
+    """
+    cache.delete(CLAVE_VERSION)
+    transaction.on_commit(lambda: cache.delete(CLAVE_VERSION))
+
+
+def _fecha(valor):
+    """
+    Convierte un parámetro AAAA-MM-DD en fecha.
+
+    Args:
+        valor: Texto recibido
+
+    Returns:
+        date: Fecha indicada, o None si falta o no es válida
+    """
+    try:
+        return datetime.strptime((valor or "").strip(), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+class FiltroSolicitudes:
+    """
+    Especificación normalizada de un filtro de solicitudes.
+
+    Attributes:
+        buscar: Texto buscado en el índice de core.busqueda
+        estado: Estado de la solicitud, en minúsculas
+        usuario: Parte del nombre del aprendiz, en minúsculas
+        desde: Fecha mínima de solicitud (date o None)
+        hasta: Fecha máxima de solicitud (date o None)
+    """
+
+    def __init__(self, buscar="", estado="", usuario="", desde=None, hasta=None):
+        self.buscar = " ".join(busqueda.terminos(buscar))
+        self.estado = (estado or "").strip().lower()
+        self.usuario = (usuario or "").strip().lower()
+        self.desde = desde
+        self.hasta = hasta
+
+    @classmethod
+    def desde_parametros(cls, parametros):
+        """
+        Construye el filtro a partir de parámetros de texto.
+
+        Args:
+            parametros: Diccionario o QueryDict con PARAMETROS (los que
+                faltan se toman como vacíos)
+
+        Returns:
+            FiltroSolicitudes: Filtro con los parámetros normalizados
+        """
+        return cls(
+            buscar=parametros.get("buscar", ""),
+            estado=parametros.get("estado", ""),
+            usuario=parametros.get("usuario", ""),
+            desde=_fecha(parametros.get("desde")),
+            hasta=_fecha(parametros.get("hasta")),
+        )
+
+    @classmethod
+    def desde_request(cls, request):
+        """
+        Construye el filtro a partir de los parámetros GET.
+
+        Args:
+            request: Objeto HttpRequest
+
+        Returns:
+            FiltroSolicitudes: Filtro con los parámetros normalizados
+        """
+        return cls.desde_parametros(request.GET)
+
+    @property
+    def vacio(self):
+        """
+        Indica si el filtro no restringe ninguna solicitud.
+
+        Returns:
+            bool: True si no hay ningún parámetro
+        """
+        return not (self.buscar or self.estado or self.usuario or self.desde or self.hasta)
+
+    def clave(self):
+        """
+        Retorna la clave de caché de los resultados del filtro.
+
+        Dos requests con los mismos parámetros normalizados (sin importar
+        mayúsculas, tildes ni orden de las palabras buscadas) comparten clave.
+
+        Returns:
+            str: Clave con la versión actual de los resultados
+        """
+        partes = "|".join([
+            " ".join(sorted(self.buscar.split())),
+            self.estado,
+            self.usuario,
+            self.desde.isoformat() if self.desde else "",
+            self.hasta.isoformat() if self.hasta else "",
+        ])
+        huella = hashlib.sha1(partes.encode()).hexdigest()
+        return f"filtros_solicitudes:{_version()}:{huella}"
+
+    def compilar(self, queryset=None):
+        """
+        Aplica el filtro como condiciones de un queryset, sin usar la caché.
+
+        Args:
+            queryset: QuerySet de Solicitud base (None para todas)
+
+        Returns:
+            QuerySet: Solicitudes que cumplen el filtro
+        """
+        if queryset is None:
+            queryset = Solicitud.objects.all()
+        if self.buscar:
+            queryset = busqueda.filtrar(queryset, self.buscar)
+        if self.estado:
+            queryset = queryset.filter(estado_solicitud=self.estado)
+        if self.usuario:
+            queryset = queryset.filter(id_aprendiz__nombre__icontains=self.usuario)
+        if self.desde:
+            queryset = queryset.filter(fecha_solicitud__date__gte=self.desde)
+        if self.hasta:
+            queryset = queryset.filter(fecha_solicitud__date__lte=self.hasta)
+        return queryset
+
+    def ids(self):
+        """
+        Retorna los IDs de las solicitudes del filtro, usando la caché.
+
+        Returns:
+            list: IDs de las solicitudes, o None si superan
+            settings.FILTROS_MAX_IDS y conviene filtrar en la consulta
+        """
+        clave = self.clave()
+        guardado = cache.get(clave)
+        if guardado is not None:
+            return guardado["ids"]
+
+        maximo = _maximo_ids()
+        ids = list(self.compilar().order_by().values_list("id_solicitud", flat=True)[:maximo + 1])
+        if len(ids) > maximo:
+            ids = None
+        cache.set(clave, {"ids": ids}, _ttl())
+        return ids
+
+    def aplicar(self, queryset=None):
+        """
+        Filtra un queryset con los IDs guardados del filtro.
+
+        Args:
+            queryset: QuerySet de Solicitud base (None para todas)
+
+        Returns:
+            QuerySet: Solicitudes que cumplen el filtro
+        """
+        if queryset is None:
+            queryset = Solicitud.objects.all()
+        if self.vacio:
+            return queryset
+        ids = self.ids()
+        if ids is None:
+            return self.compilar(queryset)
+        return queryset.filter(id_solicitud__in=ids)
+
+    def titulo(self):
+        """
+        Retorna el título de los reportes generados con el filtro.
+
+        Returns:
+            str: Título que describe los parámetros aplicados
+        """
+        estado = self.estado.title()
+        usuario = self.usuario.title()
+        if estado and usuario:
+            titulo = f"Reporte de solicitudes {estado} de {usuario}"
+        elif estado and self.buscar:
+            titulo = f"Reporte de solicitudes {estado} ({self.buscar})"
+        elif usuario and self.buscar:
+            titulo = f"Reporte de solicitudes de {usuario} ({self.buscar})"
+        elif estado:
+            titulo = f"Reporte de solicitudes {estado}"
+        elif usuario:
+            titulo = f"Reporte de solicitudes de {usuario}"
+        elif self.buscar:
+            titulo = f"Reporte de solicitudes ({self.buscar})"
+        else:
+            titulo = "Reporte de todas las solicitudes"
+
+        if self.desde or self.hasta:
+            titulo += f" del {self.desde or '...'} al {self.hasta or '...'}"
+        return titulo
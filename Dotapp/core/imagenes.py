@@ -0,0 +1,325 @@
+"""
+Procesamiento y almacenamiento de las imágenes de los productos del sistema DotApp SENA.
+
+Las imágenes se guardan con el hash SHA-256 de su contenido como nombre, así
+que dos productos con la misma foto comparten un solo archivo y dos fotos
+distintas con el mismo nombre original no se sobrescriben. Junto al
+original se generan versiones reducidas de tamaño fijo para cada uso, en
+WebP y en el formato del original (JPEG, o PNG si tiene transparencia) para
+los navegadores que no admiten WebP:
+
+    productos/<sha256>.jpg
+    productos/<sha256>_miniatura.webp   productos/<sha256>_miniatura.jpg
+    productos/<sha256>_carrusel.webp    productos/<sha256>_carrusel.jpg
+
+Como el contenido de un nombre nunca cambia, estos archivos se sirven con
+cabeceras de caché de un año (ver es_inmutable). Las rutas generadas se
+guardan en Producto.imagen_variantes, de donde las leen las propiedades de
+URL del modelo sin consultar el disco.
+
+Un archivo se elimina cuando ningún producto lo referencia (ver liberar).
+Para no borrar una imagen que otro producto acaba de subir y aún no ha
+guardado, los archivos modificados hace menos de GRACIA_SEGUNDOS se
+conservan; el comando limpiar_imagenes elimina los que queden huérfanos.
+Las imágenes subidas antes de este almacenamiento se migran con el comando
+generar_variantes_imagen.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+
+# Variante -> lado máximo en píxeles (el doble del tamaño mostrado, para
+# pantallas de alta densidad)
+VARIANTES = {
+    "miniatura": 200,   # celda de 100px de la administración de productos
+    "carrusel": 800,    # carrusel de la creación de solicitudes
+}
+
+CALIDAD_WEBP = 80
+CALIDAD_JPEG = 85
+
+# Formato de Pillow -> extensión del archivo guardado
+EXTENSIONES = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+    "GIF": "gif",
+}
+
+# Segundos durante los que un archivo recién escrito no se elimina aunque
+# ningún producto lo referencie todavía
+GRACIA_SEGUNDOS = 600
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+
+_NOMBRE_CONTENIDO = re.compile(r"^productos/[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+$")
+
+
+def _ruta_absoluta(nombre):
+    """
+    Retorna la ruta en disco de un archivo de MEDIA_ROOT.
+
+    Args:
+        nombre: Ruta relativa a MEDIA_ROOT
+
+    Returns:
+        str: Ruta absoluta
+    """
+    return os.path.join(settings.MEDIA_ROOT, nombre)
+
+
+def nombre_variante(nombre, variante, extension):
+    """
+    Retorna la ruta relativa de una variante junto a la imagen original.
+
+    Args:
+        nombre: Ruta relativa de la imagen original (productos/foto.jpg)
+        variante: Nombre de la variante (ver VARIANTES)
+        extension: Extensión del archivo sin punto (webp, jpg, png)
+
+    Returns:
+        str: Ruta relativa de la variante (productos/foto_miniatura.webp)
+    """
+    base, _ = os.path.splitext(nombre)
+    return f"{base}_{variante}.{extension}"
+
+
+def _tiene_transparencia(imagen):
+    """
+    Indica si una imagen tiene canal alfa o color transparente.
+
+    Args:
+        imagen: Imagen de Pillow
+
+    Returns:
+        bool: True si la imagen tiene transparencia
+    """
+    return imagen.mode in ("RGBA", "LA") or (imagen.mode == "P" and "transparency" in imagen.info)
+
+
+def es_inmutable(nombre):
+    """
+    Indica si un archivo de MEDIA_ROOT tiene nombre derivado de su contenido.
+
+    Args:
+        nombre: Ruta relativa a MEDIA_ROOT
+
+    Returns:
+        bool: True si el archivo es una imagen de producto guardada por hash
+        (o una de sus variantes) y puede guardarse en caché indefinidamente
+    """
+    return bool(_NOMBRE_CONTENIDO.match(nombre))
+
+
+def guardar_original(archivo):
+    """
+    Valida una imagen y la guarda en MEDIA_ROOT/productos/ con el hash de su contenido.
+
+    Si ya existe un archivo con el mismo contenido no se vuelve a escribir.
+
+    Args:
+        archivo: UploadedFile recibido en request.FILES, o File de Django
+
+    Returns:
+        str: Ruta relativa a MEDIA_ROOT del archivo (productos/<sha256>.<ext>)
+
+    Raises:
+        PIL.UnidentifiedImageError: Si el archivo no es una imagen
+    """
+    archivo.seek(0)
+    with Image.open(archivo) as imagen:
+        formato = imagen.format
+        imagen.verify()
+
+    huella = hashlib.sha256()
+    archivo.seek(0)
+    for chunk in archivo.chunks():
+        huella.update(chunk)
+
+    extension = EXTENSIONES.get(formato, (formato or "img").lower())
+    nombre = f"productos/{huella.hexdigest()}.{extension}"
+    ruta = _ruta_absoluta(nombre)
+
+    if os.path.exists(ruta):
+        # Renovar la fecha para que liberar() no lo elimine mientras el
+        # producto que lo sube todavía no se ha guardado
+        os.utime(ruta)
+        return nombre
+
+    carpeta = os.path.dirname(ruta)
+    os.makedirs(carpeta, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as destino:
+            archivo.seek(0)
+            for chunk in archivo.chunks():
+                destino.write(chunk)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return nombre
+
+
+def _rutas_variantes(nombre, extension):
+    """
+    Retorna las rutas de todas las variantes de una imagen para una extensión.
+
+    Args:
+        nombre: Ruta relativa de la imagen original
+        extension: Extensión de las variantes que no son WebP
+
+    Returns:
+        dict: Variante -> {"webp": ruta, "original": ruta}
+    """
+    return {
+        variante: {
+            "webp": nombre_variante(nombre, variante, "webp"),
+            "original": nombre_variante(nombre, variante, extension),
+        }
+        for variante in VARIANTES
+    }
+
+
+def generar_variantes(nombre, reemplazar=False):
+    """
+    Genera las variantes de una imagen ya guardada en MEDIA_ROOT.
+
+    La imagen se orienta según sus datos EXIF y se reduce sin deformarla
+    hasta que su lado mayor mide como máximo el tamaño de cada variante
+    (las imágenes más pequeñas no se amplían). Si las variantes ya existen
+    (la misma imagen se subió antes) no se vuelven a generar.
+
+    Args:
+        nombre: Ruta relativa a MEDIA_ROOT de la imagen original
+        reemplazar: Si es True se regeneran aunque ya existan
+
+    Returns:
+        dict: Variante -> {"webp": ruta, "original": ruta} relativas a MEDIA_ROOT
+
+    Raises:
+        OSError: Si el archivo no existe o no es una imagen válida
+            (PIL.UnidentifiedImageError es una subclase)
+    """
+    if not reemplazar:
+        for extension in ("jpg", "png"):
+            existentes = _rutas_variantes(nombre, extension)
+            if all(
+                os.path.exists(_ruta_absoluta(ruta))
+                for formatos in existentes.values()
+                for ruta in formatos.values()
+            ):
+                return existentes
+
+    with Image.open(_ruta_absoluta(nombre)) as original:
+        original.load()
+        imagen = ImageOps.exif_transpose(original)
+
+    if _tiene_transparencia(imagen):
+        imagen = imagen.convert("RGBA")
+        extension, formato, opciones = "png", "PNG", {"optimize": True}
+    else:
+        imagen = imagen.convert("RGB")
+        extension, formato, opciones = "jpg", "JPEG", {"quality": CALIDAD_JPEG, "optimize": True, "progressive": True}
+
+    variantes = _rutas_variantes(nombre, extension)
+    for variante, lado in VARIANTES.items():
+        reducida = imagen.copy()
+        reducida.thumbnail((lado, lado), Image.LANCZOS)
+        reducida.save(_ruta_absoluta(variantes[variante]["webp"]), "WEBP", quality=CALIDAD_WEBP, method=4)
+        reducida.save(_ruta_absoluta(variantes[variante]["original"]), formato, **opciones)
+
+    return variantes
+
+
+def referencias(nombre):
+    """
+    Cuenta los productos que usan una imagen.
+
+    Args:
+        nombre: Ruta relativa a MEDIA_ROOT de la imagen original
+
+    Returns:
+        int: Número de productos con esa imagen
+    """
+    from core.models import Producto
+
+    return Producto.objects.filter(imagen=nombre).count()
+
+
+def _reciente(ruta):
+    """
+    Indica si un archivo se escribió o reutilizó hace menos de GRACIA_SEGUNDOS.
+
+    Args:
+        ruta: Ruta absoluta del archivo
+
+    Returns:
+        bool: True si el archivo es reciente
+    """
+    try:
+        return time.time() - os.path.getmtime(ruta) < GRACIA_SEGUNDOS
+    except OSError:
+        return False
+
+
+def liberar(nombre, inmediato=False):
+    """
+    Elimina una imagen y sus variantes si ningún producto la referencia.
+
+    Debe llamarse después de confirmar la transacción que eliminó o cambió
+    la imagen del producto. Los archivos recientes se conservan (ver
+    GRACIA_SEGUNDOS) y quedan para el comando limpiar_imagenes.
+
+    Args:
+        nombre: Ruta relativa a MEDIA_ROOT de la imagen original
+        inmediato: Si es True se eliminan aunque sean recientes
+
+    Returns:
+        bool: True si se eliminaron los archivos
+    """
+    if not nombre or referencias(nombre):
+        return False
+    if not inmediato and _reciente(_ruta_absoluta(nombre)):
+        return False
+
+    rutas = [nombre]
+    for extension in ("jpg", "png"):
+        for formatos in _rutas_variantes(nombre, extension).values():
+            rutas.extend(formatos.values())
+    for ruta in set(rutas):
+        try:
+            os.remove(_ruta_absoluta(ruta))
+        except OSError:
+            pass
+    return True
+
+
+def url_variante(producto, variante, formato):
+    """
+    Retorna la URL de una variante de la imagen de un producto.
+
+    Si la variante no se ha generado se usa la imagen original.
+
+    Args:
+        producto: Instancia de Producto
+        variante: Nombre de la variante (ver VARIANTES)
+        formato: "webp" u "original"
+
+    Returns:
+        str: URL de la variante o de la original, o None si no hay imagen
+    """
+    if not producto.imagen:
+        return None
+    ruta = (producto.imagen_variantes or {}).get(variante, {}).get(formato)
+    if ruta:
+        return settings.MEDIA_URL + ruta
+    return producto.imagen.url
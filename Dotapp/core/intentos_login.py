@@ -0,0 +1,232 @@
+"""
+Límite de intentos de inicio de sesión del sistema DotApp SENA.
+
+Cada intento de login calcula el hash Argon2 de la contraseña, que a
+propósito consume mucha CPU y memoria. Un ataque con listas de credenciales
+contra /core/login/ puede ocupar todos los workers con esos cálculos y
+dejar sin servicio a los usuarios reales. Por eso, antes de llamar a
+authenticate, cada intento se comprueba contra dos cubetas guardadas en la
+caché de Django:
+
+    login_cubeta:ip:<ip>          LOGIN_LIMITE_IP
+    login_cubeta:correo:<hash>    LOGIN_LIMITE_CORREO
+
+Cada cubeta tiene hasta "capacidad" fichas y recupera "por_minuto" fichas
+por minuto. Si alguna de las dos está vacía, el intento se rechaza sin
+calcular el hash y sin gastar fichas de la otra.
+
+Cada intento gasta una ficha del correo, pero la cubeta de la IP solo
+pierde fichas con los intentos fallidos (registrar_fallo). Un salón de
+clase detrás de una sola IP puede iniciar sesión a la vez sin agotarla,
+mientras que un ataque, cuyos intentos fallan casi todos, sí la vacía.
+
+La lectura y escritura de cada cubeta no es atómica: con intentos
+simultáneos sobre la misma cubeta pueden pasar algunos de más (en la de la
+IP, también los que aún están verificando la contraseña), lo cual es
+aceptable para proteger la CPU.
+
+Los totales de intentos permitidos, rechazados y fallidos se acumulan en la
+caché (ver contadores) y se consultan con el comando contadores_login.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Contador -> descripción (en el orden en que se muestran)
+CONTADORES = {
+    "permitidos": "Intentos que llegaron a verificar la contraseña",
+    "fallidos": "Intentos con credenciales inválidas",
+    "rechazados_ip": "Intentos rechazados por el límite de la IP",
+    "rechazados_correo": "Intentos rechazados por el límite del correo",
+}
+
+
+def _limite(nombre, capacidad, por_minuto):
+    """
+    Retorna la configuración de una cubeta.
+
+    Args:
+        nombre: Nombre del setting (LOGIN_LIMITE_IP o LOGIN_LIMITE_CORREO)
+        capacidad: Fichas máximas por defecto
+        por_minuto: Fichas recuperadas por minuto por defecto
+
+    Returns:
+        tuple: (capacidad, por_minuto)
+    """
+    limite = getattr(settings, nombre, {})
+    return limite.get("capacidad", capacidad), limite.get("por_minuto", por_minuto)
+
+
+def obtener_ip(request):
+    """
+    Retorna la IP del cliente que hace el intento.
+
+    Si el servidor está detrás de un proxy, LOGIN_CABECERA_IP indica la
+    cabecera de META con la IP original (por ejemplo HTTP_X_REAL_IP); si es
+    una lista separada por comas se toma la primera.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        str: IP del cliente ("" si no se conoce)
+    """
+    cabecera = getattr(settings, "LOGIN_CABECERA_IP", None)
+    valor = request.META.get(cabecera, "") if cabecera else ""
+    if not valor:
+        valor = request.META.get("REMOTE_ADDR", "")
+    return valor.split(",")[0].strip()
+
+
+def _clave_correo(correo):
+    """
+    Retorna la clave de caché de la cubeta de un correo.
+
+    El correo se normaliza y se resume con SHA-1 para que la clave tenga
+    siempre caracteres válidos y longitud fija.
+
+    Args:
+        correo: Correo ingresado en el formulario
+
+    Returns:
+        str: Clave de caché
+    """
+    huella = hashlib.sha1(correo.strip().lower().encode()).hexdigest()
+    return f"login_cubeta:correo:{huella}"
+
+
+def _calcular(clave, capacidad, por_minuto, ahora):
+    """
+    Calcula las fichas disponibles de una cubeta.
+
+    Args:
+        clave: Clave de caché de la cubeta
+        capacidad: Fichas máximas
+        por_minuto: Fichas recuperadas por minuto
+        ahora: Hora actual (epoch)
+
+    Returns:
+        tuple: (fichas disponibles, segundos de espera hasta tener una ficha)
+    """
+    fichas, instante = cache.get(clave, (capacidad, ahora))
+    fichas = min(capacidad, fichas + (ahora - instante) * por_minuto / 60)
+    espera = 0 if fichas >= 1 else (1 - fichas) * 60 / por_minuto
+    return fichas, espera
+
+
+def _incrementar(nombre):
+    """
+    Suma uno a un contador de intentos.
+
+    Args:
+        nombre: Nombre del contador (ver CONTADORES)
+    """
+    clave = f"login_contador:{nombre}"
+    cache.add(clave, 0, None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # El contador se eliminó entre add e incr
+        cache.set(clave, 1, None)
+
+
+def _clave_ip(request):
+    """
+    Retorna la clave de caché de la cubeta de la IP de un intento.
+
+    Args:
+        request: Objeto HttpRequest del intento
+
+    Returns:
+        str: Clave de caché
+    """
+    return f"login_cubeta:ip:{obtener_ip(request)}"
+
+
+def _gastar(clave, fichas, capacidad, por_minuto, ahora):
+    """
+    Guarda una cubeta con una ficha menos.
+
+    Args:
+        clave: Clave de caché de la cubeta
+        fichas: Fichas disponibles calculadas con _calcular
+        capacidad: Fichas máximas
+        por_minuto: Fichas recuperadas por minuto
+        ahora: Hora actual (epoch)
+    """
+    # La cubeta se puede olvidar cuando ya estaría llena de nuevo
+    llena_en = int((capacidad - fichas + 1) * 60 / por_minuto) + 1
+    cache.set(clave, (fichas - 1, ahora), llena_en)
+
+
+def consumir(request, correo):
+    """
+    Comprueba la cubeta de la IP y gasta una ficha del correo antes de
+    verificar la contraseña.
+
+    Args:
+        request: Objeto HttpRequest del intento
+        correo: Correo ingresado en el formulario
+
+    Returns:
+        int: 0 si el intento puede continuar, o segundos que se deben esperar
+        antes de volver a intentarlo
+    """
+    ahora = time.time()
+    cubetas = [("ip", _clave_ip(request), *_limite("LOGIN_LIMITE_IP", 20, 10))]
+    if correo:
+        cubetas.append(("correo", _clave_correo(correo), *_limite("LOGIN_LIMITE_CORREO", 5, 2)))
+
+    calculadas = []
+    for tipo, clave, capacidad, por_minuto in cubetas:
+        fichas, espera = _calcular(clave, capacidad, por_minuto, ahora)
+        if espera:
+            _incrementar(f"rechazados_{tipo}")
+            return max(int(espera + 0.999), 1)
+        calculadas.append((tipo, clave, fichas, capacidad, por_minuto))
+
+    for tipo, clave, fichas, capacidad, por_minuto in calculadas:
+        # La ficha de la IP se gasta solo si el intento falla
+        if tipo != "ip":
+            _gastar(clave, fichas, capacidad, por_minuto, ahora)
+    _incrementar("permitidos")
+    return 0
+
+
+def registrar_fallo(request):
+    """
+    Cuenta un intento con credenciales inválidas y gasta una ficha de su IP.
+
+    Args:
+        request: Objeto HttpRequest del intento
+    """
+    ahora = time.time()
+    clave = _clave_ip(request)
+    capacidad, por_minuto = _limite("LOGIN_LIMITE_IP", 20, 10)
+    fichas, _ = _calcular(clave, capacidad, por_minuto, ahora)
+    # Con intentos simultáneos la cubeta puede quedar por debajo de cero;
+    # así la espera también cubre los intentos que pasaron de más
+    _gastar(clave, fichas, capacidad, por_minuto, ahora)
+    _incrementar("fallidos")
+
+
+def contadores():
+    """
+    Retorna los totales de intentos de inicio de sesión.
+
+    Returns:
+        dict: Nombre del contador -> total (ver CONTADORES)
+    """
+    guardados = cache.get_many([f"login_contador:{nombre}" for nombre in CONTADORES])
+    return {nombre: guardados.get(f"login_contador:{nombre}", 0) for nombre in CONTADORES}
+
+
+def reiniciar_contadores():
+    """
+    Pone en cero los totales de intentos de inicio de sesión.
+    """
+    cache.delete_many([f"login_contador:{nombre}" for nombre in CONTADORES])
@@ -0,0 +1,120 @@
+"""
+Servicio de reservas de inventario para el sistema DotApp SENA.
+
+Este módulo centraliza los movimientos de stock asociados al ciclo de vida
+de una solicitud. Cada operación es un único UPDATE condicional sobre la
+fila del producto (sin SELECT previo), de modo que dos aprendices que piden
+el mismo artículo al mismo tiempo nunca pueden dejar el stock en negativo.
+
+Operaciones disponibles:
+- reservar_stock: Descuenta unidades al crear una solicitud
+- liberar_stock: Devuelve unidades al rechazar o cancelar una solicitud
+- liberar_stock_lote: Devuelve unidades de varios productos en un solo UPDATE
+
+Aprobar una solicitud no mueve stock: las unidades ya se descontaron al
+reservarlas y solo dejan de ser liberables.
+
+Como los UPDATE directos no disparan señales, cada movimiento aumenta la
+versión del stock (versiones.STOCK) al confirmar la transacción. Es una
+versión aparte de la de productos para que los pedidos solo invaliden las
+respuestas que muestran el stock (ver core.versiones).
+"""
+
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.timezone import now
+
+from core import versiones
+from core.models import Producto
+
+
+class StockInsuficiente(Exception):
+    """
+    Excepción lanzada cuando un producto no tiene stock suficiente
+    para cubrir la cantidad solicitada.
+
+    Attributes:
+        disponible: Stock del producto leído después del UPDATE fallido
+            (0 si el producto no existe)
+    """
+
+    def __init__(self, mensaje, disponible=0):
+        super().__init__(mensaje)
+        self.disponible = disponible
+
+
+def reservar_stock(producto_id, cantidad):
+    """
+    Reserva unidades de un producto mediante un UPDATE condicional.
+
+    El descuento solo se aplica si el stock actual alcanza para la cantidad
+    solicitada; la comprobación y la escritura ocurren en la misma sentencia,
+    por lo que no hay ventana de carrera entre leer y escribir.
+
+    Args:
+        producto_id: ID del producto a reservar
+        cantidad: Número de unidades a reservar (mínimo 1)
+
+    Raises:
+        ValueError: Si la cantidad no es positiva
+        StockInsuficiente: Si el producto no existe o no tiene stock suficiente
+    """
+    if cantidad < 1:
+        raise ValueError("La cantidad a reservar debe ser mayor que cero.")
+
+    actualizados = Producto.objects.filter(
+        id_producto=producto_id,
+        stock__gte=cantidad,
+    ).update(stock=F("stock") - cantidad, updated_at=now())
+
+    if not actualizados:
+        # Solo en el caso de error se lee el stock, para informar cuánto queda
+        disponible = Producto.objects.filter(id_producto=producto_id).values_list("stock", flat=True).first()
+        raise StockInsuficiente(f"No hay stock suficiente para el producto {producto_id}.", disponible or 0)
+    versiones.incrementar(versiones.STOCK)
+
+
+def liberar_stock(producto_id, cantidad):
+    """
+    Devuelve al inventario las unidades de una reserva.
+
+    Se utiliza cuando una solicitud pendiente es rechazada o cancelada.
+    Debe llamarse dentro de la misma transacción que cambia el estado
+    de la solicitud para que el stock no se devuelva dos veces.
+
+    Args:
+        producto_id: ID del producto cuyas unidades se devuelven
+        cantidad: Número de unidades a devolver
+    """
+    if cantidad < 1:
+        return
+
+    Producto.objects.filter(id_producto=producto_id).update(
+        stock=F("stock") + cantidad, updated_at=now()
+    )
+    versiones.incrementar(versiones.STOCK)
+
+
+def liberar_stock_lote(cantidades):
+    """
+    Devuelve al inventario las unidades de varias reservas a la vez.
+
+    Todas las devoluciones se aplican en un único UPDATE con CASE sobre
+    el id del producto, en lugar de una sentencia por solicitud.
+
+    Args:
+        cantidades: Diccionario {id_producto: unidades a devolver}
+    """
+    cantidades = {pk: cant for pk, cant in cantidades.items() if cant > 0}
+    if not cantidades:
+        return
+
+    incremento = Case(
+        *[When(id_producto=pk, then=Value(cant)) for pk, cant in cantidades.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Producto.objects.filter(id_producto__in=cantidades.keys()).update(
+        stock=F("stock") + incremento, updated_at=now()
+    )
+    versiones.incrementar(versiones.STOCK)
+
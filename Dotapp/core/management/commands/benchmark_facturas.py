@@ -0,0 +1,112 @@
+"""
+Comando de gestión para comparar los motores de generación de facturas.
+
+Genera varias veces la factura de una misma solicitud con cada motor de
+core.motores_factura, sin pasar por la caché de facturas, y reporta la
+latencia por factura y la memoria usada:
+
+- Memoria Python: pico de memoria asignada por el proceso durante la
+  generación (tracemalloc); mide a los motores que trabajan en el proceso.
+- RSS hijos: memoria residente máxima de los procesos hijos (wkhtmltopdf);
+  es el máximo de todos los hijos del comando, no solo del último motor.
+"""
+
+import resource
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Solicitud
+from core.motores_factura import MOTORES, obtener_motor
+
+
+class Command(BaseCommand):
+    """
+    Comando para medir la latencia y la memoria de cada motor de facturas.
+    """
+
+    help = 'Compara la latencia y la memoria de los motores de facturas'
+
+    def add_arguments(self, parser):
+        """
+        Define las opciones del comando.
+
+        Args:
+            parser: ArgumentParser del comando
+        """
+        parser.add_argument('--solicitud', type=int, default=None,
+                            help='ID de la solicitud a facturar (por defecto la más reciente)')
+        parser.add_argument('--repeticiones', type=int, default=10,
+                            help='Facturas generadas por motor')
+        parser.add_argument('--motores', nargs='+', choices=sorted(MOTORES), default=sorted(MOTORES),
+                            help='Motores a comparar')
+
+    def medir(self, motor, solicitud, repeticiones):
+        """
+        Genera la factura varias veces con un motor y mide cada generación.
+
+        Args:
+            motor: MotorFactura a medir
+            solicitud: Instancia de Solicitud a facturar
+            repeticiones: Número de facturas a generar
+
+        Returns:
+            dict: Tiempos en milisegundos, pico de memoria Python en KiB
+            y tamaño del PDF en bytes
+        """
+        # Una generación previa para cargar módulos y fuentes
+        motor.convertir(motor.documento(solicitud))
+
+        tiempos = []
+        tracemalloc.start()
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            pdf = motor.convertir(motor.documento(solicitud))
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {"tiempos": tiempos, "pico_kib": pico / 1024, "bytes": len(pdf)}
+
+    def handle(self, *args, **options):
+        """
+        Mide cada motor y escribe una tabla con los resultados.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+
+        Raises:
+            CommandError: Si no hay solicitudes para facturar
+        """
+        solicitudes = Solicitud.objects.select_related("id_aprendiz", "id_producto")
+        if options['solicitud']:
+            solicitud = solicitudes.filter(id_solicitud=options['solicitud']).first()
+        else:
+            solicitud = solicitudes.order_by("-fecha_solicitud").first()
+        if solicitud is None:
+            raise CommandError("No hay una solicitud para generar la factura")
+
+        repeticiones = max(1, options['repeticiones'])
+        self.stdout.write(f"Solicitud #{solicitud.id_solicitud}, {repeticiones} facturas por motor\n")
+        self.stdout.write(
+            f"{'Motor':<12} {'Media ms':>9} {'p95 ms':>9} {'Mín ms':>9} "
+            f"{'Mem. Python KiB':>16} {'RSS hijos KiB':>14} {'PDF bytes':>10}"
+        )
+
+        for nombre in options['motores']:
+            try:
+                resultado = self.medir(obtener_motor(nombre), solicitud, repeticiones)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"{nombre:<12} no disponible: {type(e).__name__}: {e}"))
+                continue
+
+            tiempos = sorted(resultado["tiempos"])
+            p95 = tiempos[min(len(tiempos) - 1, int(round(0.95 * (len(tiempos) - 1))))]
+            rss_hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            self.stdout.write(
+                f"{nombre:<12} {statistics.mean(tiempos):>9.1f} {p95:>9.1f} {tiempos[0]:>9.1f} "
+                f"{resultado['pico_kib']:>16.0f} {rss_hijos:>14} {resultado['bytes']:>10}"
+            )
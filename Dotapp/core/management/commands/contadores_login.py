@@ -0,0 +1,46 @@
+"""
+Comando de gestión para consultar los contadores de intentos de inicio de sesión.
+
+Muestra cuántos intentos llegaron a verificar la contraseña, cuántos
+fallaron y cuántos se rechazaron por el límite de la IP o del correo (ver
+core.intentos_login). Un aumento de los rechazados indica un ataque en
+curso contra el formulario de login.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.intentos_login import CONTADORES, contadores, reiniciar_contadores
+
+
+class Command(BaseCommand):
+    """
+    Comando para mostrar los contadores de intentos de inicio de sesión.
+    """
+
+    help = 'Muestra los intentos de inicio de sesión permitidos, fallidos y rechazados'
+
+    def add_arguments(self, parser):
+        """
+        Define las opciones del comando.
+
+        Args:
+            parser: ArgumentParser del comando
+        """
+        parser.add_argument('--reiniciar', action='store_true',
+                            help='Pone los contadores en cero después de mostrarlos')
+
+    def handle(self, *args, **options):
+        """
+        Muestra cada contador con su descripción.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+        """
+        totales = contadores()
+        for nombre, descripcion in CONTADORES.items():
+            self.stdout.write(f"{nombre}: {totales[nombre]}  ({descripcion})")
+
+        if options['reiniciar']:
+            reiniciar_contadores()
+            self.stdout.write(self.style.SUCCESS("Contadores reiniciados"))
@@ -0,0 +1,82 @@
+"""
+Comando de gestión para enviar los correos de la bandeja de salida.
+
+Agrupa las notificaciones vencidas en correos de resumen (ver
+core.notificaciones) y envía por lotes los correos pendientes de
+CorreoSalida (ver core.bandeja_salida). Sin opciones vacía la bandeja y
+termina, para ejecutarlo como tarea programada; con --continuo queda en
+ejecución revisando la bandeja cada --intervalo segundos.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.bandeja_salida import enviar_pendientes
+from core.notificaciones import agrupar_pendientes
+
+
+class Command(BaseCommand):
+    """
+    Comando para enviar los correos pendientes con reintentos.
+
+    Los correos que fallan se reprograman con espera exponencial y, tras
+    CORREOS_MAX_INTENTOS intentos, quedan marcados como fallidos.
+    """
+
+    help = 'Envía los correos pendientes de la bandeja de salida'
+
+    def add_arguments(self, parser):
+        """
+        Define las opciones del comando.
+
+        Args:
+            parser: ArgumentParser del comando
+        """
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Correos por lote (por defecto CORREOS_TAMANO_LOTE)')
+        parser.add_argument('--continuo', action='store_true',
+                            help='Seguir revisando la bandeja en lugar de terminar')
+        parser.add_argument('--intervalo', type=float, default=10,
+                            help='Segundos entre revisiones en modo continuo')
+
+    def vaciar(self, lote):
+        """
+        Agrupa las notificaciones vencidas y envía lotes hasta que no
+        queden correos listos para enviar.
+
+        Args:
+            lote: Número de correos por lote
+
+        Returns:
+            tuple: (enviados, fallidos) en total
+        """
+        agrupar_pendientes()
+
+        total_enviados = total_fallidos = 0
+        while True:
+            enviados, fallidos = enviar_pendientes(lote)
+            total_enviados += enviados
+            total_fallidos += fallidos
+            if not enviados and not fallidos:
+                return total_enviados, total_fallidos
+
+    def handle(self, *args, **options):
+        """
+        Envía los correos pendientes una vez o en modo continuo.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+        """
+        while True:
+            enviados, fallidos = self.vaciar(options['lote'])
+
+            if enviados or fallidos or not options['continuo']:
+                self.stdout.write(self.style.SUCCESS(f"Correos enviados: {enviados}"))
+                if fallidos:
+                    self.stdout.write(self.style.WARNING(f"Correos con error (se reintentarán o quedaron fallidos): {fallidos}"))
+
+            if not options['continuo']:
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,99 @@
+"""
+Comando de gestión para migrar y completar las imágenes de productos.
+
+Las imágenes subidas desde la administración de productos ya se guardan por
+el hash de su contenido y con sus variantes (ver core.imagenes). Este
+comando lleva a ese esquema las imágenes cargadas antes: guarda cada
+archivo con el nombre de su contenido, actualiza los productos que lo
+usaban, elimina el archivo anterior y genera las variantes faltantes. Con
+--forzar regenera las variantes de todos los productos, por ejemplo después
+de cambiar los tamaños de VARIANTES.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from core import imagenes, versiones
+from core.models import Producto
+
+
+class Command(BaseCommand):
+    """
+    Comando para migrar las imágenes de productos y generar sus variantes.
+    """
+
+    help = 'Guarda por contenido las imágenes de productos y genera sus miniaturas y versiones WebP'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+
+        Args:
+            parser: Parser de argumentos
+        """
+        parser.add_argument(
+            '--forzar',
+            action='store_true',
+            help='Regenera también las variantes de los productos que ya las tienen',
+        )
+
+    def _procesar(self, nombre, forzar):
+        """
+        Lleva una imagen al almacenamiento por contenido y genera sus variantes.
+
+        Args:
+            nombre: Ruta relativa a MEDIA_ROOT de la imagen actual
+            forzar: Si es True se regeneran las variantes existentes
+
+        Returns:
+            tuple: (nombre por contenido, variantes)
+
+        Raises:
+            OSError: Si el archivo no existe o no es una imagen válida
+        """
+        if not imagenes.es_inmutable(nombre):
+            ruta = os.path.join(settings.MEDIA_ROOT, nombre)
+            with open(ruta, 'rb') as archivo:
+                nombre = imagenes.guardar_original(File(archivo, name=os.path.basename(ruta)))
+        return nombre, imagenes.generar_variantes(nombre, reemplazar=forzar)
+
+    def handle(self, *args, **options):
+        """
+        Procesa cada archivo una sola vez aunque varios productos compartan
+        la misma imagen.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+        """
+        nombres = (
+            Producto.objects.exclude(imagen__isnull=True).exclude(imagen='')
+            .values_list('imagen', flat=True).distinct().order_by('imagen')
+        )
+        actualizados = fallidos = 0
+
+        for anterior in list(nombres):
+            productos = Producto.objects.filter(imagen=anterior)
+            if not options['forzar'] and imagenes.es_inmutable(anterior) and not productos.filter(imagen_variantes={}).exists():
+                continue
+
+            try:
+                nombre, variantes = self._procesar(anterior, options['forzar'])
+            except OSError as e:
+                fallidos += 1
+                self.stdout.write(self.style.WARNING(f"{anterior}: {e}"))
+                continue
+
+            actualizados += productos.update(imagen=nombre, imagen_variantes=variantes)
+            if nombre != anterior:
+                # El archivo anterior quedó copiado con su nuevo nombre
+                imagenes.liberar(anterior, inmediato=True)
+
+        if actualizados:
+            versiones.incrementar('productos')
+        self.stdout.write(self.style.SUCCESS(
+            f"Productos actualizados: {actualizados}. Imágenes con error: {fallidos}"
+        ))
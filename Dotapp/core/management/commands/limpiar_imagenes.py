@@ -0,0 +1,79 @@
+"""
+Comando de gestión para eliminar las imágenes de productos sin referencias.
+
+Al eliminar un producto o cambiar su imagen, el archivo anterior se borra
+si ningún otro producto lo usa (ver core.imagenes.liberar), salvo que se
+haya escrito hace menos de GRACIA_SEGUNDOS. Este comando recorre
+MEDIA_ROOT/productos/ y elimina los archivos que ya no usa ningún producto,
+incluidos los que se conservaron por ser recientes y los temporales de
+subidas interrumpidas.
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import imagenes
+from core.models import Producto
+
+
+class Command(BaseCommand):
+    """
+    Comando para eliminar las imágenes de productos huérfanas.
+    """
+
+    help = 'Elimina las imágenes de productos que ningún producto usa'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+
+        Args:
+            parser: Parser de argumentos
+        """
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Solo lista los archivos que se eliminarían',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Elimina los archivos que no son la imagen de ningún producto ni una
+        de sus variantes.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+        """
+        carpeta = os.path.join(settings.MEDIA_ROOT, 'productos')
+        if not os.path.isdir(carpeta):
+            self.stdout.write(self.style.SUCCESS("Archivos eliminados: 0"))
+            return
+
+        usados = set()
+        for nombre in Producto.objects.exclude(imagen__isnull=True).exclude(imagen='').values_list('imagen', flat=True).distinct():
+            usados.add(nombre)
+            for variante in imagenes.VARIANTES:
+                for extension in ('webp', 'jpg', 'png'):
+                    usados.add(imagenes.nombre_variante(nombre, variante, extension))
+
+        limite = time.time() - imagenes.GRACIA_SEGUNDOS
+        eliminados = 0
+        for archivo in sorted(os.listdir(carpeta)):
+            ruta = os.path.join(carpeta, archivo)
+            if f'productos/{archivo}' in usados or not os.path.isfile(ruta):
+                continue
+            if os.path.getmtime(ruta) >= limite:
+                continue
+
+            if options['simular']:
+                self.stdout.write(f"productos/{archivo}")
+            else:
+                os.remove(ruta)
+            eliminados += 1
+
+        accion = "Archivos por eliminar" if options['simular'] else "Archivos eliminados"
+        self.stdout.write(self.style.SUCCESS(f"{accion}: {eliminados}"))
@@ -0,0 +1,58 @@
+"""
+Comando de gestión para generar los reportes pedidos en segundo plano.
+
+Elimina los reportes vencidos y genera los TrabajoExportacion pendientes
+(ver core.trabajos_exportacion). Sin opciones procesa los pendientes y
+termina, para ejecutarlo como tarea programada; con --continuo queda en
+ejecución revisando la cola cada --intervalo segundos. Se pueden ejecutar
+varios procesos a la vez para generar varios reportes en paralelo.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.trabajos_exportacion import limpiar_vencidos, procesar_pendientes
+
+
+class Command(BaseCommand):
+    """
+    Comando para generar los reportes pendientes y eliminar los vencidos.
+    """
+
+    help = 'Genera los reportes pendientes y elimina los vencidos'
+
+    def add_arguments(self, parser):
+        """
+        Define las opciones del comando.
+
+        Args:
+            parser: ArgumentParser del comando
+        """
+        parser.add_argument('--continuo', action='store_true',
+                            help='Seguir revisando la cola en lugar de terminar')
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help='Segundos entre revisiones en modo continuo')
+
+    def handle(self, *args, **options):
+        """
+        Procesa los trabajos pendientes una vez o en modo continuo.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+        """
+        while True:
+            eliminados = limpiar_vencidos()
+            terminados, fallidos = procesar_pendientes()
+
+            if terminados or fallidos or eliminados or not options['continuo']:
+                self.stdout.write(self.style.SUCCESS(f"Reportes generados: {terminados}"))
+                if fallidos:
+                    self.stdout.write(self.style.WARNING(f"Reportes con error: {fallidos}"))
+                if eliminados:
+                    self.stdout.write(f"Reportes vencidos eliminados: {eliminados}")
+
+            if not options['continuo']:
+                return
+            time.sleep(options['intervalo'])
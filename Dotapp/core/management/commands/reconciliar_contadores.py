@@ -0,0 +1,56 @@
+"""
+Comando de gestión para reconciliar los contadores de solicitudes por estado.
+
+Los contadores de ContadorEstado se ajustan en cada cambio hecho por la
+aplicación (ver core.contadores). Este comando los recalcula desde la tabla
+de solicitudes y corrige los que no coinciden, por ejemplo después de
+modificar solicitudes desde el admin, el shell o directamente en la base de
+datos.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.contadores import TODOS, reconciliar
+
+
+class Command(BaseCommand):
+    """
+    Comando para recalcular los contadores de solicitudes por estado.
+    """
+
+    help = 'Recalcula los contadores de solicitudes por estado y centro'
+
+    def add_arguments(self, parser):
+        """
+        Define las opciones del comando.
+
+        Args:
+            parser: ArgumentParser del comando
+        """
+        parser.add_argument('--verificar', action='store_true',
+                            help='Solo reportar las diferencias, sin corregirlas')
+
+    def handle(self, *args, **options):
+        """
+        Compara los contadores con la tabla de solicitudes y reporta las diferencias.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+
+        Raises:
+            CommandError: Si se usa --verificar y algún contador no coincide
+        """
+        verificar = options['verificar']
+        diferencias = reconciliar(aplicar=not verificar)
+
+        for estado, id_centro, guardado, real in diferencias:
+            centro = "todos los centros" if id_centro == TODOS else f"centro {id_centro}"
+            self.stdout.write(f"{estado} ({centro}): contador {guardado}, solicitudes {real}")
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS("Los contadores coinciden con las solicitudes"))
+        elif verificar:
+            raise CommandError(f"{len(diferencias)} contador(es) no coinciden con las solicitudes")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Contadores corregidos: {len(diferencias)}"))
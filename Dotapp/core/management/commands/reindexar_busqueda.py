@@ -0,0 +1,34 @@
+"""
+Comando de gestión para reconstruir el índice de búsqueda de las solicitudes.
+
+El índice TerminoSolicitud se actualiza al guardar solicitudes y al cambiar
+el nombre de un aprendiz (ver core.busqueda). Este comando lo reconstruye
+completo, por ejemplo después de cargar o modificar solicitudes directamente
+en la base de datos.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.busqueda import reindexar
+from core.filtros import invalidar
+
+
+class Command(BaseCommand):
+    """
+    Comando para reconstruir el índice de búsqueda de las solicitudes.
+    """
+
+    help = 'Reconstruye el índice de búsqueda de las solicitudes'
+
+    def handle(self, *args, **options):
+        """
+        Reindexa todas las solicitudes por lotes y descarta los resultados
+        de filtros guardados.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+        """
+        total = reindexar()
+        invalidar()
+        self.stdout.write(self.style.SUCCESS(f"Solicitudes indexadas: {total}"))
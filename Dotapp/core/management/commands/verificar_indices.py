@@ -0,0 +1,201 @@
+"""
+Comando de gestión para verificar que las consultas frecuentes usan índices.
+
+Ejecuta EXPLAIN sobre las consultas de las vistas más usadas (colas del
+almacenista y del despachador, historial del aprendiz, búsqueda de producto
+al crear una solicitud y seguimiento de pedidos con y sin búsqueda de texto)
+y reporta cualquier recorrido completo de tabla u ordenamiento fuera del
+índice.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.busqueda import filtrar
+from core.models import Producto, Solicitud
+from core.paginacion import POR_PAGINA
+
+
+# Orden y tamaño de la primera página de los listados (ver core.paginacion)
+ORDEN_LISTADOS = ("-fecha_solicitud", "-id_solicitud")
+LIMITE_LISTADOS = POR_PAGINA + 1
+
+
+def consultas_frecuentes():
+    """
+    Retorna las consultas de las vistas más usadas.
+
+    Los listados se ordenan y limitan igual que paginar_keyset, para que
+    el plan verificado sea el que ejecutan las vistas. Los que filtran por
+    un solo valor del índice deben leer sus filas ya ordenadas; se permite
+    ordenar cuando el filtro deja un conjunto acotado: la cola del
+    almacenista une dos estados del índice (solo las solicitudes activas) y
+    la búsqueda ordena únicamente las solicitudes que coinciden.
+
+    Returns:
+        list: Tuplas (descripción, queryset, debe leer en orden del índice)
+        a verificar con EXPLAIN
+    """
+    return [
+        (
+            "almacenista.solicitudes_inventario",
+            Solicitud.objects.filter(estado_solicitud__in=["pendiente", "aprobada"])
+            .order_by(*ORDEN_LISTADOS)[:LIMITE_LISTADOS],
+            False,
+        ),
+        (
+            "despachador.solicitudes_pendientes",
+            Solicitud.objects.filter(estado_solicitud="despachada").order_by(*ORDEN_LISTADOS)[:LIMITE_LISTADOS],
+            True,
+        ),
+        (
+            "aprendiz.historial_solicitudes",
+            Solicitud.objects.filter(id_aprendiz_id=1).order_by(*ORDEN_LISTADOS)[:LIMITE_LISTADOS],
+            True,
+        ),
+        (
+            "aprendiz.crear_solicitud",
+            Producto.objects.filter(tipo_id=1, talla_id=1, color_id=1),
+            False,
+        ),
+        (
+            "administrador.seguimiento_pedidos",
+            Solicitud.objects.order_by(*ORDEN_LISTADOS)[:LIMITE_LISTADOS],
+            True,
+        ),
+        (
+            "administrador.seguimiento_pedidos (buscar)",
+            filtrar(Solicitud.objects.all(), "camisa azul").order_by(*ORDEN_LISTADOS)[:LIMITE_LISTADOS],
+            False,
+        ),
+    ]
+
+
+def obtener_plan(queryset):
+    """
+    Ejecuta EXPLAIN sobre una consulta en el formato que entiende es_recorrido_completo.
+
+    En MySQL se pide el formato TREE cuando el servidor lo admite y el
+    tradicional en otro caso (MariaDB y MySQL anteriores a 8.0.16).
+
+    Args:
+        queryset: Consulta a verificar
+
+    Returns:
+        str: Plan de ejecución
+    """
+    if connection.vendor == "mysql":
+        if "TREE" in connection.features.supported_explain_formats:
+            return queryset.explain(format="TREE")
+        return queryset.explain(format="TRADITIONAL")
+    return queryset.explain()
+
+
+def es_recorrido_completo(plan, tabla):
+    """
+    Indica si un plan de EXPLAIN recorre completa la tabla indicada.
+
+    Reconoce la salida de SQLite (SCAN sin índice), MySQL en formato TREE
+    ("Table scan on <tabla>") o tradicional (columna type igual a ALL) y
+    PostgreSQL (Seq Scan).
+
+    Args:
+        plan: Texto retornado por QuerySet.explain()
+        tabla: Nombre de la tabla de la consulta
+
+    Returns:
+        bool: True si el plan hace un recorrido completo de la tabla
+    """
+    for linea in plan.splitlines():
+        if tabla not in linea:
+            continue
+        if connection.vendor == "sqlite":
+            if "SCAN" in linea and "INDEX" not in linea:
+                return True
+        elif connection.vendor == "mysql":
+            if f"Table scan on {tabla}" in linea:
+                return True
+            # Formato tradicional: las columnas van separadas por espacios y
+            # type sigue a table (o a partitions, según la versión)
+            columnas = linea.split()
+            if tabla in columnas[:3] and "ALL" in columnas[3:5]:
+                return True
+        elif "Seq Scan" in linea:
+            return True
+    return False
+
+
+def ordena_sin_indice(plan):
+    """
+    Indica si un plan de EXPLAIN ordena las filas en lugar de leerlas en orden.
+
+    Un listado paginado que ordena por su cuenta lee todas las filas
+    filtradas antes de devolver la primera página. Reconoce la salida de
+    SQLite (USE TEMP B-TREE), MySQL en formato TREE ("Sort:") o tradicional
+    (Using filesort) y PostgreSQL (nodo Sort).
+
+    Args:
+        plan: Texto retornado por QuerySet.explain()
+
+    Returns:
+        bool: True si el plan ordena las filas fuera del índice
+    """
+    for linea in plan.splitlines():
+        if connection.vendor == "sqlite":
+            if "USE TEMP B-TREE" in linea:
+                return True
+        elif connection.vendor == "mysql":
+            if "Sort:" in linea or "Using filesort" in linea:
+                return True
+        elif linea.strip().lstrip("->").strip().startswith(("Sort ", "Incremental Sort ")):
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    """
+    Comando para comprobar con EXPLAIN que las consultas frecuentes usan índices.
+
+    Falla con CommandError si alguna consulta recorre la tabla completa o
+    si un listado que debe leer en orden del índice ordena sus filas.
+    En tablas con muy pocas filas el motor puede preferir un recorrido
+    completo aunque exista el índice; ejecutar sobre datos representativos.
+    """
+
+    help = 'Verifica con EXPLAIN que las consultas frecuentes usan índices'
+
+    def handle(self, *args, **options):
+        """
+        Ejecuta EXPLAIN sobre cada consulta frecuente y reporta el resultado.
+
+        Args:
+            *args: Argumentos posicionales
+            **options: Opciones del comando
+
+        Raises:
+            CommandError: Si alguna consulta hace un recorrido completo u
+                ordena fuera del índice
+        """
+        fallidas = []
+
+        for descripcion, queryset, en_orden in consultas_frecuentes():
+            plan = obtener_plan(queryset)
+            tabla = queryset.model._meta.db_table
+
+            if es_recorrido_completo(plan, tabla):
+                fallidas.append(descripcion)
+                self.stdout.write(self.style.ERROR(f"{descripcion}: recorrido completo de {tabla}"))
+            elif ordena_sin_indice(plan):
+                if en_orden:
+                    fallidas.append(descripcion)
+                    self.stdout.write(self.style.ERROR(f"{descripcion}: ordena fuera del índice"))
+                else:
+                    self.stdout.write(self.style.WARNING(f"{descripcion}: usa índice y ordena las filas filtradas"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{descripcion}: usa índice"))
+
+            if options["verbosity"] > 1:
+                self.stdout.write(plan)
+
+        if fallidas:
+            raise CommandError(f"Consultas sin índice: {', '.join(fallidas)}")
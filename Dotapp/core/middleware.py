@@ -1,14 +1,22 @@
 """
 Middleware personalizado para el sistema DotApp SENA.
 
-Este módulo contiene middleware para guardar templates y manejar excepciones
-de manera amigable para el usuario.
+Este módulo contiene middleware para guardar templates, manejar excepciones
+de manera amigable para el usuario y renovar la sesión sin escribirla en
+cada request.
 """
 
+import time
+
+from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import render, redirect
 
 
+# Clave de la sesión con la hora (epoch) de su última escritura
+CLAVE_RENOVACION = "_renovada"
+
+
 class SaveLastTemplateMiddleware:
     """
     Middleware para guardar el nombre del último template renderizado.
@@ -100,5 +108,62 @@ class AmigableExceptionMiddleware:
 
         # Fallback: redirigir al login
         return redirect('login')
-    
 
+
+class RenovarSesionMiddleware:
+    """
+    Middleware que renueva la expiración de la sesión solo cuando hace falta.
+
+    La sesión expira tras SESSION_COOKIE_AGE segundos de inactividad, y la
+    fecha de expiración se actualiza cada vez que la sesión se guarda. En
+    lugar de guardarla en cada request (SESSION_SAVE_EVERY_REQUEST), se
+    guarda cuando la vista cambió sus datos o cuando pasó la fracción
+    SESION_RENOVACION_FRACCION de ese tiempo desde la última escritura. La
+    inactividad permitida queda entre SESSION_COOKIE_AGE menos ese intervalo
+    y SESSION_COOKIE_AGE, nunca por encima.
+
+    Debe ir después de SessionMiddleware en MIDDLEWARE, para que la sesión
+    marcada como modificada se guarde al procesar la respuesta.
+    """
+
+    def __init__(self, get_response):
+        """
+        Inicializa el middleware.
+
+        Args:
+            get_response: Función que procesa la solicitud y retorna la respuesta
+        """
+        self.get_response = get_response
+        fraccion = getattr(settings, "SESION_RENOVACION_FRACCION", 0.1)
+        self.intervalo = settings.SESSION_COOKIE_AGE * fraccion
+
+    def __call__(self, request):
+        """
+        Procesa la solicitud y marca la sesión para guardarse si toca renovarla.
+
+        Args:
+            request: Objeto HttpRequest
+
+        Returns:
+            HttpResponse: Respuesta procesada
+        """
+        response = self.get_response(request)
+
+        sesion = getattr(request, "session", None)
+        if sesion is None or sesion.session_key is None:
+            return response
+
+        # Leer la sesión aquí no debe añadir "Vary: Cookie" a respuestas
+        # que no la usaron
+        accedida = sesion.accessed
+        renovada = sesion.get(CLAVE_RENOVACION)
+        if sesion.is_empty():
+            sesion.accessed = accedida
+            return response
+
+        ahora = int(time.time())
+        if sesion.modified or renovada is None or ahora - renovada >= self.intervalo:
+            sesion[CLAVE_RENOVACION] = ahora
+        else:
+            sesion.accessed = accedida
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['estado_solicitud', '-fecha_solicitud'], name='solicitud_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['id_aprendiz', '-fecha_solicitud'], name='solicitud_aprendiz_fecha_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='producto',
+            constraint=models.UniqueConstraint(fields=('tipo', 'talla', 'color'), name='producto_tipo_talla_color_uniq'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_indices_solicitud_producto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSalida',
+            fields=[
+                ('id_correo', models.AutoField(primary_key=True, serialize=False)),
+                ('asunto', models.CharField(max_length=255)),
+                ('texto', models.TextField()),
+                ('html', models.TextField(blank=True)),
+                ('remitente', models.CharField(max_length=255)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('enviado', models.DateTimeField(blank=True, null=True)),
+                ('factura', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.solicitud')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_intento_idx')],
+            },
+        ),
+    ]
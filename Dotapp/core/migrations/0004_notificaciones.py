@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_bandeja_salida'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notificacion',
+            fields=[
+                ('id_notificacion', models.AutoField(primary_key=True, serialize=False)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('aprobada', 'Aprobada'), ('rechazada', 'Rechazada'), ('entregada', 'Entregada'), ('cancelada', 'Cancelada'), ('despachada', 'Despachada')], max_length=255)),
+                ('creado', models.DateTimeField(default=django.utils.timezone.now)),
+                ('aprendiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to=settings.AUTH_USER_MODEL)),
+                ('correo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notificaciones', to='core.correosalida')),
+                ('solicitud', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to='core.solicitud')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['correo', 'aprendiz', 'creado'], name='notificacion_pendiente_idx')],
+            },
+        ),
+    ]
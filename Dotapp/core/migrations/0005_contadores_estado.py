@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def poblar_contadores(apps, schema_editor):
+    """Cuenta las solicitudes existentes por estado y centro."""
+    Solicitud = apps.get_model('core', 'Solicitud')
+    ContadorEstado = apps.get_model('core', 'ContadorEstado')
+
+    totales = {}
+    filas = Solicitud.objects.values_list('estado_solicitud', 'centro_formacion_id').annotate(n=Count('pk')).order_by()
+    for estado, id_centro, n in filas:
+        claves = [(estado, 0)] + ([(estado, id_centro)] if id_centro else [])
+        for clave in claves:
+            totales[clave] = totales.get(clave, 0) + n
+
+    ContadorEstado.objects.bulk_create([
+        ContadorEstado(estado=estado, id_centro=id_centro, total=total)
+        for (estado, id_centro), total in sorted(totales.items())
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_notificaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorEstado',
+            fields=[
+                ('id_contador', models.AutoField(primary_key=True, serialize=False)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('aprobada', 'Aprobada'), ('rechazada', 'Rechazada'), ('entregada', 'Entregada'), ('cancelada', 'Cancelada'), ('despachada', 'Despachada')], max_length=255)),
+                ('id_centro', models.PositiveIntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('estado', 'id_centro'), name='contador_estado_centro_uniq')],
+            },
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def indexar_solicitudes(apps, schema_editor):
+    """Indexa las palabras de las solicitudes existentes."""
+    from core.busqueda import TAMANO_LOTE, terminos_de
+
+    Solicitud = apps.get_model('core', 'Solicitud')
+    TerminoSolicitud = apps.get_model('core', 'TerminoSolicitud')
+
+    ultimo = 0
+    while True:
+        lote = list(
+            Solicitud.objects.select_related('id_aprendiz')
+            .filter(id_solicitud__gt=ultimo)
+            .order_by('id_solicitud')[:TAMANO_LOTE]
+        )
+        if not lote:
+            break
+        TerminoSolicitud.objects.bulk_create([
+            TerminoSolicitud(solicitud_id=s.id_solicitud, termino=termino)
+            for s in lote
+            for termino in sorted(terminos_de(s))
+        ])
+        ultimo = lote[-1].id_solicitud
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_contadores_estado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoSolicitud',
+            fields=[
+                ('id_termino', models.AutoField(primary_key=True, serialize=False)),
+                ('termino', models.CharField(max_length=64)),
+                ('solicitud', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='core.solicitud')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('termino', 'solicitud'), name='termino_solicitud_uniq')],
+            },
+        ),
+        migrations.RunPython(indexar_solicitudes, migrations.RunPython.noop),
+    ]
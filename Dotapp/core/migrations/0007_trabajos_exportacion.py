@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoExportacion',
+            fields=[
+                ('id_trabajo', models.AutoField(primary_key=True, serialize=False)),
+                ('formato', models.CharField(choices=[('pdf', 'PDF'), ('excel', 'Excel')], max_length=10)),
+                ('parametros', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('terminado', 'Terminado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('total', models.PositiveIntegerField(blank=True, null=True)),
+                ('procesadas', models.PositiveIntegerField(default=0)),
+                ('archivo', models.CharField(blank=True, max_length=255)),
+                ('nombre_descarga', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('creado', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('terminado', models.DateTimeField(blank=True, null=True)),
+                ('expira', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exportaciones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'creado'], name='exportacion_estado_idx'), models.Index(fields=['expira'], name='exportacion_expira_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_imagen_variantes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='producto',
+            name='imagen',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='productos/'),
+        ),
+    ]
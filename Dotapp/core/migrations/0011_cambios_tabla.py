@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def marcar_depurado(apps, schema_editor):
+    """Las versiones anteriores a esta migración no tienen cambios anotados."""
+    VersionTabla = apps.get_model('core', 'VersionTabla')
+    VersionTabla.objects.update(depurado=F('version'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_versiones_tabla'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versiontabla',
+            name='depurado',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='CambioTabla',
+            fields=[
+                ('id_cambio', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tabla', models.CharField(max_length=50)),
+                ('version', models.PositiveBigIntegerField()),
+                ('registro_id', models.PositiveIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tabla', 'version'], name='cambio_tabla_version_idx')],
+            },
+        ),
+        migrations.RunPython(marcar_depurado, migrations.RunPython.noop),
+    ]
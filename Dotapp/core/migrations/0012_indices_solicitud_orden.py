@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_cambios_tabla'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='solicitud',
+            name='solicitud_estado_fecha_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='solicitud',
+            name='solicitud_aprendiz_fecha_idx',
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['estado_solicitud', '-fecha_solicitud', '-id_solicitud'], name='solicitud_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['id_aprendiz', '-fecha_solicitud', '-id_solicitud'], name='solicitud_aprendiz_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['-fecha_solicitud', '-id_solicitud'], name='solicitud_fecha_idx'),
+        ),
+    ]
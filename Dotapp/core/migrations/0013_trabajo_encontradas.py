@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_indices_solicitud_orden'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoexportacion',
+            name='encontradas',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -10,6 +10,8 @@ from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
+from core import imagenes
+
 
 class Rol(models.Model):
     """
@@ -46,6 +48,21 @@ class UsuarioManager(BaseUserManager):
     de usuarios y superusuarios con el modelo personalizado.
     """
     
+    def get_by_natural_key(self, correo):
+        """
+        Retorna el usuario con el correo indicado y su rol precargado.
+        
+        Lo usa el backend de autenticación al iniciar sesión; como las vistas
+        redirigen según el rol, cargarlo en la misma consulta evita otra.
+        
+        Args:
+            correo: Correo electrónico del usuario
+            
+        Returns:
+            Usuario: Instancia del usuario con su rol
+        """
+        return self.select_related('rol').get(**{self.model.USERNAME_FIELD: correo})
+
     def create_user(self, nombre, apellido, correo, password=None):
         """
         Crea y retorna un usuario normal con rol de aprendiz por defecto.
@@ -62,8 +79,8 @@ class UsuarioManager(BaseUserManager):
         Raises:
             ValueError: Si el correo no es proporcionado
         """
-        from core.models import Rol
-        aprendiz_rol, _ = Rol.objects.get_or_create(nombre_rol='aprendiz')
+        from core import catalogo
+        aprendiz_rol = catalogo.obtener_o_crear(Rol, 'aprendiz')
         if not correo:
             raise ValueError("El usuario debe tener correo electrónico")
         correo = self.normalize_email(correo)
@@ -91,10 +108,10 @@ class UsuarioManager(BaseUserManager):
         Raises:
             ValueError: Si ya existe un superusuario en el sistema
         """
-        from core.models import Rol
+        from core import catalogo
         if self.model.objects.filter(is_superuser=True).exists():
             raise ValueError("Ya existe un superusuario. Solo puede haber uno.")
-        admin_rol, _ = Rol.objects.get_or_create(nombre_rol='administrador')
+        admin_rol = catalogo.obtener_o_crear(Rol, 'administrador')
         usuario = self.create_user(nombre, apellido, correo, password)
         usuario.rol = admin_rol
         usuario.is_staff = True
@@ -141,9 +158,9 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
         Si el usuario no tiene un rol asignado, se le asigna automáticamente
         el rol de aprendiz por defecto.
         """
-        if not self.rol:
-            aprendiz_rol, _ = Rol.objects.get_or_create(nombre_rol="aprendiz")
-            self.rol = aprendiz_rol
+        if not self.rol_id:
+            from core import catalogo
+            self.rol = catalogo.obtener_o_crear(Rol, "aprendiz")
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -174,6 +191,21 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
         """
         return self.nombre
 
+    def get_session_auth_hash(self):
+        """
+        Retorna el hash con el que se verifica la sesión del usuario.
+
+        El usuario de sesión que se reconstruye desde la caché no tiene la
+        contraseña cargada (ver core.backends); en ese caso se usa el hash
+        calculado al guardarlo en caché, sin consultar la base de datos.
+
+        Returns:
+            str: Hash de sesión derivado de la contraseña
+        """
+        if "password" in self.get_deferred_fields() and hasattr(self, "_hash_sesion"):
+            return self._hash_sesion
+        return super().get_session_auth_hash()
+
 
 
 
@@ -261,6 +293,8 @@ class Producto(models.Model):
         precio: Precio del producto (DecimalField)
         stock: Cantidad disponible en inventario (PositiveIntegerField)
         imagen: Imagen del producto (ImageField, opcional)
+        imagen_variantes: Rutas de las versiones reducidas de la imagen
+            (JSONField, ver core.imagenes)
         almacenista: Usuario almacenista que creó el producto (ForeignKey)
         administrador: Usuario administrador asociado (ForeignKey, opcional)
         created_at: Fecha y hora de creación (DateTimeField)
@@ -288,7 +322,9 @@ class Producto(models.Model):
 
     precio = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
-    imagen = models.ImageField(upload_to='productos/', blank=True, null=True)
+    # Indexada para contar qué productos comparten una imagen (ver core.imagenes)
+    imagen = models.ImageField(upload_to='productos/', blank=True, null=True, db_index=True)
+    imagen_variantes = models.JSONField(default=dict, blank=True)
 
     almacenista = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -311,6 +347,16 @@ class Producto(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Un producto es único por su combinación de tipo, talla y color;
+        # la restricción también sirve de índice para buscarlo al crear solicitudes
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tipo', 'talla', 'color'],
+                name='producto_tipo_talla_color_uniq',
+            ),
+        ]
+
     def __str__(self):
         """
         Retorna la representación en string del producto.
@@ -332,6 +378,50 @@ class Producto(models.Model):
             return self.imagen.url
         return None
 
+    @property
+    def miniatura_url(self):
+        """
+        Retorna la URL de la miniatura de la imagen (JPEG o PNG).
+
+        Returns:
+            str: URL de la miniatura, de la imagen original si aún no se
+            generó, o None si no tiene imagen
+        """
+        return imagenes.url_variante(self, "miniatura", "original")
+
+    @property
+    def miniatura_webp_url(self):
+        """
+        Retorna la URL de la miniatura de la imagen en formato WebP.
+
+        Returns:
+            str: URL de la miniatura WebP, de la imagen original si aún no
+            se generó, o None si no tiene imagen
+        """
+        return imagenes.url_variante(self, "miniatura", "webp")
+
+    @property
+    def carrusel_url(self):
+        """
+        Retorna la URL de la imagen del carrusel (JPEG o PNG).
+
+        Returns:
+            str: URL de la imagen del carrusel, de la imagen original si aún
+            no se generó, o None si no tiene imagen
+        """
+        return imagenes.url_variante(self, "carrusel", "original")
+
+    @property
+    def carrusel_webp_url(self):
+        """
+        Retorna la URL de la imagen del carrusel en formato WebP.
+
+        Returns:
+            str: URL de la imagen del carrusel WebP, de la imagen original
+            si aún no se generó, o None si no tiene imagen
+        """
+        return imagenes.url_variante(self, "carrusel", "webp")
+
 
 
 class CentroFormacion(models.Model):
@@ -463,6 +553,16 @@ class Solicitud(models.Model):
 
     estado_solicitud = models.CharField(max_length=255, choices=ESTADOS, default='pendiente')
 
+    class Meta:
+        indexes = [
+            # Colas del almacenista y del despachador: filtro por estado, más recientes primero
+            models.Index(fields=['estado_solicitud', '-fecha_solicitud', '-id_solicitud'], name='solicitud_estado_fecha_idx'),
+            # Historial de un aprendiz, más recientes primero
+            models.Index(fields=['id_aprendiz', '-fecha_solicitud', '-id_solicitud'], name='solicitud_aprendiz_fecha_idx'),
+            # Seguimiento sin filtro de estado, más recientes primero
+            models.Index(fields=['-fecha_solicitud', '-id_solicitud'], name='solicitud_fecha_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Guarda la solicitud en la base de datos con lógica personalizada.
@@ -470,9 +570,10 @@ class Solicitud(models.Model):
         Este método:
         1. Copia los nombres de los objetos relacionados a los campos de texto
         2. Asigna la fecha de finalización según el estado
-        3. Actualiza el stock del producto según el estado de la solicitud:
-           - pendiente: Resta stock del producto
-           - rechazada/cancelada: Suma stock al producto
+
+        El stock del producto no se modifica aquí: las reservas y devoluciones
+        se hacen con core.inventario dentro de la transacción de cada cambio
+        de estado.
         """
         # Copiar los nombres actuales al guardar (solo si existen)
         if self.tipo:
@@ -494,24 +595,6 @@ class Solicitud(models.Model):
 
         super().save(*args, **kwargs)
 
-        # Actualizar stock según el estado
-        # Si se rechaza o cancela, devolver el stock al inventario
-        if self.estado_solicitud == "rechazada":
-            producto = self.id_producto
-            producto.stock += self.cantidad
-            producto.save()
-
-        if self.estado_solicitud == "cancelada":
-            producto = self.id_producto
-            producto.stock += self.cantidad
-            producto.save()
-
-        # Si se crea como pendiente, reservar stock
-        if self.estado_solicitud == "pendiente":
-            producto = self.id_producto
-            producto.stock -= self.cantidad
-            producto.save()
-
 
 
 
@@ -616,4 +699,318 @@ class Borrador(models.Model):
         return f"Borrador {self.id_borrador}"
 
 
+class CorreoSalida(models.Model):
+    """
+    Modelo que representa un correo en la bandeja de salida.
+    
+    Las vistas no envían correos directamente: los guardan aquí dentro de la
+    misma transacción que el cambio que notifican, y el comando
+    enviar_correos los envía después con reintentos (ver core.bandeja_salida).
+    
+    Attributes:
+        id_correo: Identificador único del correo (clave primaria)
+        asunto: Asunto del correo
+        texto: Contenido en texto plano
+        html: Contenido HTML (opcional)
+        remitente: Correo del remitente
+        destinatarios: Lista de correos de los destinatarios
+        factura: Solicitud cuya factura se adjunta al enviar (opcional)
+        estado: Estado del envío (pendiente, enviado, fallido)
+        intentos: Número de intentos de envío fallidos
+        proximo_intento: Fecha y hora a partir de la cual se puede enviar
+        ultimo_error: Error del último intento fallido
+        creado: Fecha y hora en que se encoló el correo
+        enviado: Fecha y hora en que se envió el correo
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    id_correo = models.AutoField(primary_key=True)
+    asunto = models.CharField(max_length=255)
+    texto = models.TextField()
+    html = models.TextField(blank=True)
+    remitente = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    factura = models.ForeignKey("Solicitud", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    intentos = models.PositiveIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=now)
+    ultimo_error = models.TextField(blank=True)
+
+    creado = models.DateTimeField(auto_now_add=True)
+    enviado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Correos listos para enviar: pendientes cuyo próximo intento ya pasó
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_intento_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna la representación en string del correo.
+        
+        Returns:
+            str: Asunto y estado del correo
+        """
+        return f"{self.asunto} ({self.estado})"
+
+
+class Notificacion(models.Model):
+    """
+    Modelo que representa un cambio de estado pendiente de notificar.
+    
+    Cada transición de una solicitud registra una notificación para su
+    aprendiz. Las notificaciones de un mismo aprendiz dentro de la ventana
+    NOTIFICACIONES_VENTANA se agrupan en un solo correo de resumen
+    (ver core.notificaciones).
+    
+    Attributes:
+        id_notificacion: Identificador único de la notificación (clave primaria)
+        aprendiz: Aprendiz a notificar (ForeignKey)
+        solicitud: Solicitud que cambió de estado (ForeignKey)
+        estado: Estado al que pasó la solicitud
+        creado: Fecha y hora del cambio de estado
+        correo: Correo de resumen que incluyó la notificación (None mientras está pendiente)
+    """
+    id_notificacion = models.AutoField(primary_key=True)
+    aprendiz = models.ForeignKey("Usuario", on_delete=models.CASCADE, related_name="notificaciones")
+    solicitud = models.ForeignKey("Solicitud", on_delete=models.CASCADE, related_name="notificaciones")
+    estado = models.CharField(max_length=255, choices=Solicitud.ESTADOS)
+    creado = models.DateTimeField(default=now)
+    correo = models.ForeignKey(CorreoSalida, on_delete=models.SET_NULL, null=True, blank=True, related_name="notificaciones")
+
+    class Meta:
+        indexes = [
+            # Notificaciones pendientes (correo NULL) agrupadas por aprendiz
+            models.Index(fields=['correo', 'aprendiz', 'creado'], name='notificacion_pendiente_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna la representación en string de la notificación.
+        
+        Returns:
+            str: Solicitud y estado notificado
+        """
+        return f"Solicitud {self.solicitud_id} - {self.estado}"
+
+
+class ContadorEstado(models.Model):
+    """
+    Modelo que guarda cuántas solicitudes hay en cada estado.
+    
+    Hay una fila por estado para el total (id_centro = 0) y una por estado
+    y centro de formación. Los contadores se actualizan en la misma
+    transacción que cada creación o cambio de estado de una solicitud
+    (ver core.contadores), así que los paneles leen los totales sin
+    contar la tabla de solicitudes.
+    
+    Attributes:
+        id_contador: Identificador único del contador (clave primaria)
+        estado: Estado de la solicitud
+        id_centro: ID del centro de formación (0 para el total de todos los centros)
+        total: Número de solicitudes en el estado
+    """
+    TODOS_LOS_CENTROS = 0
+
+    id_contador = models.AutoField(primary_key=True)
+    estado = models.CharField(max_length=255, choices=Solicitud.ESTADOS)
+    id_centro = models.PositiveIntegerField(default=TODOS_LOS_CENTROS)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['estado', 'id_centro'], name='contador_estado_centro_uniq'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna la representación en string del contador.
+        
+        Returns:
+            str: Estado, centro y total
+        """
+        return f"{self.estado} (centro {self.id_centro}): {self.total}"
+
+
+class VersionTabla(models.Model):
+    """
+    Modelo que guarda la versión actual de cada tabla de catálogo.
+    
+    La versión aumenta en uno cada vez que se confirma una escritura sobre
+    la tabla (ver core.versiones). Las respuestas construidas a partir de
+    una tabla usan su versión como ETag y su fecha como Last-Modified, así
+    que el navegador puede revalidarlas sin volver a descargarlas.
+    
+    Attributes:
+        nombre: Nombre de la tabla (clave primaria), por ejemplo "tallas"
+        version: Número de versión, empieza en 1
+        actualizado: Fecha y hora del último cambio
+        depurado: Versión hasta la que se eliminaron los CambioTabla; no se
+            pueden calcular cambios desde una versión anterior
+    """
+    nombre = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=1)
+    actualizado = models.DateTimeField()
+    depurado = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        """
+        Retorna la representación en string de la versión.
+        
+        Returns:
+            str: Nombre de la tabla y versión
+        """
+        return f"{self.nombre} v{self.version}"
+
+
+class CambioTabla(models.Model):
+    """
+    Modelo que registra qué fila de una tabla de catálogo cambió en cada versión.
+    
+    Permite responder solo con las filas creadas, modificadas o eliminadas
+    después de una versión conocida por el cliente (ver core.versiones).
+    Se conservan los cambios de las últimas versiones de cada tabla.
+    
+    Attributes:
+        id_cambio: Identificador único del cambio (clave primaria)
+        tabla: Nombre de la tabla, como en VersionTabla
+        version: Versión de la tabla que produjo el cambio
+        registro_id: Clave primaria de la fila creada, modificada o eliminada
+    """
+    id_cambio = models.BigAutoField(primary_key=True)
+    tabla = models.CharField(max_length=50)
+    version = models.PositiveBigIntegerField()
+    registro_id = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tabla', 'version'], name='cambio_tabla_version_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna la representación en string del cambio.
+        
+        Returns:
+            str: Tabla, versión y fila
+        """
+        return f"{self.tabla} v{self.version}: {self.registro_id}"
+
+
+class TerminoSolicitud(models.Model):
+    """
+    Modelo del índice de búsqueda de las solicitudes.
+    
+    Cada fila relaciona una palabra normalizada (minúsculas y sin tildes)
+    con una solicitud que la contiene en alguno de sus campos de texto:
+    nombre y apellido del aprendiz, tipo, talla, color, centro, programa,
+    ficha y detalles adicionales. La búsqueda recorre el índice por prefijo
+    de palabra en lugar de aplicar LIKE '%texto%' sobre toda la tabla de
+    solicitudes (ver core.busqueda).
+    
+    Attributes:
+        id_termino: Identificador único del término (clave primaria)
+        solicitud: Solicitud que contiene la palabra (ForeignKey)
+        termino: Palabra normalizada
+    """
+    LARGO_MAXIMO = 64
+
+    id_termino = models.AutoField(primary_key=True)
+    solicitud = models.ForeignKey("Solicitud", on_delete=models.CASCADE, related_name="terminos")
+    termino = models.CharField(max_length=LARGO_MAXIMO)
+
+    class Meta:
+        constraints = [
+            # Búsqueda por prefijo de término; cubre también el id de la solicitud
+            models.UniqueConstraint(fields=['termino', 'solicitud'], name='termino_solicitud_uniq'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna la representación en string del término.
+        
+        Returns:
+            str: Término y solicitud
+        """
+        return f"{self.termino} (solicitud {self.solicitud_id})"
+
+
+class TrabajoExportacion(models.Model):
+    """
+    Modelo que representa la generación en segundo plano de un reporte.
+    
+    La vista solo registra el trabajo con los filtros pedidos; el comando
+    procesar_exportaciones genera el archivo, actualiza el avance mientras
+    escribe las filas y lo deja disponible para descargar hasta la fecha de
+    expiración (ver core.trabajos_exportacion).
+    
+    Attributes:
+        id_trabajo: Identificador único del trabajo (clave primaria)
+        usuario: Usuario que pidió el reporte (ForeignKey)
+        formato: Formato del reporte (pdf o excel)
+        parametros: Parámetros del filtro (buscar, estado, usuario, desde, hasta, limite)
+        estado: Estado del trabajo (pendiente, procesando, terminado, fallido)
+        total: Número de solicitudes a exportar (None hasta que empieza)
+        encontradas: Número de solicitudes que coinciden con el filtro; es
+            mayor que total si el reporte se recortó al límite
+        procesadas: Número de solicitudes escritas hasta el momento
+        archivo: Nombre del archivo generado dentro de EXPORTACIONES_DIR
+        nombre_descarga: Nombre con el que se descarga el archivo
+        error: Error que hizo fallar el trabajo
+        creado: Fecha y hora en que se pidió el reporte
+        iniciado: Fecha y hora en que empezó la generación
+        terminado: Fecha y hora en que terminó la generación
+        expira: Fecha y hora a partir de la cual el archivo se elimina
+    """
+    FORMATOS = [
+        ('pdf', 'PDF'),
+        ('excel', 'Excel'),
+    ]
 
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('terminado', 'Terminado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    id_trabajo = models.AutoField(primary_key=True)
+    usuario = models.ForeignKey("Usuario", on_delete=models.CASCADE, related_name="exportaciones")
+    formato = models.CharField(max_length=10, choices=FORMATOS)
+    parametros = models.JSONField(default=dict)
+
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    total = models.PositiveIntegerField(null=True, blank=True)
+    encontradas = models.PositiveIntegerField(null=True, blank=True)
+    procesadas = models.PositiveIntegerField(default=0)
+    archivo = models.CharField(max_length=255, blank=True)
+    nombre_descarga = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+
+    creado = models.DateTimeField(default=now)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    terminado = models.DateTimeField(null=True, blank=True)
+    expira = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Trabajos por procesar en orden de llegada
+            models.Index(fields=['estado', 'creado'], name='exportacion_estado_idx'),
+            # Archivos vencidos por eliminar
+            models.Index(fields=['expira'], name='exportacion_expira_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Retorna la representación en string del trabajo.
+        
+        Returns:
+            str: Formato, id y estado del trabajo
+        """
+        return f"Exportación {self.formato} #{self.id_trabajo} ({self.estado})"
@@ -0,0 +1,398 @@
+"""
+Motores de generación del PDF de las facturas.
+
+Un motor convierte una solicitud en el PDF de su factura en dos pasos:
+
+- documento(solicitud): reúne en el hilo del request todo lo que necesita
+  (HTML renderizado o valores planos), sin dejar consultas pendientes.
+- convertir(documento): produce los bytes del PDF; se ejecuta en el pool de
+  core.facturas y no toca la base de datos.
+
+Motores disponibles (settings.FACTURAS_MOTOR):
+
+- wkhtmltopdf: plantilla core/factura.html convertida con el binario
+  externo wkhtmltopdf (settings.WKHTMLTOPDF_PATH). Lanza un proceso por
+  factura.
+- weasyprint: la misma plantilla convertida en el proceso con weasyprint
+  (dependencia opcional).
+- reportlab: la misma composición de la plantilla dibujada directamente con
+  reportlab, en el proceso y sin HTML.
+"""
+
+import io
+from abc import ABC, abstractmethod
+from html import escape
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+
+PDFKIT_OPCIONES = {
+    'enable-local-file-access': '',
+    'orientation': 'Landscape',
+    'margin-top': '0mm',
+    'margin-bottom': '0mm',
+    'margin-left': '0mm',
+    'margin-right': '0mm',
+    'page-size': 'Letter',          # o 'A4', da igual
+    'disable-smart-shrinking': '',  # evita que achique el contenido
+    'zoom': '1.0',                  # asegura escala real
+    'print-media-type': '',         # aplica los estilos @page y @media print
+}
+
+
+def ruta_imagen(solicitud):
+    """
+    Retorna la ruta absoluta de la imagen del producto de una solicitud.
+
+    Args:
+        solicitud: Instancia de Solicitud con su producto
+
+    Returns:
+        str: Ruta de la imagen o cadena vacía si el producto no tiene imagen
+    """
+    imagen = solicitud.id_producto.imagen
+    return imagen.path if imagen else ""
+
+
+def renderizar_html(solicitud):
+    """
+    Renderiza el HTML de la factura de una solicitud.
+
+    Args:
+        solicitud: Instancia de Solicitud con su producto
+
+    Returns:
+        str: HTML de la factura
+    """
+    return render_to_string('core/factura.html', {
+        's': solicitud,
+        'total': solicitud.cantidad * solicitud.id_producto.precio,
+        'producto_abs_path': ruta_imagen(solicitud),
+    })
+
+
+class MotorFactura(ABC):
+    """
+    Interfaz de los motores de generación de facturas.
+
+    Attributes:
+        nombre: Nombre con el que se selecciona el motor en settings
+    """
+
+    nombre = None
+
+    @abstractmethod
+    def documento(self, solicitud):
+        """
+        Reúne los datos de la factura de una solicitud.
+
+        Args:
+            solicitud: Instancia de Solicitud con su producto y aprendiz
+
+        Returns:
+            Datos que recibe convertir(); su repr() forma parte de la
+            huella de la caché de facturas
+        """
+
+    @abstractmethod
+    def convertir(self, documento):
+        """
+        Genera el PDF a partir de los datos de documento().
+
+        Args:
+            documento: Valor retornado por documento()
+
+        Returns:
+            bytes: Contenido del PDF
+        """
+
+
+class MotorWkhtmltopdf(MotorFactura):
+    """
+    Motor que convierte la plantilla HTML con el binario wkhtmltopdf.
+    """
+
+    nombre = "wkhtmltopdf"
+
+    def __init__(self):
+        self._configuracion = None
+
+    def documento(self, solicitud):
+        """
+        Renderiza la plantilla de la factura.
+
+        Args:
+            solicitud: Instancia de Solicitud con su producto y aprendiz
+
+        Returns:
+            str: HTML de la factura
+        """
+        return renderizar_html(solicitud)
+
+    def convertir(self, documento):
+        """
+        Convierte el HTML en PDF con un proceso de wkhtmltopdf.
+
+        Args:
+            documento: HTML de la factura
+
+        Returns:
+            bytes: Contenido del PDF
+
+        Raises:
+            OSError: Si wkhtmltopdf no existe o termina con error
+        """
+        import pdfkit
+
+        if self._configuracion is None:
+            self._configuracion = pdfkit.configuration(
+                wkhtmltopdf=getattr(settings, "WKHTMLTOPDF_PATH", "/usr/bin/wkhtmltopdf")
+            )
+        return pdfkit.from_string(documento, False, configuration=self._configuracion, options=PDFKIT_OPCIONES)
+
+
+class MotorWeasyprint(MotorFactura):
+    """
+    Motor que convierte la plantilla HTML en el proceso con weasyprint.
+    """
+
+    nombre = "weasyprint"
+
+    def documento(self, solicitud):
+        """
+        Renderiza la plantilla de la factura.
+
+        Args:
+            solicitud: Instancia de Solicitud con su producto y aprendiz
+
+        Returns:
+            str: HTML de la factura
+        """
+        return renderizar_html(solicitud)
+
+    def convertir(self, documento):
+        """
+        Convierte el HTML en PDF con weasyprint.
+
+        Args:
+            documento: HTML de la factura
+
+        Returns:
+            bytes: Contenido del PDF
+
+        Raises:
+            ImportError: Si weasyprint no está instalado
+        """
+        from weasyprint import HTML
+
+        # La imagen del producto se referencia por ruta absoluta del disco
+        return HTML(string=documento, base_url="file:///").write_pdf()
+
+
+class MotorReportlab(MotorFactura):
+    """
+    Motor que dibuja la factura con reportlab, sin HTML ni procesos externos.
+
+    Reproduce la composición de core/factura.html en una página carta
+    horizontal: encabezado con degradado, datos del cliente, tabla del
+    producto con su imagen, total y pie de página.
+    """
+
+    nombre = "reportlab"
+
+    def documento(self, solicitud):
+        """
+        Reúne como valores planos los datos que se dibujan en la factura.
+
+        Args:
+            solicitud: Instancia de Solicitud con su producto y aprendiz
+
+        Returns:
+            dict: Número, fecha, cliente, producto, importes y ruta de la
+            imagen del producto
+        """
+        aprendiz = solicitud.id_aprendiz
+        return {
+            "id_solicitud": solicitud.id_solicitud,
+            "fecha": solicitud.fecha_solicitud.strftime("%Y-%m-%d") if solicitud.fecha_solicitud else "",
+            "cliente": aprendiz.get_full_name(),
+            "correo": aprendiz.correo,
+            "producto": solicitud.tipo_nombre or "",
+            "talla": solicitud.talla_nombre or "",
+            "color": solicitud.color_nombre or "",
+            "cantidad": solicitud.cantidad,
+            "precio": str(solicitud.id_producto.precio),
+            "total": f"{solicitud.cantidad * solicitud.id_producto.precio:.2f}",
+            "imagen": ruta_imagen(solicitud),
+        }
+
+    def convertir(self, documento):
+        """
+        Dibuja la factura en una página carta horizontal.
+
+        Args:
+            documento: Diccionario retornado por documento()
+
+        Returns:
+            bytes: Contenido del PDF
+        """
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter, landscape
+        from reportlab.lib.units import mm
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.platypus import Image, Paragraph, Table, TableStyle
+
+        primario = colors.HexColor("#1BB9A6")
+        acento = colors.HexColor("#159d90")
+        texto = colors.HexColor("#1f2937")
+        apagado = colors.HexColor("#64748b")
+        esmeralda = colors.HexColor("#059669")
+        indigo = colors.HexColor("#4f46e5")
+        morado_claro = colors.HexColor("#e1d4fc")
+
+        salida = io.BytesIO()
+        ancho, alto = landscape(letter)
+        c = canvas.Canvas(salida, pagesize=(ancho, alto))
+        c.setTitle("Factura Electrónica")
+
+        # Encabezado con degradado
+        alto_encabezado = 105
+        y_encabezado = alto - alto_encabezado
+        c.saveState()
+        ruta = c.beginPath()
+        ruta.rect(0, y_encabezado, ancho, alto_encabezado)
+        c.clipPath(ruta, stroke=0, fill=0)
+        c.linearGradient(0, 0, ancho, 0, (colors.HexColor("#0077b6"), primario), extend=False)
+        c.restoreState()
+
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica", 38)
+        c.drawString(10 * mm, alto - 55, "Factura Electrónica")
+        c.setFillColor(colors.Color(1, 1, 1, alpha=0.9))
+        c.setFont("Helvetica", 18)
+        c.drawString(10 * mm, alto - 82, "Centro de Comercio y Servicios - Dotapp")
+
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica-Bold", 18)
+        derecha = ancho - 10 * mm
+        self._texto_derecha(c, derecha, alto - 45, "Fecha: ", documento["fecha"])
+        self._texto_derecha(c, derecha, alto - 72, "Nº Solicitud: ", f"#{documento['id_solicitud']}")
+
+        # Datos del cliente
+        alto_cliente = 80
+        y_cliente = y_encabezado - alto_cliente
+        c.setFillColor(morado_claro)
+        c.rect(0, y_cliente, ancho, alto_cliente, stroke=0, fill=1)
+        c.setFillColor(acento)
+        c.setFont("Helvetica-Bold", 20)
+        c.drawString(10 * mm, y_encabezado - 25, "Cliente")
+        c.setFillColor(texto)
+        c.setFont("Helvetica", 18)
+        c.drawString(10 * mm, y_encabezado - 48, documento["cliente"])
+        c.drawString(10 * mm, y_encabezado - 70, documento["correo"])
+
+        # Tabla del producto
+        imagen = ""
+        if documento["imagen"]:
+            try:
+                imagen = Image(documento["imagen"], width=120, height=120)
+            except Exception:
+                imagen = ""
+        nombre_producto = Paragraph(
+            escape(documento["producto"]),
+            ParagraphStyle("producto", fontName="Helvetica", fontSize=17, leading=20, alignment=1, textColor=texto),
+        )
+        celda_producto = [imagen, nombre_producto] if imagen else nombre_producto
+
+        tabla = Table(
+            [
+                ["PRODUCTO", "TALLA", "COLOR", "CANTIDAD", "PRECIO"],
+                [celda_producto, documento["talla"], documento["color"],
+                 str(documento["cantidad"]), f"${documento['precio']}"],
+            ],
+            colWidths=[(ancho - 20 * mm) / 5] * 5,
+        )
+        tabla.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), indigo),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 14),
+            ("FONTSIZE", (0, 1), (-1, -1), 17),
+            ("TEXTCOLOR", (0, 1), (-1, -1), texto),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("TOPPADDING", (0, 0), (-1, -1), 4 * mm),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4 * mm),
+        ]))
+        _, alto_tabla = tabla.wrap(ancho - 20 * mm, alto)
+        tabla.drawOn(c, 10 * mm, y_cliente - 6 * mm - 4 * mm - alto_tabla)
+
+        # Pie de página y total (al fondo de la página)
+        alto_pie = 30
+        c.setFillColor(morado_claro)
+        c.rect(0, 0, ancho, alto_pie, stroke=0, fill=1)
+        c.setFillColor(apagado)
+        c.setFont("Helvetica", 15)
+        c.drawCentredString(ancho / 2, 11, "Gracias por tu solicitud | Equipo Dotapp")
+
+        alto_total = 55
+        c.setFillColor(esmeralda)
+        c.rect(0, alto_pie, ancho, alto_total, stroke=0, fill=1)
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica-Bold", 30)
+        c.drawRightString(ancho - 10 * mm, alto_pie + 18, f"Total: ${documento['total']}")
+
+        c.showPage()
+        c.save()
+        return salida.getvalue()
+
+    @staticmethod
+    def _texto_derecha(c, derecha, y, etiqueta, valor):
+        """
+        Dibuja "etiqueta valor" alineado a la derecha, con la etiqueta en negrita.
+
+        Args:
+            c: Canvas de reportlab
+            derecha: Coordenada x del borde derecho
+            y: Coordenada y de la línea base
+            etiqueta: Texto en negrita
+            valor: Texto normal
+        """
+        ancho_valor = c.stringWidth(valor, "Helvetica", 18)
+        c.setFont("Helvetica", 18)
+        c.drawRightString(derecha, y, valor)
+        c.setFont("Helvetica-Bold", 18)
+        c.drawRightString(derecha - ancho_valor, y, etiqueta)
+
+
+MOTORES = {
+    MotorWkhtmltopdf.nombre: MotorWkhtmltopdf,
+    MotorWeasyprint.nombre: MotorWeasyprint,
+    MotorReportlab.nombre: MotorReportlab,
+}
+
+_instancias = {}
+
+
+def obtener_motor(nombre=None):
+    """
+    Retorna el motor de facturas indicado o el configurado.
+
+    Args:
+        nombre: Nombre del motor (None para usar settings.FACTURAS_MOTOR,
+            "wkhtmltopdf" por defecto)
+
+    Returns:
+        MotorFactura: Instancia del motor
+
+    Raises:
+        ValueError: Si el motor no está definido en MOTORES
+    """
+    nombre = nombre or getattr(settings, "FACTURAS_MOTOR", "wkhtmltopdf")
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor de facturas no válido: {nombre}")
+    if nombre not in _instancias:
+        _instancias[nombre] = MOTORES[nombre]()
+    return _instancias[nombre]
@@ -0,0 +1,134 @@
+"""
+Notificaciones de cambios de estado de las solicitudes del sistema DotApp SENA.
+
+Las vistas no arman un correo por cada transición: registran una
+Notificacion con notificar() dentro de la transacción del cambio de estado.
+El comando enviar_correos llama a agrupar_pendientes(), que junta todas las
+notificaciones pendientes de un aprendiz en un solo correo de resumen
+cuando la más antigua cumple NOTIFICACIONES_VENTANA segundos:
+
+    aprobada 10:00, despachada 10:20  (ventana de 60 minutos)
+    -> un correo a las 11:00 con los dos cambios
+
+Con una ventana de 0 cada ejecución del comando envía las notificaciones
+acumuladas hasta ese momento.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils.timezone import now
+
+from core.bandeja_salida import encolar
+from core.correos import correo_notificaciones
+from core.models import Notificacion
+
+
+def _ventana():
+    """
+    Retorna la ventana de agrupación en segundos.
+
+    Returns:
+        int: Valor de settings.NOTIFICACIONES_VENTANA (900 por defecto)
+    """
+    return getattr(settings, "NOTIFICACIONES_VENTANA", 900)
+
+
+def notificar(solicitud):
+    """
+    Registra el estado actual de una solicitud como notificación pendiente.
+
+    Llamar dentro de la transacción del cambio de estado, después de
+    aplicarlo (core.estados.transicionar actualiza la instancia).
+
+    Args:
+        solicitud: Instancia de Solicitud con el nuevo estado
+
+    Returns:
+        Notificacion: Notificación registrada
+    """
+    return Notificacion.objects.create(
+        aprendiz_id=solicitud.id_aprendiz_id,
+        solicitud=solicitud,
+        estado=solicitud.estado_solicitud,
+    )
+
+
+def notificar_lote(solicitudes):
+    """
+    Registra notificaciones para varias solicitudes con un solo INSERT.
+
+    Args:
+        solicitudes: Solicitudes con el nuevo estado aplicado
+
+    Returns:
+        list: Notificaciones registradas
+    """
+    momento = now()
+    return Notificacion.objects.bulk_create([
+        Notificacion(
+            aprendiz_id=s.id_aprendiz_id,
+            solicitud=s,
+            estado=s.estado_solicitud,
+            creado=momento,
+        )
+        for s in solicitudes
+    ])
+
+
+def agrupar_pendientes(limite_aprendices=None):
+    """
+    Convierte las notificaciones vencidas en correos de resumen encolados.
+
+    Un aprendiz está listo cuando su notificación pendiente más antigua
+    cumplió la ventana; en ese momento todas sus notificaciones pendientes
+    van en un mismo correo. Las filas se bloquean (con SKIP LOCKED donde el
+    motor lo permite) para que dos procesos no agrupen las mismas.
+
+    Args:
+        limite_aprendices: Máximo de aprendices a procesar (None para todos)
+
+    Returns:
+        int: Número de correos de resumen encolados
+    """
+    limite = now() - timedelta(seconds=_ventana())
+    listos = (
+        Notificacion.objects
+        .filter(correo__isnull=True)
+        .values("aprendiz_id")
+        .annotate(primera=Min("creado"))
+        .filter(primera__lte=limite)
+        .order_by("primera")
+        .values_list("aprendiz_id", flat=True)
+    )
+    if limite_aprendices:
+        listos = listos[:limite_aprendices]
+    aprendices = list(listos)
+    if not aprendices:
+        return 0
+
+    encolados = 0
+    with transaction.atomic():
+        bloqueo = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+        pendientes = list(
+            Notificacion.objects
+            .select_for_update(of=("self",), **bloqueo)
+            .select_related("aprendiz")
+            .filter(correo__isnull=True, aprendiz_id__in=aprendices)
+            .order_by("aprendiz_id", "creado", "id_notificacion")
+        )
+
+        por_aprendiz = {}
+        for notificacion in pendientes:
+            por_aprendiz.setdefault(notificacion.aprendiz_id, []).append(notificacion)
+
+        for notificaciones in por_aprendiz.values():
+            correo = encolar(correo_notificaciones(notificaciones[0].aprendiz, notificaciones))
+            Notificacion.objects.filter(
+                id_notificacion__in=[n.id_notificacion for n in notificaciones]
+            ).update(correo=correo)
+            encolados += 1
+
+    return encolados
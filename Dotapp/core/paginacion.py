@@ -0,0 +1,193 @@
+"""
+Paginación por cursor (keyset) para los listados del sistema DotApp SENA.
+
+En lugar de OFFSET, cada página se pide a partir de la última fila vista
+usando la pareja (fecha, id) como cursor:
+
+    WHERE (fecha < :fecha) OR (fecha = :fecha AND id < :id)
+    ORDER BY fecha DESC, id DESC
+    LIMIT :por_pagina + 1
+
+El costo de cada página es constante sin importar cuántas filas haya antes
+cuando el listado tiene un índice que termina en (fecha DESC, id DESC)
+después de sus columnas de filtro. Las solicitudes tienen uno por estado,
+otro por aprendiz y otro sin filtro (ver Solicitud.Meta.indexes); el
+comando verificar_indices comprueba que los listados los usen.
+"""
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+POR_PAGINA = 50
+POR_PAGINA_MAXIMO = 200
+
+
+def codificar_cursor(fecha, pk):
+    """
+    Codifica la pareja (fecha, id) de una fila como cursor opaco para la URL.
+
+    Args:
+        fecha: Valor datetime de la columna de orden
+        pk: Clave primaria de la fila
+
+    Returns:
+        str: Cursor en base64 apto para URL
+    """
+    texto = f"{fecha.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor generado por codificar_cursor.
+
+    Args:
+        cursor: Cursor recibido en la URL
+
+    Returns:
+        tuple: (fecha, id) o None si el cursor no es válido
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        texto = base64.urlsafe_b64decode(cursor + relleno).decode()
+        fecha, pk = texto.rsplit("|", 1)
+        return datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class PaginaKeyset:
+    """
+    Página de resultados obtenida con paginar_keyset.
+
+    Attributes:
+        objetos: Filas de la página en orden descendente
+        por_pagina: Tamaño de página aplicado
+        cursor_siguiente: Cursor para pedir las filas más antiguas (o None)
+        cursor_anterior: Cursor para pedir las filas más recientes (o None)
+        url_siguiente: Query string de la página siguiente (o None)
+        url_anterior: Query string de la página anterior (o None)
+    """
+
+    def __init__(self, objetos, por_pagina, cursor_siguiente, cursor_anterior, parametros):
+        self.objetos = objetos
+        self.por_pagina = por_pagina
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+        self.url_siguiente = self._url(parametros, "despues", cursor_siguiente)
+        self.url_anterior = self._url(parametros, "antes", cursor_anterior)
+
+    @staticmethod
+    def _url(parametros, direccion, cursor):
+        """
+        Construye el query string de otra página conservando los filtros.
+
+        Args:
+            parametros: QueryDict del request actual
+            direccion: 'despues' o 'antes'
+            cursor: Cursor de la página destino
+
+        Returns:
+            str: Query string que empieza con '?', o None si no hay cursor
+        """
+        if cursor is None:
+            return None
+        query = parametros.copy()
+        query.pop("despues", None)
+        query.pop("antes", None)
+        query[direccion] = cursor
+        return f"?{query.urlencode()}"
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+    @property
+    def tiene_otras_paginas(self):
+        """
+        Indica si hay página anterior o siguiente.
+
+        Returns:
+            bool: True si se deben mostrar los controles de paginación
+        """
+        return bool(self.cursor_siguiente or self.cursor_anterior)
+
+
+def _tamano_pagina(request, por_pagina):
+    """
+    Lee el tamaño de página del parámetro ?por_pagina= con límites.
+
+    Args:
+        request: Objeto HttpRequest
+        por_pagina: Tamaño por defecto
+
+    Returns:
+        int: Tamaño de página entre 1 y POR_PAGINA_MAXIMO
+    """
+    try:
+        valor = int(request.GET.get("por_pagina", por_pagina))
+    except (TypeError, ValueError):
+        valor = por_pagina
+    return max(1, min(valor, POR_PAGINA_MAXIMO))
+
+
+def paginar_keyset(queryset, request, campo_fecha="fecha_solicitud", campo_id="id_solicitud", por_pagina=POR_PAGINA):
+    """
+    Pagina un queryset por cursor sobre (campo_fecha, campo_id) descendente.
+
+    Parámetros de la URL:
+    - despues: cursor de la última fila vista (avanza a filas más antiguas)
+    - antes: cursor de la primera fila vista (retrocede a filas más recientes)
+    - por_pagina: tamaño de página (máximo POR_PAGINA_MAXIMO)
+
+    Cada página lee a lo sumo por_pagina + 1 filas del índice solo si el
+    filtro del queryset tiene un índice que termine en (campo_fecha DESC,
+    campo_id DESC); si no, la base de datos ordena todas las filas filtradas.
+
+    Args:
+        queryset: QuerySet ya filtrado (se ignora su ordenamiento)
+        request: Objeto HttpRequest
+        campo_fecha: Nombre del campo datetime de orden
+        campo_id: Nombre de la clave primaria usada como desempate
+        por_pagina: Tamaño de página por defecto
+
+    Returns:
+        PaginaKeyset: Página con sus filas y cursores
+    """
+    tamano = _tamano_pagina(request, por_pagina)
+    despues = decodificar_cursor(request.GET.get("despues", ""))
+    antes = decodificar_cursor(request.GET.get("antes", ""))
+
+    if antes:
+        fecha, pk = antes
+        filas = list(
+            queryset.filter(Q(**{f"{campo_fecha}__gt": fecha}) | Q(**{campo_fecha: fecha, f"{campo_id}__gt": pk}))
+            .order_by(campo_fecha, campo_id)[:tamano + 1]
+        )
+        hay_mas = len(filas) > tamano
+        filas = list(reversed(filas[:tamano]))
+        hay_anterior, hay_siguiente = hay_mas, True
+    else:
+        if despues:
+            fecha, pk = despues
+            queryset = queryset.filter(Q(**{f"{campo_fecha}__lt": fecha}) | Q(**{campo_fecha: fecha, f"{campo_id}__lt": pk}))
+        filas = list(queryset.order_by(f"-{campo_fecha}", f"-{campo_id}")[:tamano + 1])
+        hay_siguiente = len(filas) > tamano
+        filas = filas[:tamano]
+        hay_anterior = despues is not None
+
+    def cursor(fila):
+        return codificar_cursor(getattr(fila, campo_fecha), getattr(fila, campo_id))
+
+    return PaginaKeyset(
+        filas,
+        tamano,
+        cursor(filas[-1]) if filas and hay_siguiente else None,
+        cursor(filas[0]) if filas and hay_anterior else None,
+        request.GET,
+    )
@@ -0,0 +1,59 @@
+"""
+Programas de formación agrupados por centro para el sistema DotApp SENA.
+
+El formulario de solicitud pide los programas de un centro cada vez que
+cambia el centro elegido. En lugar de consultar la tabla en cada cambio,
+el mapa completo centro -> programas se calcula una vez por versión de las
+tablas de centros y programas (ver core.versiones) y se guarda en la caché
+de Django:
+
+    {"1": [{"id_programa": 4, "nombre": "ADSO"}, ...], "2": [], ...}
+
+Las claves son los IDs de los centros como texto, igual que quedan al
+serializar el mapa a JSON.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import versiones
+from core.models import CentroFormacion, Programa
+
+
+# Tablas de las que depende el mapa
+TABLAS = ("centros", "programas")
+
+
+def obtener_versiones():
+    """
+    Retorna las versiones actuales de las tablas de centros y programas.
+
+    Returns:
+        dict: Versiones retornadas por core.versiones.obtener
+    """
+    return versiones.obtener(*TABLAS)
+
+
+def mapa(versiones_leidas=None):
+    """
+    Retorna los programas de todos los centros, agrupados por centro.
+
+    Args:
+        versiones_leidas: Versiones ya leídas con obtener_versiones() (se
+            leen si no se indican). Deben leerse antes que el mapa para que
+            el mapa guardado nunca sea más antiguo que su versión.
+
+    Returns:
+        dict: ID del centro (texto) -> lista de {"id_programa", "nombre"}
+    """
+    if versiones_leidas is None:
+        versiones_leidas = obtener_versiones()
+
+    clave = f"programas_por_centro:{versiones.etiqueta(versiones_leidas)}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = {str(pk): [] for pk in CentroFormacion.objects.order_by("pk").values_list("pk", flat=True)}
+        for id_programa, nombre, centro_id in Programa.objects.order_by("pk").values_list("id_programa", "nombre", "centro_id"):
+            resultado.setdefault(str(centro_id), []).append({"id_programa": id_programa, "nombre": nombre})
+        cache.set(clave, resultado, getattr(settings, "CATALOGO_JSON_TTL", 3600))
+    return resultado
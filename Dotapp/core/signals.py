@@ -2,12 +2,16 @@
 Señales (signals) de Django para el sistema DotApp SENA.
 
 Este módulo contiene señales que se ejecutan automáticamente
-en ciertos eventos del sistema, como después de las migraciones.
+en ciertos eventos del sistema, como después de las migraciones
+o al modificar las tablas de referencia.
 """
 
-from django.db.models.signals import post_migrate
+from django.db import transaction
+from django.db.models.signals import post_migrate, post_save, post_delete
 from django.dispatch import receiver
-from core.models import Rol
+from core import busqueda, catalogo, contadores, filtros, versiones
+from core.backends import invalidar_usuario
+from core.models import Rol, CentroFormacion, Programa, Usuario, Solicitud
 
 
 @receiver(post_migrate)
@@ -42,3 +46,127 @@ def crear_roles_iniciales(sender, **kwargs):
         print(f"Roles creados exitosamente: {', '.join(creados)}")
     else:
         print("Todos los roles iniciales ya existían. No se creó ninguno.")
+
+
+def invalidar_catalogo(sender, **kwargs):
+    """
+    Invalida la caché de catálogo del modelo que fue modificado.
+
+    Se invalida de inmediato y de nuevo al confirmar la transacción, para que
+    una recarga hecha mientras la transacción seguía abierta no quede en caché.
+    Los programas guardan su centro precargado, por lo que un cambio en un
+    centro también invalida los programas.
+
+    Args:
+        sender: Modelo que disparó la señal
+        **kwargs: Argumentos adicionales de la señal
+    """
+    modelos = [sender]
+    if sender is CentroFormacion:
+        modelos.append(Programa)
+
+    def invalidar():
+        for modelo in modelos:
+            catalogo.invalidar(modelo)
+
+    invalidar()
+    transaction.on_commit(invalidar)
+
+
+@receiver([post_save, post_delete], sender=Usuario)
+def invalidar_usuario_sesion(sender, instance, **kwargs):
+    """
+    Invalida la caché del usuario de sesión al modificar o eliminar la cuenta.
+
+    Cubre la edición y el cambio de estado desde el panel de administración,
+    la actualización del perfil y los cambios de contraseña.
+
+    Args:
+        sender: Modelo que disparó la señal
+        instance: Usuario modificado
+        **kwargs: Argumentos adicionales de la señal
+    """
+    invalidar_usuario(instance.pk)
+    transaction.on_commit(lambda: invalidar_usuario(instance.pk))
+
+
+@receiver(post_save, sender=Usuario)
+def reindexar_aprendiz(sender, instance, update_fields=None, **kwargs):
+    """
+    Actualiza el índice de búsqueda de las solicitudes de un aprendiz
+    cuando cambia su nombre.
+
+    Los guardados parciales que no tocan el nombre (como el último inicio
+    de sesión) no reindexan.
+
+    Args:
+        sender: Modelo que disparó la señal
+        instance: Usuario guardado
+        update_fields: Campos guardados (None si se guardaron todos)
+        **kwargs: Argumentos adicionales de la señal
+    """
+    if update_fields is not None and not set(update_fields) & set(busqueda.CAMPOS_APRENDIZ):
+        return
+    busqueda.indexar_aprendiz(instance.pk)
+    filtros.invalidar()
+
+
+@receiver(post_save, sender=Solicitud)
+def indexar_solicitud(sender, instance, **kwargs):
+    """
+    Actualiza los términos de búsqueda de una solicitud guardada y descarta
+    los resultados de filtros guardados.
+
+    Los cambios de estado se hacen con UPDATE (core.estados) y no pasan por
+    aquí; no modifican ningún campo indexado y core.estados invalida los
+    filtros por su cuenta.
+
+    Args:
+        sender: Modelo que disparó la señal
+        instance: Solicitud guardada
+        **kwargs: Argumentos adicionales de la señal
+    """
+    busqueda.indexar([instance])
+    filtros.invalidar()
+
+
+@receiver(post_delete, sender=Solicitud)
+def descontar_solicitud(sender, instance, **kwargs):
+    """
+    Descuenta una solicitud eliminada de los contadores por estado y
+    descarta los resultados de filtros guardados.
+
+    Cubre también las solicitudes borradas en cascada al eliminar un
+    usuario o un producto.
+
+    Args:
+        sender: Modelo que disparó la señal
+        instance: Solicitud eliminada
+        **kwargs: Argumentos adicionales de la señal
+    """
+    contadores.registrar_eliminacion(instance)
+    filtros.invalidar()
+
+
+def aumentar_version(sender, instance, **kwargs):
+    """
+    Aumenta la versión de la tabla modificada al confirmar la transacción.
+
+    Invalida los ETag de las respuestas construidas con la tabla y anota la
+    fila que cambió (ver core.versiones).
+
+    Args:
+        sender: Modelo que disparó la señal
+        instance: Registro guardado o eliminado
+        **kwargs: Argumentos adicionales de la señal
+    """
+    versiones.incrementar(versiones.TABLAS[sender], registro=instance.pk)
+
+
+for _modelo in catalogo.CAMPOS_NOMBRE:
+    post_save.connect(invalidar_catalogo, sender=_modelo, dispatch_uid=f"catalogo_save_{_modelo.__name__}")
+    post_delete.connect(invalidar_catalogo, sender=_modelo, dispatch_uid=f"catalogo_delete_{_modelo.__name__}")
+
+for _modelo in versiones.TABLAS:
+    post_save.connect(aumentar_version, sender=_modelo, dispatch_uid=f"version_save_{_modelo.__name__}")
+    post_delete.connect(aumentar_version, sender=_modelo, dispatch_uid=f"version_delete_{_modelo.__name__}")
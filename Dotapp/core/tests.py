@@ -1,3 +1,467 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import bandeja_salida, busqueda, contadores, intentos_login, trabajos_exportacion
+from core.backends import UsuarioCacheBackend, clave_usuario
+from core.estados import transicionar, transicionar_lote
+from core.exportacion import filas_solicitudes
+from core.inventario import StockInsuficiente, liberar_stock_lote, reservar_stock
+from core.models import (
+    CentroFormacion, Color, CorreoSalida, Producto, Programa, Solicitud, Talla, TipoProducto,
+    TrabajoExportacion, Usuario,
+)
+from core.paginacion import paginar_keyset
+
+
+def crear_solicitud(aprendiz, producto, cantidad=1, **campos):
+    """
+    Crea una solicitud de prueba con los catálogos de su producto.
+
+    Args:
+        aprendiz: Usuario que hace la solicitud
+        producto: Producto solicitado
+        cantidad: Unidades solicitadas
+        **campos: Campos adicionales de la solicitud
+
+    Returns:
+        Solicitud: Solicitud creada
+    """
+    programa = Programa.objects.first()
+    return Solicitud.objects.create(
+        id_aprendiz=aprendiz, tipo=producto.tipo, talla=producto.talla, color=producto.color,
+        cantidad=cantidad, centro_formacion=programa.centro, programa=programa,
+        id_producto=producto, **campos,
+    )
+
+
+class DatosBaseTestCase(TestCase):
+    """
+    Crea los catálogos, un producto y un aprendiz comunes a las pruebas.
+    """
+
+    def setUp(self):
+        tipo = TipoProducto.objects.create(nombre='Camisa')
+        talla = Talla.objects.create(nombre='M')
+        color = Color.objects.create(nombre='Azul')
+        centro = CentroFormacion.objects.create(nombre='Centro 1')
+        Programa.objects.create(nombre='Programa 1', centro=centro)
+        self.producto = Producto.objects.create(tipo=tipo, talla=talla, color=color, precio=10, stock=5)
+        self.aprendiz = Usuario.objects.create_user('Ana', 'Pérez', 'ana@ejemplo.co', 'clave12345')
+
+
+class BusquedaTests(DatosBaseTestCase):
+    """
+    Pruebas de la búsqueda por prefijo de palabra.
+    """
+
+    def test_palabra_terminada_en_z(self):
+        solicitud = crear_solicitud(self.aprendiz, self.producto)
+        otro = Usuario.objects.create_user('Luis', 'Gómez', 'luis@ejemplo.co', 'clave12345')
+        crear_solicitud(otro, self.producto)
+
+        encontradas = busqueda.filtrar(Solicitud.objects.all(), 'Perez')
+
+        self.assertEqual(list(encontradas), [solicitud])
+
+    def test_prefijo_y_tildes(self):
+        solicitud = crear_solicitud(self.aprendiz, self.producto)
+
+        self.assertEqual(list(busqueda.filtrar(Solicitud.objects.all(), 'pér cam')), [solicitud])
+        self.assertFalse(busqueda.filtrar(Solicitud.objects.all(), 'perezoso').exists())
+
+
+class PaginacionKeysetTests(DatosBaseTestCase):
+    """
+    Pruebas de la paginación por cursor (fecha, id).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.solicitudes = [crear_solicitud(self.aprendiz, self.producto) for _ in range(5)]
+        # Misma fecha para todas: el id decide el orden
+        Solicitud.objects.update(fecha_solicitud=timezone.now())
+        self.factory = RequestFactory()
+
+    def _pagina(self, **parametros):
+        return paginar_keyset(Solicitud.objects.all(), self.factory.get('/', {'por_pagina': 2, **parametros}))
+
+    def test_recorre_todas_las_filas_sin_repetir(self):
+        vistos = []
+        pagina = self._pagina()
+        while True:
+            vistos.extend(s.pk for s in pagina)
+            if not pagina.cursor_siguiente:
+                break
+            pagina = self._pagina(despues=pagina.cursor_siguiente)
+
+        self.assertEqual(vistos, sorted((s.pk for s in self.solicitudes), reverse=True))
+
+    def test_retrocede_a_la_pagina_anterior(self):
+        primera = self._pagina()
+        segunda = self._pagina(despues=primera.cursor_siguiente)
+
+        anterior = self._pagina(antes=segunda.cursor_anterior)
+
+        self.assertEqual([s.pk for s in anterior], [s.pk for s in primera])
+        self.assertIsNone(anterior.cursor_anterior)
+
+    def test_cursor_invalido_muestra_la_primera_pagina(self):
+        pagina = self._pagina(despues='no-es-un-cursor')
+
+        self.assertEqual([s.pk for s in pagina], [s.pk for s in self._pagina()])
+
+
+@override_settings(CORREOS_MAX_INTENTOS=2, CORREOS_REINTENTO_BASE=60, CORREOS_RECLAMO_SEGUNDOS=600)
+class BandejaSalidaTests(TestCase):
+    """
+    Pruebas del reclamo y los reintentos de la bandeja de salida.
+    """
+
+    def setUp(self):
+        self.correo = bandeja_salida.encolar(
+            EmailMultiAlternatives('Asunto', 'Texto', 'dotapp@ejemplo.co', ['ana@ejemplo.co'])
+        )
+
+    def test_envia_pendientes(self):
+        self.assertEqual(bandeja_salida.enviar_pendientes(), (1, 0))
+
+        self.correo.refresh_from_db()
+        self.assertEqual(self.correo.estado, 'enviado')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_reclamo_aplaza_el_correo_para_otros_procesos(self):
+        momento = timezone.now()
+
+        self.assertEqual(bandeja_salida._reclamar(10, momento), [self.correo])
+        self.assertEqual(bandeja_salida._reclamar(10, momento), [])
+
+        self.correo.refresh_from_db()
+        self.assertEqual(self.correo.proximo_intento, momento + timedelta(seconds=600))
+
+    def test_fallo_reprograma_con_espera_y_luego_marca_fallido(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('caído')):
+            antes = timezone.now()
+            self.assertEqual(bandeja_salida.enviar_pendientes(), (0, 1))
+
+            self.correo.refresh_from_db()
+            self.assertEqual(self.correo.estado, 'pendiente')
+            self.assertEqual(self.correo.intentos, 1)
+            self.assertEqual(self.correo.ultimo_error, 'OSError: caído')
+            self.assertGreaterEqual(self.correo.proximo_intento, antes + timedelta(seconds=60))
+            # El próximo intento aún no llega
+            self.assertEqual(bandeja_salida.enviar_pendientes(), (0, 0))
+
+            CorreoSalida.objects.update(proximo_intento=timezone.now())
+            self.assertEqual(bandeja_salida.enviar_pendientes(), (0, 1))
+
+        self.correo.refresh_from_db()
+        self.assertEqual(self.correo.estado, 'fallido')
+        self.assertEqual(self.correo.intentos, 2)
+
+
+class InventarioTests(DatosBaseTestCase):
+    """
+    Pruebas de las reservas y devoluciones de stock con UPDATE condicional.
+    """
+
+    def test_reserva_descuenta_si_alcanza(self):
+        reservar_stock(self.producto.pk, 5)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 0)
+
+    def test_reserva_sin_stock_no_descuenta_e_informa_lo_disponible(self):
+        reservar_stock(self.producto.pk, 2)
+
+        with self.assertRaises(StockInsuficiente) as error:
+            reservar_stock(self.producto.pk, 4)
+
+        self.assertEqual(error.exception.disponible, 3)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 3)
+
+    def test_reserva_de_producto_inexistente(self):
+        with self.assertRaises(StockInsuficiente) as error:
+            reservar_stock(self.producto.pk + 1, 1)
+
+        self.assertEqual(error.exception.disponible, 0)
+
+    def test_devolucion_en_lote(self):
+        otro = Producto.objects.create(
+            tipo=self.producto.tipo, talla=Talla.objects.create(nombre='L'), color=self.producto.color,
+            precio=10, stock=1,
+        )
+
+        liberar_stock_lote({self.producto.pk: 2, otro.pk: 3})
+
+        self.producto.refresh_from_db()
+        otro.refresh_from_db()
+        self.assertEqual((self.producto.stock, otro.stock), (7, 4))
+
+
+class UsuarioCacheBackendTests(DatosBaseTestCase):
+    """
+    Pruebas de la caché del usuario de sesión.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.delete(clave_usuario(self.aprendiz.pk))
+        self.backend = UsuarioCacheBackend()
+
+    def test_la_cache_no_guarda_la_contrasena(self):
+        self.backend.get_user(self.aprendiz.pk)
+
+        entrada = cache.get(clave_usuario(self.aprendiz.pk))
+        self.assertNotIn('password', entrada['usuario'])
+        self.assertNotIn(self.aprendiz.password, repr(entrada))
+
+    def test_usuario_desde_cache_sin_consultas(self):
+        self.backend.get_user(self.aprendiz.pk)
+
+        with self.assertNumQueries(0):
+            usuario = self.backend.get_user(self.aprendiz.pk)
+            self.assertEqual(usuario.rol.nombre_rol, 'aprendiz')
+            self.assertEqual(usuario.get_session_auth_hash(), self.aprendiz.get_session_auth_hash())
+
+    def test_guardar_usuario_de_cache_conserva_la_contrasena(self):
+        self.backend.get_user(self.aprendiz.pk)
+        usuario = self.backend.get_user(self.aprendiz.pk)
+
+        usuario.nombre = 'Ana María'
+        usuario.save()
+
+        self.assertTrue(Usuario.objects.get(pk=self.aprendiz.pk).check_password('clave12345'))
+
+    def test_cambio_de_contrasena_cierra_las_sesiones(self):
+        self.client.force_login(self.aprendiz)
+        url = reverse('historial-solicitudes')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.aprendiz.set_password('otra-clave-123')
+        self.aprendiz.save()
+
+        self.assertIsNone(cache.get(clave_usuario(self.aprendiz.pk)))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+
+class ExportacionTests(DatosBaseTestCase):
+    """
+    Pruebas de la lectura por lotes de los reportes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [crear_solicitud(self.aprendiz, self.producto).pk for _ in range(5)]
+
+    @override_settings(EXPORTACION_TAMANO_LOTE=2)
+    def test_lee_todas_las_filas_por_lotes(self):
+        avance = []
+
+        filas = list(filas_solicitudes(Solicitud.objects.all(), progreso=avance.append))
+
+        self.assertEqual([f['id_solicitud'] for f in filas], self.ids)
+        self.assertEqual(avance, [2, 4, 5])
+
+    @override_settings(EXPORTACION_TAMANO_LOTE=2)
+    def test_limite_conserva_las_mas_recientes(self):
+        filas = list(filas_solicitudes(Solicitud.objects.all(), limite=3))
+
+        self.assertEqual([f['id_solicitud'] for f in filas], self.ids[-3:])
+
+
+class TrabajosExportacionTests(DatosBaseTestCase):
+    """
+    Pruebas del límite de filas de los reportes en segundo plano.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for _ in range(3):
+            crear_solicitud(self.aprendiz, self.producto)
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        ajustes = override_settings(EXPORTACIONES_DIR=carpeta.name, EXPORTACION_PDF_MAX_FILAS=2)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _procesar(self, formato, parametros=None):
+        trabajos_exportacion.crear(self.aprendiz, formato, parametros or {})
+        trabajo = trabajos_exportacion.tomar_pendiente()
+        self.assertTrue(trabajos_exportacion.procesar(trabajo))
+        return TrabajoExportacion.objects.get(pk=trabajo.pk)
+
+    def test_pdf_respeta_el_maximo_de_filas(self):
+        trabajo = self._procesar('pdf')
+
+        self.assertEqual((trabajo.total, trabajo.encontradas), (2, 3))
+
+    def test_pdf_con_limite_menor_al_maximo(self):
+        trabajo = self._procesar('pdf', {'limite': '1'})
+
+        self.assertEqual((trabajo.total, trabajo.encontradas), (1, 3))
+
+    def test_excel_no_tiene_maximo(self):
+        trabajo = self._procesar('excel')
+
+        self.assertEqual((trabajo.total, trabajo.encontradas), (3, 3))
+
+
+@override_settings(
+    LOGIN_LIMITE_IP={"capacidad": 3, "por_minuto": 1},
+    LOGIN_LIMITE_CORREO={"capacidad": 2, "por_minuto": 1},
+)
+class IntentosLoginTests(TestCase):
+    """
+    Pruebas del límite de intentos de inicio de sesión.
+    """
+
+    IP = '10.0.0.7'
+
+    def setUp(self):
+        self.correos = [f'aprendiz{i}@ejemplo.co' for i in range(10)]
+        for correo in self.correos:
+            Usuario.objects.create_user('Ana', 'Pérez', correo, 'clave12345')
+        cache.delete_many(
+            [f'login_cubeta:ip:{self.IP}'] + [intentos_login._clave_correo(c) for c in self.correos + ['nadie@ejemplo.co']]
+        )
+
+    def _intentar(self, correo, password):
+        return Client(REMOTE_ADDR=self.IP).post(reverse('login'), {'correo': correo, 'password': password})
+
+    def test_muchos_correos_desde_la_misma_ip(self):
+        for correo in self.correos:
+            respuesta = self._intentar(correo, 'clave12345')
+            self.assertEqual(respuesta.status_code, 302, correo)
+
+    def test_los_fallos_agotan_la_ip(self):
+        for correo in self.correos[:3]:
+            self.assertEqual(self._intentar(correo, 'incorrecta').status_code, 200)
+
+        respuesta = self._intentar(self.correos[3], 'clave12345')
+
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertTrue(0 < int(respuesta['Retry-After']) <= 60)
+
+    def test_los_intentos_agotan_el_correo(self):
+        for _ in range(2):
+            self.assertEqual(self._intentar('nadie@ejemplo.co', 'incorrecta').status_code, 200)
+        cache.delete(f'login_cubeta:ip:{self.IP}')
+
+        self.assertEqual(self._intentar('nadie@ejemplo.co', 'incorrecta').status_code, 429)
+
+
+class TransicionarTests(DatosBaseTestCase):
+    """
+    Pruebas de las transiciones de estado de una solicitud.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.solicitud = crear_solicitud(self.aprendiz, self.producto, cantidad=2)
+
+    def _estado(self):
+        return Solicitud.objects.values_list('estado_solicitud', flat=True).get(pk=self.solicitud.pk)
+
+    def test_recorre_el_ciclo_de_vida(self):
+        for accion, estado in (('aprobar', 'aprobada'), ('despachar', 'despachada'), ('entregar', 'entregada')):
+            self.assertTrue(transicionar(self.solicitud, accion))
+            self.assertEqual(self.solicitud.estado_solicitud, estado)
+            self.assertEqual(self._estado(), estado)
+        self.assertIsNotNone(self.solicitud.fecha_finalizacion)
+
+    def test_no_aplica_desde_otro_estado(self):
+        self.assertFalse(transicionar(self.solicitud, 'despachar'))
+        self.assertEqual(self._estado(), 'pendiente')
+
+    def test_instancia_desactualizada_no_se_mueve_dos_veces(self):
+        copia = Solicitud.objects.get(pk=self.solicitud.pk)
+        self.assertTrue(transicionar(self.solicitud, 'aprobar'))
+
+        self.assertFalse(transicionar(copia, 'rechazar'))
+        self.assertEqual(self._estado(), 'aprobada')
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 5)
+
+    def test_rechazar_devuelve_el_stock_una_sola_vez(self):
+        self.assertTrue(transicionar(self.solicitud, 'rechazar'))
+        self.assertFalse(transicionar(self.solicitud, 'rechazar'))
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 7)
+
+    def test_accion_invalida(self):
+        with self.assertRaises(ValueError):
+            transicionar(self.solicitud, 'archivar')
+
+
+class TransicionarLoteTests(DatosBaseTestCase):
+    """
+    Pruebas de las transiciones de estado en lote.
+    """
+
+    def test_solo_mueve_las_que_siguen_en_el_estado_de_origen(self):
+        pendientes = [crear_solicitud(self.aprendiz, self.producto, cantidad=c) for c in (1, 2)]
+        aprobada = crear_solicitud(self.aprendiz, self.producto, cantidad=3)
+        transicionar(aprobada, 'aprobar')
+
+        movidas = transicionar_lote([s.pk for s in pendientes] + [aprobada.pk], 'cancelar')
+
+        self.assertEqual([s.pk for s in movidas], [s.pk for s in pendientes])
+        self.assertTrue(all(s.estado_solicitud == 'cancelada' for s in movidas))
+        self.assertEqual(
+            dict(Solicitud.objects.values_list('pk', 'estado_solicitud')),
+            {pendientes[0].pk: 'cancelada', pendientes[1].pk: 'cancelada', aprobada.pk: 'aprobada'},
+        )
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 8)
+
+    def test_repetir_el_lote_no_mueve_nada(self):
+        ids = [crear_solicitud(self.aprendiz, self.producto).pk for _ in range(2)]
+        transicionar_lote(ids, 'rechazar')
+
+        self.assertEqual(transicionar_lote(ids, 'rechazar'), [])
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 7)
+
+
+class ContadoresTests(DatosBaseTestCase):
+    """
+    Pruebas de los contadores por estado y su reconciliación.
+    """
+
+    def test_reconciliar_corrige_los_contadores(self):
+        # Solicitudes creadas sin pasar por registrar_creacion
+        solicitudes = [crear_solicitud(self.aprendiz, self.producto) for _ in range(3)]
+        centro = solicitudes[0].centro_formacion_id
+
+        diferencias = contadores.reconciliar(aplicar=False)
+
+        self.assertIn(('pendiente', contadores.TODOS, 0, 3), diferencias)
+        self.assertIn(('pendiente', centro, 0, 3), diferencias)
+        self.assertEqual(contadores.conteos()['pendiente'], 0)
+
+        contadores.reconciliar()
+
+        self.assertEqual(contadores.conteos()['pendiente'], 3)
+        self.assertEqual(contadores.conteos(centro)['pendiente'], 3)
+        self.assertEqual(contadores.reconciliar(aplicar=False), [])
+
+    def test_transiciones_mantienen_los_contadores(self):
+        solicitudes = [crear_solicitud(self.aprendiz, self.producto) for _ in range(3)]
+        contadores.reconciliar()
+
+        transicionar(solicitudes[0], 'aprobar')
+        transicionar_lote([s.pk for s in solicitudes[1:]], 'rechazar')
+
+        totales = contadores.conteos()
+        self.assertEqual((totales['pendiente'], totales['aprobada'], totales['rechazada']), (0, 1, 2))
+        self.assertEqual(contadores.reconciliar(aplicar=False), [])
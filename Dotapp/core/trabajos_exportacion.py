@@ -0,0 +1,286 @@
+"""
+Generación de reportes en segundo plano del sistema DotApp SENA.
+
+Un reporte grande puede tardar más que el tiempo máximo de un request y
+mantiene ocupado al worker web mientras se escribe. En su lugar, la vista
+registra un TrabajoExportacion con los filtros pedidos y responde de
+inmediato; el comando procesar_exportaciones toma los trabajos pendientes
+y genera el archivo con core.exportacion, guardando el avance:
+
+    pendiente -> procesando (procesadas / total) -> terminado | fallido
+
+Igual que la exportación directa, un PDF tiene como máximo
+EXPORTACION_PDF_MAX_FILAS filas; el trabajo guarda cuántas solicitudes
+coincidían con el filtro para que el estado indique si el reporte se
+recortó.
+
+El navegador consulta el estado del trabajo hasta que termina y luego
+descarga el archivo. Los archivos se eliminan EXPORTACIONES_TTL segundos
+después de generados; un trabajo que sigue en proceso después de
+EXPORTACIONES_TIEMPO_MAXIMO segundos (por ejemplo porque el proceso murió)
+se marca como fallido.
+"""
+
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from core.exportacion import escribir_excel, escribir_pdf
+from core.filtros import PARAMETROS, FiltroSolicitudes
+from core.models import TrabajoExportacion
+
+
+EXTENSIONES = {
+    "pdf": "pdf",
+    "excel": "xlsx",
+}
+
+
+def _configuracion(nombre, defecto):
+    """
+    Lee un parámetro de las exportaciones desde settings.
+
+    Args:
+        nombre: Nombre del setting
+        defecto: Valor si el setting no está definido
+
+    Returns:
+        Valor configurado o el valor por defecto
+    """
+    return getattr(settings, nombre, defecto)
+
+
+def directorio():
+    """
+    Retorna el directorio de los archivos generados, creándolo si no existe.
+
+    Returns:
+        str: Valor de settings.EXPORTACIONES_DIR (BASE_DIR/cache/exportaciones por defecto)
+    """
+    ruta = _configuracion("EXPORTACIONES_DIR", os.path.join(settings.BASE_DIR, "cache", "exportaciones"))
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def ruta_archivo(trabajo):
+    """
+    Retorna la ruta del archivo generado por un trabajo.
+
+    Args:
+        trabajo: Instancia de TrabajoExportacion terminada
+
+    Returns:
+        str: Ruta absoluta del archivo, o cadena vacía si no tiene archivo
+    """
+    return os.path.join(directorio(), trabajo.archivo) if trabajo.archivo else ""
+
+
+def _limite(parametros):
+    """
+    Lee el número máximo de filas pedido en los parámetros.
+
+    Args:
+        parametros: Parámetros del trabajo
+
+    Returns:
+        int: Límite positivo, o None para exportar todas las filas
+    """
+    try:
+        limite = int(parametros.get("limite") or 0)
+    except (TypeError, ValueError):
+        return None
+    return limite if limite > 0 else None
+
+
+def _limite_trabajo(trabajo):
+    """
+    Retorna el número máximo de filas que exporta un trabajo.
+
+    Es el límite pedido en los parámetros; en los PDF además no supera
+    EXPORTACION_PDF_MAX_FILAS, como en la exportación directa.
+
+    Args:
+        trabajo: Instancia de TrabajoExportacion
+
+    Returns:
+        int: Límite positivo, o None para exportar todas las filas
+    """
+    limite = _limite(trabajo.parametros)
+    if trabajo.formato == "pdf":
+        maximo = _configuracion("EXPORTACION_PDF_MAX_FILAS", 5000)
+        limite = min(limite, maximo) if limite else maximo
+    return limite
+
+
+def crear(usuario, formato, parametros):
+    """
+    Registra un trabajo de exportación pendiente.
+
+    Args:
+        usuario: Usuario que pide el reporte
+        formato: "pdf" o "excel"
+        parametros: Diccionario o QueryDict con los filtros (ver
+            core.filtros.PARAMETROS) y opcionalmente "limite"
+
+    Returns:
+        TrabajoExportacion: Trabajo creado
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    if formato not in EXTENSIONES:
+        raise ValueError(f"Formato de exportación no válido: {formato}")
+
+    guardados = {nombre: parametros.get(nombre, "").strip() for nombre in PARAMETROS}
+    limite = _limite(parametros)
+    if limite:
+        guardados["limite"] = limite
+
+    return TrabajoExportacion.objects.create(usuario=usuario, formato=formato, parametros=guardados)
+
+
+def tomar_pendiente():
+    """
+    Toma el trabajo pendiente más antiguo y lo marca en proceso.
+
+    La fila se bloquea (con SKIP LOCKED donde el motor lo permite) para que
+    dos procesos no tomen el mismo trabajo.
+
+    Returns:
+        TrabajoExportacion: Trabajo tomado, o None si no hay pendientes
+    """
+    with transaction.atomic():
+        bloqueo = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+        trabajo = (
+            TrabajoExportacion.objects
+            .select_for_update(**bloqueo)
+            .filter(estado="pendiente")
+            .order_by("creado", "id_trabajo")
+            .first()
+        )
+        if trabajo is None:
+            return None
+
+        trabajo.estado = "procesando"
+        trabajo.iniciado = now()
+        trabajo.save(update_fields=["estado", "iniciado"])
+    return trabajo
+
+
+def procesar(trabajo):
+    """
+    Genera el archivo de un trabajo tomado con tomar_pendiente().
+
+    El archivo se escribe con un nombre temporal y se renombra al terminar,
+    así que nunca se descarga un reporte a medio escribir. El avance se
+    guarda cada vez que se termina de escribir un lote de filas.
+
+    Args:
+        trabajo: Instancia de TrabajoExportacion en proceso
+
+    Returns:
+        bool: True si el archivo se generó, False si el trabajo falló
+    """
+    filas = TrabajoExportacion.objects.filter(id_trabajo=trabajo.id_trabajo)
+    filtro = FiltroSolicitudes.desde_parametros(trabajo.parametros)
+    limite = _limite_trabajo(trabajo)
+    carpeta = directorio()
+    temporal = None
+
+    try:
+        solicitudes = filtro.aplicar()
+        encontradas = solicitudes.count()
+        total = encontradas if limite is None else min(encontradas, limite)
+        filas.update(total=total, encontradas=encontradas)
+
+        def progreso(procesadas):
+            filas.update(procesadas=procesadas)
+
+        descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as archivo:
+            if trabajo.formato == "pdf":
+                escritas = escribir_pdf(solicitudes, archivo, filtro.titulo(), limite=limite, progreso=progreso)
+            else:
+                escritas = escribir_excel(solicitudes, archivo, limite=limite, progreso=progreso)
+
+        extension = EXTENSIONES[trabajo.formato]
+        nombre = f"exportacion_{trabajo.id_trabajo}.{extension}"
+        os.replace(temporal, os.path.join(carpeta, nombre))
+    except Exception as e:
+        if temporal and os.path.exists(temporal):
+            os.remove(temporal)
+        momento = now()
+        filas.update(
+            estado="fallido",
+            error=f"{type(e).__name__}: {e}",
+            terminado=momento,
+            expira=momento + timedelta(seconds=_configuracion("EXPORTACIONES_TTL", 24 * 3600)),
+        )
+        return False
+
+    momento = now()
+    filas.update(
+        estado="terminado",
+        total=escritas,
+        procesadas=escritas,
+        archivo=nombre,
+        nombre_descarga=f"{filtro.titulo().replace(' ', '_').lower()}.{extension}",
+        terminado=momento,
+        expira=momento + timedelta(seconds=_configuracion("EXPORTACIONES_TTL", 24 * 3600)),
+    )
+    return True
+
+
+def procesar_pendientes(maximo=None):
+    """
+    Procesa trabajos pendientes uno por uno hasta que no quede ninguno.
+
+    Args:
+        maximo: Número máximo de trabajos a procesar (None para todos)
+
+    Returns:
+        tuple: (terminados, fallidos)
+    """
+    terminados = fallidos = 0
+    while maximo is None or terminados + fallidos < maximo:
+        trabajo = tomar_pendiente()
+        if trabajo is None:
+            break
+        if procesar(trabajo):
+            terminados += 1
+        else:
+            fallidos += 1
+    return terminados, fallidos
+
+
+def limpiar_vencidos():
+    """
+    Elimina los trabajos vencidos con sus archivos y da por fallidos los
+    que llevan demasiado tiempo en proceso.
+
+    Returns:
+        int: Número de trabajos eliminados
+    """
+    momento = now()
+    maximo = timedelta(seconds=_configuracion("EXPORTACIONES_TIEMPO_MAXIMO", 1800))
+    TrabajoExportacion.objects.filter(estado="procesando", iniciado__lt=momento - maximo).update(
+        estado="fallido",
+        error="La generación del reporte superó el tiempo máximo",
+        terminado=momento,
+        expira=momento + timedelta(seconds=_configuracion("EXPORTACIONES_TTL", 24 * 3600)),
+    )
+
+    vencidos = list(TrabajoExportacion.objects.filter(expira__lte=momento))
+    for trabajo in vencidos:
+        ruta = ruta_archivo(trabajo)
+        if ruta:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+    TrabajoExportacion.objects.filter(id_trabajo__in=[t.id_trabajo for t in vencidos]).delete()
+    return len(vencidos)
@@ -0,0 +1,239 @@
+"""
+Versiones de las tablas de catálogo del sistema DotApp SENA.
+
+Cada tabla de catálogo (tipos, tallas, colores, centros, programas y
+productos) tiene una fila en VersionTabla cuya versión aumenta al confirmar
+cualquier escritura sobre ella. Las respuestas construidas con esas tablas
+usan las versiones como ETag y la fecha del último cambio como
+Last-Modified; si el navegador ya tiene la versión actual se responde 304
+sin consultar las tablas:
+
+    GET /aprendiz/catalogo/                     -> 200, ETag "…"
+    GET /aprendiz/catalogo/ If-None-Match: "…"  -> 304 (sin consultas)
+
+A diferencia de core.catalogo, que guarda las tablas en la memoria de cada
+proceso, las versiones se leen de la base de datos (con una caché corta en
+la caché de Django), así que todos los workers ven el mismo cambio.
+
+Las versiones se aumentan con las señales post_save/post_delete de los
+modelos (ver core.signals). Los movimientos de stock de core.inventario,
+que son UPDATE directos sobre Producto, aumentan en cambio la versión
+"stock" (ver STOCK): así cada pedido no invalida el catálogo ni los
+fragmentos que no muestran el stock, y solo las respuestas que sí lo
+muestran la incluyen en su ETag.
+
+El aumento se hace al confirmar la transacción y las respuestas leen la
+versión antes que los datos: una respuesta guardada con una versión nunca
+tiene datos más antiguos que esa versión.
+
+Las señales también anotan en CambioTabla la fila que cambió en cada
+versión, así que un cliente que conoce la versión N puede pedir solo las
+filas que cambiaron después (ver cambios). Se conservan los cambios de las
+últimas CAMBIOS_CONSERVADOS versiones de cada tabla.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from core.models import CambioTabla, CentroFormacion, Color, Producto, Programa, Talla, TipoProducto, VersionTabla
+
+
+# Modelo -> nombre de su tabla en VersionTabla
+TABLAS = {
+    TipoProducto: "tipos",
+    Talla: "tallas",
+    Color: "colores",
+    CentroFormacion: "centros",
+    Programa: "programas",
+    Producto: "productos",
+}
+
+# Versión que aumenta con los movimientos de stock de core.inventario (sin
+# modelo propio: las demás escrituras de Producto aumentan "productos")
+STOCK = "stock"
+
+# Versiones por tabla cuyos cambios se conservan en CambioTabla
+CAMBIOS_CONSERVADOS = 1000
+
+
+def _clave(nombre):
+    """
+    Retorna la clave de caché de la versión de una tabla.
+
+    Args:
+        nombre: Nombre de la tabla
+
+    Returns:
+        str: Clave de caché
+    """
+    return f"version_tabla:{nombre}"
+
+
+def _ttl():
+    """
+    Retorna el tiempo que una versión leída se guarda en la caché de Django.
+
+    Los cambios se aplican de inmediato en la caché del servidor que hizo la
+    escritura; este tiempo solo limita cuánto tarda en verlos otro servidor
+    con su propia caché.
+
+    Returns:
+        int: Valor de settings.VERSIONES_CACHE_TTL (60 por defecto)
+    """
+    return getattr(settings, "VERSIONES_CACHE_TTL", 60)
+
+
+def _leer(nombre):
+    """
+    Lee la versión de una tabla de la base de datos, creándola si no existe.
+
+    Args:
+        nombre: Nombre de la tabla
+
+    Returns:
+        tuple: (version, actualizado)
+    """
+    fila, _ = VersionTabla.objects.get_or_create(nombre=nombre, defaults={"actualizado": now()})
+    return fila.version, fila.actualizado
+
+
+def obtener(*nombres):
+    """
+    Retorna la versión actual de varias tablas.
+
+    Args:
+        *nombres: Nombres de las tablas
+
+    Returns:
+        dict: Nombre -> (version, actualizado)
+    """
+    claves = {_clave(nombre): nombre for nombre in nombres}
+    guardadas = cache.get_many(list(claves))
+    resultado = {}
+    for clave, nombre in claves.items():
+        valor = guardadas.get(clave)
+        if valor is None:
+            valor = _leer(nombre)
+            cache.set(clave, valor, _ttl())
+        resultado[nombre] = valor
+    return resultado
+
+
+def _aumentar(nombre, momento):
+    """
+    Aumenta la versión de una tabla, creando su fila si no existe.
+
+    Debe llamarse dentro de una transacción: la fila queda bloqueada hasta
+    confirmarla.
+
+    Args:
+        nombre: Nombre de la tabla
+        momento: Fecha del cambio
+
+    Returns:
+        int: Nueva versión de la tabla
+    """
+    filas = VersionTabla.objects.filter(nombre=nombre).update(version=F("version") + 1, actualizado=momento)
+    if not filas:
+        try:
+            with transaction.atomic():
+                VersionTabla.objects.create(nombre=nombre, actualizado=momento)
+        except IntegrityError:
+            # Otro proceso creó la fila al mismo tiempo
+            VersionTabla.objects.filter(nombre=nombre).update(version=F("version") + 1, actualizado=momento)
+    return VersionTabla.objects.values_list("version", flat=True).get(nombre=nombre)
+
+
+def _depurar(nombre, version):
+    """
+    Elimina los cambios anotados de versiones antiguas de una tabla.
+
+    Se ejecuta cada 100 versiones para no borrar en cada escritura.
+
+    Args:
+        nombre: Nombre de la tabla
+        version: Versión actual de la tabla
+    """
+    limite = version - CAMBIOS_CONSERVADOS
+    if limite <= 0 or version % 100:
+        return
+    CambioTabla.objects.filter(tabla=nombre, version__lte=limite).delete()
+    VersionTabla.objects.filter(nombre=nombre, depurado__lt=limite).update(depurado=limite)
+
+
+def incrementar(*nombres, registro=None):
+    """
+    Aumenta la versión de varias tablas al confirmar la transacción actual.
+
+    Fuera de una transacción el aumento se aplica de inmediato.
+
+    Args:
+        *nombres: Nombres de las tablas modificadas
+        registro: Clave primaria de la fila modificada, que se anota en
+            CambioTabla para las respuestas parciales (None si no se conoce)
+    """
+    def aplicar():
+        momento = now()
+        with transaction.atomic():
+            for nombre in nombres:
+                version = _aumentar(nombre, momento)
+                if registro is not None:
+                    CambioTabla.objects.create(tabla=nombre, version=version, registro_id=registro)
+                    _depurar(nombre, version)
+        cache.delete_many([_clave(nombre) for nombre in nombres])
+
+    transaction.on_commit(aplicar)
+
+
+def cambios(nombre, desde):
+    """
+    Retorna las filas de una tabla que cambiaron después de una versión.
+
+    Args:
+        nombre: Nombre de la tabla
+        desde: Versión conocida por el cliente
+
+    Returns:
+        set: Claves primarias creadas, modificadas o eliminadas después de
+        la versión, o None si los cambios de esa versión ya se depuraron y
+        hay que enviar la tabla completa
+    """
+    depurado = VersionTabla.objects.filter(nombre=nombre).values_list("depurado", flat=True).first()
+    if depurado is None or desde < depurado:
+        return None
+    return set(
+        CambioTabla.objects.filter(tabla=nombre, version__gt=desde)
+        .values_list("registro_id", flat=True)
+    )
+
+
+def etiqueta(versiones):
+    """
+    Construye un ETag a partir de las versiones de varias tablas.
+
+    Args:
+        versiones: Diccionario retornado por obtener()
+
+    Returns:
+        str: Huella de las versiones (sin comillas)
+    """
+    partes = "|".join(f"{nombre}:{version}" for nombre, (version, _) in sorted(versiones.items()))
+    return hashlib.sha1(partes.encode()).hexdigest()[:20]
+
+
+def ultima_modificacion(versiones):
+    """
+    Retorna la fecha del cambio más reciente entre varias tablas.
+
+    Args:
+        versiones: Diccionario retornado por obtener()
+
+    Returns:
+        datetime: Fecha del último cambio
+    """
+    return max(actualizado for _, actualizado in versiones.values())
@@ -92,6 +92,14 @@ def login_view(request):
         correo = request.POST.get('correo')
         password = request.POST.get('password')
 
+        # Rechazar el exceso de intentos antes de calcular el hash de la contraseña
+        espera = intentos_login.consumir(request, correo or '')
+        if espera:
+            messages.error(request, f"Demasiados intentos. Inténtalo de nuevo en {espera} segundos.")
+            response = render(request, 'core/login.html', status=429)
+            response['Retry-After'] = str(espera)
+            return response
+
         usuario = authenticate(request, username=correo, password=password)
 
         if usuario is not None and usuario.is_active:
@@ -102,6 +110,7 @@ def login_view(request):
             elif usuario.rol.nombre_rol == 'aprendiz':
                 return redirect('bienvenido-aprendiz')
         else:
+            intentos_login.registrar_fallo(request)
             messages.error(request, "Credenciales inválidas")
 
     return render(request, 'core/login.html')
@@ -128,6 +137,11 @@ from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.forms import SetPasswordForm
 from .models import Usuario
 from .tokens import expiring_token_generator
+from .correos import correo_restablecer_contrasena
+from .bandeja_salida import encolar
+from . import contadores, imagenes, intentos_login
+from django.conf import settings
+from django.views.static import serve
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 
 expiring_token_generator = PasswordResetTokenGenerator()
@@ -162,44 +176,9 @@ def password_reset_request(request):
             reverse('password_reset_confirm', kwargs={'uidb64': uid, 'token': token})
         )
 
-            # Contenido texto opcional del correo
-        text_content = (
-            f'Hola,\n\nRecibimos una solicitud para restablecer tu contraseña en DotAppSena. '
-            f'Para crear una nueva contraseña visita el siguiente enlace (válido 15 minutos):\n\n'
-            f'{reset_url}\n\n'
-            f'Si no solicitaste este cambio, simplemente ignora este correo.\n\n'
-            f'Saludos,\nEl equipo de Dotapp'
-        )
-
-        # Contenido HTML del correo
-        html_content = f"""
-        <html>
-        <body style="font-family:Arial,Helvetica,sans-serif; background:#f7f7f7; padding:20px;">
-            <div style="max-width:600px; margin:auto; background:white; border-radius:10px; overflow:hidden; box-shadow:0 4px 12px rgba(0,0,0,.1);">
-                <div style="padding:20px;">
-                    Hola,<br><br>
-                    Recibimos una solicitud para restablecer tu contraseña en DotAppSena.<br>
-                    Para crear una nueva contraseña visita el siguiente enlace (válido 15 minutos):<br><br>
-                    <a href="{reset_url}">Restablecer contraseña</a><br><br>
-                    Si no solicitaste este cambio, simplemente ignora este correo.<br><br>
-                    <br>
-                    Saludos,<br>El equipo de Dotapp
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        msg = EmailMultiAlternatives(
-            'Recupera tu contraseña',
-            text_content,
-            'dotappsena@gmail.com',
-            [email]
-        )
-        msg.attach_alternative(html_content, "text/html")
+        # El correo se envía desde la bandeja de salida (comando enviar_correos)
+        encolar(correo_restablecer_contrasena(email, reset_url))
 
-        msg.send(fail_silently=False)
-        
         return JsonResponse({"status": "ok"})
 
     # GET: muestra el formulario para ingresar el correo
@@ -252,7 +231,8 @@ def dashboard_admin(request):
     Vista para el dashboard de administración.
     
     Panel principal para usuarios con roles de administrador, almacenista o despachador.
-    Requiere autenticación.
+    Muestra el número de solicitudes en cada estado, leído de los contadores
+    (core.contadores) sin contar la tabla de solicitudes. Requiere autenticación.
     
     Args:
         request: Objeto HttpRequest del usuario autenticado
@@ -260,7 +240,7 @@ def dashboard_admin(request):
     Returns:
         HttpResponse: Renderiza el dashboard de administración
     """
-    return render(request, 'core/dashboard_admin.html')
+    return render(request, 'core/dashboard_admin.html', {'conteos': contadores.resumen()})
 
 
 def acceso_denegado(request):
@@ -279,6 +259,27 @@ def acceso_denegado(request):
     return render(request, 'core/acceso_denegado.html')
 
 
+def servir_media(request, path):
+    """
+    Sirve un archivo de MEDIA_ROOT en desarrollo.
+
+    Las imágenes de productos guardadas por el hash de su contenido nunca
+    cambian, así que se envían con cabeceras de caché de un año; el resto
+    de archivos se sirve como con django.views.static.serve.
+
+    Args:
+        request: Objeto HttpRequest
+        path: Ruta del archivo relativa a MEDIA_ROOT
+
+    Returns:
+        FileResponse: Contenido del archivo (o 304 si no cambió)
+    """
+    respuesta = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if imagenes.es_inmutable(path):
+        respuesta["Cache-Control"] = imagenes.CACHE_INMUTABLE
+    return respuesta
+
+
 def csrf_error_redirect(request, reason=""):
     """
     Redirige a la página de inicio cuando falla la validación CSRF.